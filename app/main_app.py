@@ -3,12 +3,14 @@
 # ✅ Onglet d’accueil AVANT la navigation par catégorie
 # ✅ Bloc Numbeo appelé une seule fois
 # ✅ Message de fin clair
+# ✅ Profilage opt-in d’un rerun (bouton de la barre latérale, ?profile=1 ou GPI_PROFILE=1)
 # ---------------------------------------------------------------------
 
 from __future__ import annotations
 import os, sys
 from pathlib import Path
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
 # Ajoute le dossier parent au chemin d'import
 sys.path.append(os.path.abspath(os.path.join(Path(__file__).parent, "..")))
@@ -20,6 +22,8 @@ st.title("🌐 Global Indices")
 # ⵀ Onglet Accueil + Config
 from core.welcome import display_welcome_tab
 from core.source_config import CATEGORY_TO_SOURCES
+from core import instrumentation, datasets, profiling, reload, runtime, session_store
+from core.instrumentation import timed
 
 # ⵀ Core loaders
 # from core.big_mac import load_data as load_big_mac, get_lookup_table, filter_data as filter_big_mac
@@ -48,37 +52,104 @@ from interface_blocks.cpi_block import display_wb_cpi_block
 from interface_blocks.icp_block import display_wb_icp_block
 from interface_blocks.penn_block import display_penn_block
 from interface_blocks.numbeo_block import display_numbeo_block
+from interface_blocks.diagnostics_block import display_diagnostics_block
+from interface_blocks.ranking_block import display_ranking_block
+
+# ⵀ Caches et messages des modules core via Streamlit (backend injecté)
+runtime.install_streamlit()
+
+# ⵀ Export Prometheus (/metrics) si GPI_METRICS_PORT est défini
+instrumentation.start_metrics_server()
+
+# ⵀ Préchargement de tous les jeux de données en arrière-plan (une fois par processus)
+datasets.start_warmup()
+
+# ⵀ Rechargement à chaud des jeux dont les fichiers bruts / le bundle changent
+reload.start_reload_service()
+
+
+# ⵀ Corps de la page (un rerun), profilable sans toucher aux autres sessions
+def _render_page() -> None:
+    # ⵀ Page de diagnostic cachée (?diagnostics=1)
+    if st.query_params.get("diagnostics") == "1":
+        display_diagnostics_block()
+        st.stop()
+
+    # ⵀ Onglet accueil
+    st.sidebar.header("🌐 Navigation")
+    nav_choice = st.sidebar.radio(
+        label="",  # ⬅️ Supprime le texte "Navigation"
+        options=["🏠 Home", "Explore datas", "🏆 Leaderboard"],
+        index=1,
+        horizontal=False
+    )
+    # ⵀ État du préchargement
+    # (+ messages des loaders, ex. repli CSV, émis hors session par le préchargement)
+    STATUS_ICONS = {"ready": "✅", "loading": "⏳", "pending": "🕓", "error": "❌"}
+    _ds_status = datasets.status()
+    _warned = any(level in ("warning", "error") for ds in _ds_status for level, _ in ds["messages"])
+    with st.sidebar.expander("Data readiness", expanded=not datasets.is_ready() or _warned):
+        for ds in _ds_status:
+            icon = "🔄" if ds["reloading"] else STATUS_ICONS[ds["status"]]
+            st.caption(f"{icon} {ds['label']}")
+            for _level, _message in ds["messages"]:
+                st.caption(f"  ↳ {_message}")
+
+    # ⵀ Profilage du prochain rerun de cette session (instrumentation active)
+    if instrumentation.is_enabled():
+        with st.sidebar.expander("⏱ Profiling"):
+            count_calls = st.checkbox("Count pandas calls (slower, skews timings)")
+            if st.button("Profile next rerun"):
+                st.session_state[profiling.SESSION_FLAG] = profiling.CALLS if count_calls else profiling.SAMPLE
+                st.rerun()
+
+    if nav_choice == "🏠 Home":
+        display_welcome_tab()
+        st.stop()
+
+
+    # ⵀ Budget mémoire de l'état de session (mesuré à chaque rerun)
+    _ctx = get_script_run_ctx()
+    if _ctx is not None:
+        with timed("app.session_budget"):
+            _trimmed = session_store.enforce_budget(st.session_state, _ctx.session_id)
+        if _trimmed:
+            st.sidebar.caption(f"⚠️ Session state over budget – reset: {', '.join(_trimmed)}")
+
+    # ⵀ Classements entre pays (rang / percentile / top-N)
+    if nav_choice == "🏆 Leaderboard":
+        with timed("app.rerun.leaderboard"):
+            display_ranking_block()
+        st.stop()
+
+    # ⵀ Navigation
+    category = st.sidebar.radio("Category", list(CATEGORY_TO_SOURCES.keys()))
+    source = st.sidebar.selectbox("Source", CATEGORY_TO_SOURCES[category])
+    st.subheader(f"📊 {source}")
+
+    # ⵀ Affichage conditionnel selon source
+    with st.spinner("Chargement des données..."), timed(f"app.rerun.{source}"):
+        if source == "The Economist – Big Mac Index":
+            display_big_mac_block()
+        elif source == "Bank for International Settlements – REER (Real Effective Exchange Rates)":
+            display_bis_block()
+        elif source == "World Bank – CPI (Consumer Price Index)":
+            display_wb_cpi_block()
+        elif source == "World Bank – ICP (International Comparison Program) Database":
+            display_wb_icp_block()
+        elif source == "Penn World Table":
+            display_penn_block()
+        elif source == "Numbeo – Cost of Living + PPP (Purchasing Power Parity)":
+            display_numbeo_block()
 
-# ⵀ Onglet accueil
-st.sidebar.header("🌐 Navigation")
-nav_choice = st.sidebar.radio(
-    label="",  # ⬅️ Supprime le texte "Navigation"
-    options=["🏠 Home", "Explore datas"],
-    index=1,
-    horizontal=False
-)
-if nav_choice == "🏠 Home":
-    display_welcome_tab()
-    st.stop()
-
-
-# ⵀ Navigation
-category = st.sidebar.radio("Category", list(CATEGORY_TO_SOURCES.keys()))
-source = st.sidebar.selectbox("Source", CATEGORY_TO_SOURCES[category])
-st.subheader(f"📊 {source}")
-
-# ⵀ Affichage conditionnel selon source
-with st.spinner("Chargement des données..."):
-    if source == "The Economist – Big Mac Index":
-        display_big_mac_block()
-    elif source == "Bank for International Settlements – REER (Real Effective Exchange Rates)":
-        display_bis_block()
-    elif source == "World Bank – CPI (Consumer Price Index)":
-        display_wb_cpi_block()
-    elif source == "World Bank – ICP (International Comparison Program) Database":
-        display_wb_icp_block()
-    elif source == "Penn World Table":
-        display_penn_block()
-    elif source == "Numbeo – Cost of Living + PPP (Purchasing Power Parity)":
-        display_numbeo_block()
 
+# ⵀ Profilage opt-in d'un seul rerun : bouton « Profile next rerun » (drapeau de
+# session), ?profile=1|calls (premier rerun de la session ouverte par ce lien)
+# ou GPI_PROFILE=1|calls (tous les reruns)
+_profile_mode = profiling.mode_from(st.query_params.get("profile"))
+if "profile" in st.query_params:
+    del st.query_params["profile"]  # un seul rerun profilé
+_profile_mode = st.session_state.pop(profiling.SESSION_FLAG, None) or _profile_mode or profiling.env_mode()
+_run_ctx = get_script_run_ctx()
+with profiling.rerun_profile(_profile_mode, label=_run_ctx.session_id[:8] if _run_ctx else "local"):
+    _render_page()
@@ -3,19 +3,28 @@ core/big_mac.py
 ---------------
 Utilities for the “Big Mac Index” data-set.
 
-• load_data()            → charge le fichier Excel (cache mémoïsé)
+• load_data()            → charge le jeu depuis le store colonnaire partitionné
+                           par édition (memory-map), l’Excel n’étant relu que
+                           s’il est plus récent ; lignes triées (identifiant, date)
+                           + colonnes year / month / day entières précalculées
 • get_lookup_table()     → renvoie toutes les combinaisons ISO / currency / name
 • resolve_identity()     → à partir d’une entrée unique (ISO, currency ou name),
                            retourne toutes les combinaisons possibles
 • get_country_metadata() → renvoie toutes les combinaisons pour un nom de pays donné
+• get_date_dimension()   → dimension date (années / mois / jours) d’un identifiant,
+                           précalculée une fois par version du jeu
 • filter_data()          → renvoie le DataFrame filtré selon identifiants,
                            date (année / mois / jour) et variables numériques
 """
 
 from pathlib import Path
 from functools import lru_cache
+import numpy as np
 import pandas as pd
-import streamlit as st
+
+from core import columnar_store, datasets, runtime
+from core.date_dimension import DateDimension
+from core.instrumentation import timed
 
 # --- Chemin du fichier Excel -------------------------------------------------
 DATA_PATH = (
@@ -26,25 +35,75 @@ DATA_PATH = (
 # --- Colonnes clés -----------------------------------------------------------
 ID_COLS   = ["iso_a3", "currency_code", "name"]
 DATE_COL  = "date"
+PART_COLS = ["year", "month", "day"]          # précalculées à l'ingestion
+STORE_TABLE = "big_mac"
+RELEASE_COL = "release"                       # partition : une édition = un dossier
+
+
+def _layout(df: pd.DataFrame) -> pd.DataFrame:
+    """Colonnes year / month / day entières + tri (identifiant, date)."""
+    dates = df[DATE_COL]
+    df = df.assign(**{
+        "year": dates.dt.year.astype("int16"),
+        "month": dates.dt.month.astype("int8"),
+        "day": dates.dt.day.astype("int8"),
+    })
+    return df.sort_values(ID_COLS + [DATE_COL], kind="stable").reset_index(drop=True)
+
+
+def _read_excel() -> pd.DataFrame:
+    df = pd.read_excel(DATA_PATH, engine="openpyxl")
+    df[DATE_COL] = pd.to_datetime(df[DATE_COL], errors="coerce")
+    return df[df[DATE_COL].notna()]
+
+
+def _write_store(df: pd.DataFrame) -> None:
+    """Ajoute / remplace les éditions de `df` dans le store (une partition par édition)."""
+    parts = df.assign(**{RELEASE_COL: df[DATE_COL].dt.strftime("%Y-%m-%d")})
+    columnar_store.append_partitioned(parts, STORE_TABLE, RELEASE_COL, ID_COLS)
+
 
 @lru_cache(maxsize=1)
+@timed("big_mac.load")
 def load_data() -> pd.DataFrame:
-    """Charge le fichier Excel et le met en cache."""
-    if not DATA_PATH.exists():
+    """
+    Store colonnaire à jour → lecture memory-map, sans openpyxl ni conversion de dates.
+    Sinon (premier lancement, Excel modifié) → Excel, puis écriture des partitions.
+    """
+    stored = columnar_store.table_mtime(STORE_TABLE)
+    if DATA_PATH.exists() and (stored is None or DATA_PATH.stat().st_mtime > stored):
+        df = _layout(_read_excel())
+        try:
+            _write_store(df)
+        except OSError as e:  # store en lecture seule : le jeu reste servi depuis l'Excel
+            runtime.notify("warning", f"⚠️ Store Big Mac non écrit ({e}).")
+        return df
+    if stored is None:
         raise FileNotFoundError(f"Big Mac file not found → {DATA_PATH}")
-    df = pd.read_excel(DATA_PATH, engine="openpyxl")
-    df[DATE_COL] = pd.to_datetime(df[DATE_COL], errors="coerce")
-    return df
+    df = columnar_store.read_table(STORE_TABLE, memory_map=True).drop(columns=RELEASE_COL)
+    return df.sort_values(ID_COLS + [DATE_COL], kind="stable").reset_index(drop=True)
 
 
 # --------------------------------------------------------------------------- #
 #                            OUTILS D’IDENTITÉ                                #
 # --------------------------------------------------------------------------- #
-@st.cache_data
+def _frame() -> pd.DataFrame:
+    """Version servie du jeu (cache partagé core.datasets, bundle ou Excel)."""
+    return datasets.get("big_mac")
+
+
+# Mémoïsation sur le jeton de version, via le backend injecté (core.runtime) :
+# lru_cache hors application, st.cache_data dans l'application.
+@runtime.memoize(maxsize=4)
+def _lookup_table(version: str) -> pd.DataFrame:
+    df = _frame()
+    return df[ID_COLS].drop_duplicates().reset_index(drop=True)
+
+
 def get_lookup_table() -> pd.DataFrame:
     """Renvoie toutes les combinaisons ISO / currency / name sans doublons."""
-    df = load_data()
-    return df[ID_COLS].drop_duplicates().reset_index(drop=True)
+    _frame()
+    return _lookup_table(datasets.version("big_mac"))
 
 
 def resolve_identity(iso: str | None = None,
@@ -59,7 +118,7 @@ def resolve_identity(iso: str | None = None,
     if sum(k is not None for k in keys) != 1:
         raise ValueError("Provide *exactly* one of iso / currency / name")
 
-    df = load_data()
+    df = _frame()
     if iso is not None:
         mask = df["iso_a3"] == iso
     elif currency is not None:
@@ -69,20 +128,67 @@ def resolve_identity(iso: str | None = None,
 
     return df.loc[mask, ID_COLS].drop_duplicates().reset_index(drop=True)
 
-@st.cache_data
+@runtime.memoize(maxsize=256)
+def _country_metadata(name: str, version: str) -> pd.DataFrame:
+    df = _frame()
+    mask = df["name"].str.lower() == name.lower()
+    return df.loc[mask, ID_COLS].drop_duplicates().reset_index(drop=True)
+
+
 def get_country_metadata(name: str) -> pd.DataFrame:
     """
     Renvoie toutes les combinaisons iso_a3 / currency_code correspondant à un pays donné.
     Permet le remplissage automatique des champs selon le nom du pays.
     """
-    df = load_data()
-    mask = df["name"].str.lower() == name.lower()
-    return df.loc[mask, ID_COLS].drop_duplicates().reset_index(drop=True)
+    _frame()
+    return _country_metadata(name, datasets.version("big_mac"))
+
+
+# --------------------------------------------------------------------------- #
+#                          DIMENSION DATE                                     #
+# --------------------------------------------------------------------------- #
+@datasets.by_version
+def _date_index(df: pd.DataFrame) -> dict:
+    """
+    (iso, currency, name) → (positions des lignes, DateDimension de ces lignes),
+    plus la clé None pour le jeu entier. Construit une fois par version.
+    Disposition (identifiant, date) → positions contiguës, filtres = tranches.
+    """
+    if all(c in df.columns for c in PART_COLS):
+        parts = [df[c].to_numpy() for c in PART_COLS]
+        build = lambda rows: DateDimension.from_parts(*(p[rows] for p in parts))
+    else:  # jeu sans colonnes précalculées (bundle antérieur)
+        build = lambda rows: DateDimension.build(df[DATE_COL].iloc[rows])
+    all_rows = np.arange(len(df))
+    index = {None: (all_rows, build(all_rows))}
+    for ident, rows in df.groupby(ID_COLS, sort=False, observed=True).indices.items():
+        index[ident] = (rows, build(rows))
+    return index
+
+
+def get_date_dimension(iso: str | None = None,
+                       currency: str | None = None,
+                       name: str | None = None) -> DateDimension:
+    """
+    Dimension date des identifiants fournis (années / mois / jours disponibles).
+    Identifiants partiels → union des dimensions correspondantes ; aucun → jeu entier.
+    """
+    index = _date_index(_frame())
+    if iso is None and currency is None and name is None:
+        return index[None][1]
+    if None not in (iso, currency, name):
+        entry = index.get((iso, currency, name))
+        return entry[1] if entry else DateDimension.union([])
+    return DateDimension.union([
+        dim for ident, (_, dim) in index.items()
+        if ident is not None and all(v is None or v == k for v, k in zip((iso, currency, name), ident))
+    ])
 
 
 # --------------------------------------------------------------------------- #
 #                              FILTRAGE                                       #
 # --------------------------------------------------------------------------- #
+@timed("big_mac.filter")
 def filter_data(iso: str,
                 currency: str,
                 name: str,
@@ -96,29 +202,27 @@ def filter_data(iso: str,
     • month ou day peuvent être "All" pour ignorer le filtre correspondant.
     • variables None → toutes les colonnes numériques.
     """
-    df = load_data()
-
-    # --- filtre identifiants ---
-    mask = (
-        (df["iso_a3"] == iso) &
-        (df["currency_code"] == currency) &
-        (df["name"] == name)
-    )
-
-    # --- filtre dates ---
-    if year is not None:
-        mask &= df[DATE_COL].dt.year == year
-    if month not in (None, "All"):
-        mask &= df[DATE_COL].dt.month == int(month)
-    if day not in (None, "All"):
-        mask &= df[DATE_COL].dt.day == int(day)
-
-    df = df.loc[mask].copy()
+    full = _frame()
+
+    # --- filtre identifiants + dates : tranches de la dimension précalculée ---
+    entry = _date_index(full).get((iso, currency, name))
+    if entry is None:
+        df = full.iloc[:0]
+    else:
+        rows, dim = entry
+        when = (None if year is None else int(year),
+                None if month in (None, "All") else int(month),
+                None if day in (None, "All") else int(day))
+        span = dim.contiguous(*when)
+        if span is not None and len(rows) and rows[-1] - rows[0] == len(rows) - 1:
+            df = full.iloc[rows[0] + span.start: rows[0] + span.stop]   # tranche, sans copie d'index
+        else:
+            df = full.iloc[rows[dim.select(*when)]]
 
     # --- sélection des variables numériques ---
     numeric_cols = [
-        c for c in df.columns
-        if c not in ID_COLS + [DATE_COL] and pd.api.types.is_numeric_dtype(df[c])
+        c for c in full.columns
+        if c not in ID_COLS + [DATE_COL] + PART_COLS and pd.api.types.is_numeric_dtype(full[c])
     ]
     if variables:
         numeric_cols = [c for c in numeric_cols if c in variables]
@@ -4,12 +4,22 @@ BIS – Real Effective Exchange Rates (REER)
 • Fusionne automatiquement plusieurs fichiers .csv ou .xlsx placés dans data/raw/bis_reer
 • Conserve une seule ligne par « Timeseries Key » (méta) et ajoute seulement les nouvelles dates
 • Fournit les options de filtre + fonction de filtrage
+• Dimensions encodées en codes entiers + bitmap de lignes par valeur :
+  un multi-select = OU de bitmaps, plusieurs dimensions = ET ;
+  une dimension sans sélection ne coûte rien
+• Colonnes-dates indexées en DateDimension (année / mois / jour = tranches)
 """
 
+from dataclasses import dataclass
 from pathlib import Path
+import numpy as np
 import pandas as pd
 import re
 
+from core import datasets, query_engine, schemas
+from core.date_dimension import DateDimension
+from core.instrumentation import timed
+
 # Chemin vers les fichiers BIS-REER
 DATA_DIR = Path("data/raw/bis")
 
@@ -45,6 +55,7 @@ def _clean_columns(cols: list[str]) -> list[str]:
 # ─────────────────────────────────────────────────────────────
 # 2. Chargement + fusion intelligente
 # ─────────────────────────────────────────────────────────────
+@timed("bis.load")
 def load_bis_reer_data() -> pd.DataFrame:
     """
     Charge et fusionne tous les fichiers BIS-REER (.csv et .xlsx) présents dans DATA_DIR.
@@ -100,6 +111,9 @@ def load_bis_reer_data() -> pd.DataFrame:
     meta_existing = [c for c in META_COLS if c in merged_df.columns]
     date_existing = sorted([c for c in merged_df.columns if c not in meta_existing])
 
+    # Valeurs typées (les éventuels marqueurs texte des fichiers deviennent NaN)
+    merged_df[date_existing] = merged_df[date_existing].apply(pd.to_numeric, errors="coerce")
+
     return merged_df[meta_existing + date_existing]
 
 # ─────────────────────────────────────────────────────────────
@@ -113,15 +127,89 @@ def get_filter_options(df: pd.DataFrame) -> dict[str, list]:
     }
 
 # ─────────────────────────────────────────────────────────────
-# 4. Filtrage selon les sélections utilisateur
+# 4. Index bitmap des dimensions
+# ─────────────────────────────────────────────────────────────
+DIMENSIONS = ["Reference area", "Frequency", "Type", "Basket", "Unit"]
+
+
+@dataclass(frozen=True)
+class DimensionIndex:
+    values: list              # valeurs triées (NaN exclus) ; code = position
+    codes: np.ndarray         # code de chaque ligne (int32, -1 = NaN)
+    bitmaps: np.ndarray       # (len(values), ceil(n / 8)) uint8 : lignes de chaque valeur
+
+    def mask(self, selected) -> np.ndarray:
+        """Bitmap (compressé) des lignes dont la valeur est dans `selected`."""
+        position = {v: i for i, v in enumerate(self.values)}
+        wanted = [position[v] for v in selected if v in position]
+        if not wanted:
+            return np.zeros(self.bitmaps.shape[1], dtype=np.uint8)
+        return np.bitwise_or.reduce(self.bitmaps[wanted], axis=0)
+
+
+@dataclass(frozen=True)
+class BisIndex:
+    n_rows: int
+    dimensions: dict[str, DimensionIndex]
+
+    def options(self, col: str) -> list:
+        return self.dimensions[col].values if col in self.dimensions else []
+
+    def rows(self, selections: dict) -> np.ndarray | None:
+        """Positions des lignes retenues ; None si aucune dimension n'est filtrée."""
+        combined = None
+        for col, vals in selections.items():
+            if not vals or col not in self.dimensions:
+                continue
+            mask = self.dimensions[col].mask(vals)
+            combined = mask if combined is None else combined & mask
+        if combined is None:
+            return None
+        return np.flatnonzero(np.unpackbits(combined, count=self.n_rows))
+
+
+def _dimension_index(series: pd.Series) -> DimensionIndex:
+    codes, uniques = pd.factorize(series, sort=True)
+    n = len(series)
+    present = codes >= 0
+    bitmaps = np.zeros((len(uniques), n), dtype=bool)
+    bitmaps[codes[present], np.flatnonzero(present)] = True
+    return DimensionIndex(list(uniques), codes.astype(np.int32), np.packbits(bitmaps, axis=1))
+
+
+@datasets.by_version
+def get_bis_index(df: pd.DataFrame) -> BisIndex:
+    """Index bitmap des dimensions, construit une fois par version du jeu."""
+    return BisIndex(len(df), {col: _dimension_index(df[col]) for col in DIMENSIONS if col in df.columns})
+
+
+@datasets.by_version
+def get_bis_dates(df: pd.DataFrame) -> DateDimension:
+    """Dimension des colonnes-dates (libellé = nom de colonne), construite une fois par version."""
+    cols = schemas.value_columns(df)
+    return DateDimension.build(pd.to_datetime(cols, format="%Y-%m-%d", errors="coerce"), labels=cols)
+
 # ─────────────────────────────────────────────────────────────
+# 5. Filtrage selon les sélections utilisateur
+# ─────────────────────────────────────────────────────────────
+@timed("bis.filter")
 def filter_bis_data(df: pd.DataFrame, selections: dict) -> pd.DataFrame:
     """
     Applique un filtre {colonne: [valeurs]}.
     • Si la liste est vide → aucune restriction sur cette colonne.
     """
-    out = df.copy()
+    if query_engine.lazy_enabled():
+        where = {col: list(vals) for col, vals in selections.items() if vals and col in df.columns}
+        return query_engine.run_query(df, where)
+
+    # Dimensions indexées : ET / OU de bitmaps (aucun parcours des colonnes)
+    index = get_bis_index(df)
+    indexed = {col: vals for col, vals in selections.items() if col in index.dimensions}
+    rows = index.rows(indexed)
+    out = df if rows is None else df.iloc[rows]
+
+    # Autres colonnes éventuelles : filtre isin classique
     for col, vals in selections.items():
-        if vals and col in out.columns:
+        if vals and col in out.columns and col not in index.dimensions:
             out = out[out[col].isin(vals)]
     return out.reset_index(drop=True)
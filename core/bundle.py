@@ -0,0 +1,163 @@
+# core/bundle.py – v2025-07-11
+# ------------------------------------------------------------
+# Bundle de données pré-traitées, versionné (produit par scripts/build_data.py)
+#   data/bundle/
+#       CURRENT                 → nom de la version active
+#       20250711-093000/
+#           manifest.json       → version, date, jeux, checksums SHA-256
+#           bis.parquet, icp.parquet, …
+# • write_bundle()  → écrit une nouvelle version puis bascule CURRENT
+# • read_dataset()  → relit un jeu de la version active (memory-map)
+# • verify_bundle() → contrôle les checksums du manifest
+# ------------------------------------------------------------
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+BUNDLE_DIR = Path("data/bundle")
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+KEEP_VERSIONS = 3
+
+
+# ─────────────────────────────────────────────────────────────
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def current_version(bundle_dir: Path = BUNDLE_DIR) -> str | None:
+    """Nom de la version active (None si aucun bundle n'a été construit)."""
+    pointer = Path(bundle_dir) / CURRENT_FILE
+    if not pointer.exists():
+        return None
+    return pointer.read_text(encoding="utf-8").strip() or None
+
+
+def manifest(bundle_dir: Path = BUNDLE_DIR, version: str | None = None) -> dict | None:
+    """Manifest de la version demandée (active par défaut), None si absent."""
+    version = version or current_version(bundle_dir)
+    if version is None:
+        return None
+    path = Path(bundle_dir) / version / MANIFEST_FILE
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def has_dataset(name: str, bundle_dir: Path = BUNDLE_DIR) -> bool:
+    man = manifest(bundle_dir)
+    return man is not None and name in man["datasets"]
+
+
+def dataset_checksum(name: str, bundle_dir: Path = BUNDLE_DIR) -> str | None:
+    man = manifest(bundle_dir)
+    if man is None or name not in man["datasets"]:
+        return None
+    return man["datasets"][name]["sha256"]
+
+
+# ─────────────────────────────────────────────────────────────
+def read_dataset(name: str,
+                 columns: list[str] | None = None,
+                 bundle_dir: Path = BUNDLE_DIR,
+                 version: str | None = None,
+                 filters: list[tuple] | None = None) -> pd.DataFrame:
+    """
+    Relit le jeu `name` depuis la version demandée (active par défaut) du bundle.
+    • Le fichier Parquet est mappé en mémoire (pas de parsing Excel/SQLite).
+    • columns → seules ces colonnes sont lues.
+    • filters → prédicats pyarrow appliqués à la lecture, ex. [("country", "in", [...])].
+    """
+    man = manifest(bundle_dir, version)
+    if man is None or name not in man["datasets"]:
+        raise FileNotFoundError(f"Jeu « {name} » absent du bundle → lancer scripts/build_data.py")
+    path = Path(bundle_dir) / man["version"] / man["datasets"][name]["file"]
+    return pd.read_parquet(path, columns=columns, filters=filters, memory_map=True)
+
+
+def verify_bundle(bundle_dir: Path = BUNDLE_DIR, version: str | None = None) -> dict[str, bool]:
+    """Recalcule les checksums de la version → {jeu: checksum conforme}."""
+    man = manifest(bundle_dir, version)
+    if man is None:
+        raise FileNotFoundError(f"Aucun bundle trouvé dans {bundle_dir}")
+    root = Path(bundle_dir) / man["version"]
+    return {
+        name: (root / info["file"]).exists() and _sha256(root / info["file"]) == info["sha256"]
+        for name, info in man["datasets"].items()
+    }
+
+
+# ─────────────────────────────────────────────────────────────
+def write_bundle(frames: dict[str, pd.DataFrame],
+                 carry_over: list[str] | None = None,
+                 bundle_dir: Path = BUNDLE_DIR) -> Path:
+    """
+    Écrit une nouvelle version du bundle puis bascule CURRENT dessus.
+    • frames     : {jeu: DataFrame déjà nettoyé / remodelé}
+    • carry_over : jeux à reprendre tels quels de la version active
+                   (ex. source brute indisponible lors de ce build)
+    Les plus anciennes versions au-delà de KEEP_VERSIONS sont supprimées.
+    """
+    bundle_dir = Path(bundle_dir)
+    version = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    if (bundle_dir / version).exists():
+        version += f"-{len(list(bundle_dir.glob(version + '*')))}"
+    root = bundle_dir / version
+    tmp = bundle_dir / f".{version}.tmp"
+    tmp.mkdir(parents=True, exist_ok=False)
+
+    previous = manifest(bundle_dir)
+    datasets: dict[str, dict] = {}
+    try:
+        for name, df in frames.items():
+            file = f"{name}.parquet"
+            df.to_parquet(tmp / file)
+            datasets[name] = {
+                "file": file,
+                "sha256": _sha256(tmp / file),
+                "rows": int(len(df)),
+                "columns": [str(c) for c in df.columns],
+                "index": [n for n in df.index.names if n is not None],
+            }
+        for name in carry_over or []:
+            if previous is None or name not in previous["datasets"] or name in datasets:
+                continue
+            info = previous["datasets"][name]
+            shutil.copy2(bundle_dir / previous["version"] / info["file"], tmp / info["file"])
+            datasets[name] = {**info, "carried_over_from": previous["version"]}
+
+        meta = {
+            "version": version,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "datasets": datasets,
+        }
+        (tmp / MANIFEST_FILE).write_text(json.dumps(meta, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, root)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    # Bascule atomique du pointeur de version
+    pointer_tmp = bundle_dir / f".{CURRENT_FILE}.tmp"
+    pointer_tmp.write_text(version, encoding="utf-8")
+    os.replace(pointer_tmp, bundle_dir / CURRENT_FILE)
+
+    _prune(bundle_dir, keep=KEEP_VERSIONS)
+    return root
+
+
+def _prune(bundle_dir: Path, keep: int) -> None:
+    versions = sorted(p for p in bundle_dir.iterdir() if p.is_dir() and not p.name.startswith("."))
+    for old in versions[:-keep]:
+        shutil.rmtree(old, ignore_errors=True)
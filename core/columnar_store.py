@@ -0,0 +1,150 @@
+# core/columnar_store.py – v2025-07-10
+# ------------------------------------------------------------
+# Stockage colonnaire (Parquet) partagé par les loaders et scripts
+# • write_table()   → écrit un DataFrame complet (remplacement atomique)
+# • write_batches() → écrit un flux de DataFrames, un row group par lot
+# • read_table()    → relit une table avec projection de colonnes (memory-map possible)
+# • table_mtime()   → date de dernière écriture (fraîcheur face aux fichiers bruts)
+# • append_partitioned() → ajoute à une table partitionnée, sans doublons
+# ------------------------------------------------------------
+
+from __future__ import annotations
+
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Iterable
+
+import pandas as pd
+
+# 📂 Racine du store (une table = un dossier)
+STORE_DIR = Path("data/processed/store")
+DATA_FILE = "data.parquet"
+
+
+# ─────────────────────────────────────────────────────────────
+def table_path(name: str, store_dir: Path = STORE_DIR) -> Path:
+    """Retourne le dossier de la table `name`."""
+    return Path(store_dir) / name
+
+
+def table_exists(name: str, store_dir: Path = STORE_DIR) -> bool:
+    """True si la table contient au moins un fichier Parquet."""
+    path = table_path(name, store_dir)
+    return path.is_dir() and any(path.rglob("*.parquet"))
+
+
+# ─────────────────────────────────────────────────────────────
+def _swap_into_place(tmp_dir: Path, final_dir: Path) -> None:
+    """Remplace `final_dir` par `tmp_dir` (les lecteurs ne voient jamais de table à moitié écrite)."""
+    old_dir = final_dir.with_name(f".{final_dir.name}.old-{uuid.uuid4().hex[:8]}")
+    if final_dir.exists():
+        os.replace(final_dir, old_dir)
+    os.replace(tmp_dir, final_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def _tmp_dir_for(name: str, store_dir: Path) -> Path:
+    tmp = Path(store_dir) / f".{name}.tmp-{uuid.uuid4().hex[:8]}"
+    tmp.mkdir(parents=True)
+    return tmp
+
+
+# ─────────────────────────────────────────────────────────────
+def write_table(df: pd.DataFrame, name: str, store_dir: Path = STORE_DIR) -> Path:
+    """Écrit `df` dans la table `name` (écrase la version précédente)."""
+    return write_batches([df], name, store_dir)
+
+
+def write_batches(frames: Iterable[pd.DataFrame], name: str, store_dir: Path = STORE_DIR) -> Path:
+    """
+    Écrit un flux de DataFrames de même schéma dans la table `name`.
+    • Chaque lot devient un row group : la mémoire reste bornée à un lot.
+    • Les colonnes catégorielles sont stockées en dictionnaire Parquet.
+    """
+    import pyarrow as pa  # import différé : inutile aux simples lecteurs de core
+    import pyarrow.parquet as pq
+
+    final_dir = table_path(name, store_dir)
+    tmp_dir = _tmp_dir_for(name, store_dir)
+    writer = None
+    try:
+        for frame in frames:
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_dir / DATA_FILE, table.schema)
+            writer.write_table(table)
+        if writer is None:
+            raise ValueError(f"Aucune donnée à écrire dans la table « {name} ».")
+        writer.close()
+        writer = None
+        _swap_into_place(tmp_dir, final_dir)
+    finally:
+        if writer is not None:
+            writer.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return final_dir
+
+
+# ─────────────────────────────────────────────────────────────
+def read_table(name: str,
+               columns: list[str] | None = None,
+               store_dir: Path = STORE_DIR,
+               memory_map: bool = False) -> pd.DataFrame:
+    """
+    Relit la table `name` (partitions comprises).
+    • columns → seules ces colonnes sont lues depuis le disque.
+    • memory_map → fichiers projetés en mémoire plutôt que lus par blocs.
+    """
+    path = table_path(name, store_dir)
+    if not table_exists(name, store_dir):
+        raise FileNotFoundError(f"Table « {name} » introuvable dans le store → {path}")
+    return pd.read_parquet(path, columns=columns, memory_map=memory_map)
+
+
+def table_mtime(name: str, store_dir: Path = STORE_DIR) -> float | None:
+    """Date de la dernière écriture de la table (None si absente)."""
+    files = list(table_path(name, store_dir).rglob("*.parquet"))
+    return max(f.stat().st_mtime for f in files) if files else None
+
+
+# ─────────────────────────────────────────────────────────────
+def append_partitioned(df: pd.DataFrame,
+                       name: str,
+                       partition_col: str,
+                       key_cols: list[str],
+                       store_dir: Path = STORE_DIR) -> tuple[list[Path], int]:
+    """
+    Ajoute `df` à une table partitionnée (dossiers « colonne=valeur »).
+    • Seules les partitions touchées par `df` sont réécrites.
+    • Les lignes de même clé `key_cols` sont dédupliquées (la plus récente gagne),
+      ce qui rend l'appel idempotent lorsqu'on le relance.
+    Renvoie (partitions réécrites, nombre de lignes réellement ajoutées).
+    """
+    root = table_path(name, store_dir)
+    written: list[Path] = []
+    added = 0
+    for value, part in df.groupby(partition_col, sort=True, observed=True):
+        part_dir = root / f"{partition_col}={value}"
+        part_dir.mkdir(parents=True, exist_ok=True)
+        target = part_dir / DATA_FILE
+
+        part = part.drop(columns=[partition_col])
+        existing = 0
+        if target.exists():
+            old = pd.read_parquet(target)
+            existing = len(old)
+            part = pd.concat([old, part], ignore_index=True)
+        part = (
+            part.drop_duplicates(subset=key_cols, keep="last")
+                .sort_values(key_cols)
+                .reset_index(drop=True)
+        )
+
+        tmp = part_dir / f".{DATA_FILE}.tmp-{uuid.uuid4().hex[:8]}"
+        part.to_parquet(tmp, index=False)
+        os.replace(tmp, target)
+        written.append(target)
+        added += len(part) - existing
+    return written, added
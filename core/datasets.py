@@ -0,0 +1,307 @@
+# core/datasets.py – v2025-07-11
+# ------------------------------------------------------------
+# Registre des jeux de données + cache partagé par tout le processus
+# • get(name)         → DataFrame prêt (chargé une seule fois, thread-safe)
+# • start_warmup()    → précharge tous les jeux en arrière-plan, par priorité
+# • reload(name)      → recharge un jeu en arrière-plan puis le remplace
+#                       atomiquement (les sessions en cours gardent l'ancien)
+# • status()          → état de chaque jeu (pending / loading / ready / error)
+# • @by_version       → mémoïse un helper f(df, …) sur le jeton de version du
+#                       jeu au lieu de hacher le DataFrame à chaque rerun
+# Source : le bundle pré-traité (core.bundle) s'il a été construit,
+# sinon le loader brut du jeu (Excel / CSV / SQLite).
+# Les sessions Streamlit lisent toutes le même objet : ne jamais le modifier
+# en place (copier avant toute mutation).
+# ------------------------------------------------------------
+
+from __future__ import annotations
+
+import functools
+import importlib
+import itertools
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from core import bundle, runtime, schemas
+from core.instrumentation import timed
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    name: str
+    label: str
+    loader: str                    # "module:fonction", importé au premier chargement
+    priority: int = 100            # plus petit = préchargé en premier
+    sources: tuple[str, ...] = ()  # motifs glob des fichiers bruts (surveillés par core.reload)
+
+
+@dataclass(frozen=True)
+class LoadedDataset:
+    """Version chargée d'un jeu : remplacée d'un bloc, jamais modifiée."""
+    frame: pd.DataFrame
+    version: str
+    source: str
+    loaded_at: float
+    load_seconds: float
+
+
+@dataclass
+class DatasetEntry:
+    status: str = "pending"
+    current: LoadedDataset | None = None
+    error: str | None = None
+    reloading: bool = False
+    messages: list[tuple[str, str]] = field(default_factory=list)   # notifications du dernier chargement
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    reload_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+# ─────────────────────────────────────────────────────────────
+# Jeux de données connus (ordre de préchargement = priorité croissante)
+# ─────────────────────────────────────────────────────────────
+_registry: dict[str, DatasetSpec] = {}
+_entries: dict[str, DatasetEntry] = {}
+_guard = threading.Lock()
+_generation = itertools.count(1)
+
+
+def register(name: str, label: str, loader: str, priority: int = 100,
+             sources: tuple[str, ...] = ()) -> None:
+    """Déclare un jeu de données (sans le charger)."""
+    with _guard:
+        _registry[name] = DatasetSpec(name, label, loader, priority, sources)
+        _entries.setdefault(name, DatasetEntry())
+
+
+register("cpi", "World Bank – CPI", "core.world_bank_cpi_loader:load_wb_cpi_data", priority=10,
+         sources=("data/raw/world_bank/World Bank CPI (*.xlsx",))
+register("icp", "World Bank – ICP", "core.world_bank_icp_loader:load_icp_data", priority=20,
+         sources=("data/raw/world_bank/World Bank ICP.xlsx",))
+register("bis", "BIS – REER", "core.bis_loader:load_bis_reer_data", priority=30,
+         sources=("data/raw/bis/*.csv", "data/raw/bis/*.xlsx"))
+register("penn", "Penn World Table", "core.penn_loader:load_penn_data", priority=40,
+         sources=("data/raw/penn_world_table/Penn World Table.xlsx",))
+register("big_mac", "Big Mac Index", "core.big_mac:load_data", priority=50,
+         sources=("data/raw/big_mac/Big Mac Index.xlsx",))
+register("numbeo", "Numbeo", "core.numbeo_loader:load_numbeo_data", priority=60,
+         sources=("data/raw/numbeo/numbeo.db", "data/raw/numbeo/numbeo_fallback.csv"))
+
+
+def specs() -> list[DatasetSpec]:
+    """Jeux déclarés, triés par priorité."""
+    return sorted(_registry.values(), key=lambda s: s.priority)
+
+
+def spec(name: str) -> DatasetSpec:
+    return _registry[name]
+
+
+def _resolve(loader: str):
+    module, func = loader.split(":")
+    return getattr(importlib.import_module(module), func)
+
+
+def load_raw(name: str) -> pd.DataFrame:
+    """Exécute le loader brut du jeu (nettoyage + remodelage) puis applique son schéma."""
+    loader = _resolve(_registry[name].loader)
+    if hasattr(loader, "cache_clear"):  # loaders mémoïsés (lru_cache) → relecture forcée
+        loader.cache_clear()
+    return schemas.apply(name, loader())
+
+
+# ─────────────────────────────────────────────────────────────
+def _read(name: str) -> LoadedDataset:
+    """Lit le jeu depuis le bundle actif, sinon depuis sa source brute."""
+    start = time.perf_counter()
+    with timed(f"datasets.load.{name}"):
+        man = bundle.manifest()
+        if man is not None and name in man["datasets"]:
+            checksum = man["datasets"][name]["sha256"]
+            frame = schemas.conform(name, bundle.read_dataset(name, version=man["version"]))
+            source, version = "bundle", f"{name}-{checksum[:12]}"
+        else:
+            frame = load_raw(name)
+            source, version = "raw", f"{name}-raw{next(_generation)}"
+    return LoadedDataset(frame, version, source, time.time(), time.perf_counter() - start)
+
+
+def _load(name: str) -> LoadedDataset:
+    """Premier chargement de `name` ; un seul chargement à la fois par jeu."""
+    entry = _entries[name]
+    with entry.lock:
+        if entry.current is not None:
+            return entry.current
+        entry.status = "loading"
+        # Messages des loaders (ex. repli CSV) conservés pour la page, même si le
+        # chargement a lieu dans le pool de préchargement (pas de session où écrire)
+        with runtime.capture_notifications() as messages:
+            try:
+                loaded = _read(name)
+            except Exception as err:
+                entry.status = "error"
+                entry.error = f"{type(err).__name__}: {err}"
+                raise
+            finally:
+                entry.messages = messages
+        entry.current = loaded
+        entry.error = None
+        entry.status = "ready"
+        return loaded
+
+
+def get(name: str) -> pd.DataFrame:
+    """
+    Renvoie le DataFrame partagé du jeu `name`.
+    • Déjà préchargé → retour immédiat.
+    • En cours de préchargement → attend la fin du chargement en cours.
+    • Sinon → chargement synchrone (et nouvel essai après une erreur).
+    """
+    if name not in _registry:
+        raise KeyError(f"Jeu de données inconnu : {name}")
+    current = _entries[name].current
+    if current is not None:
+        return current.frame
+    return _load(name).frame
+
+
+def version(name: str) -> str | None:
+    """Jeton de version du jeu chargé (None s'il ne l'est pas encore)."""
+    current = _entries[name].current
+    return current.version if current is not None else None
+
+
+def version_of(df: pd.DataFrame) -> str | None:
+    """
+    Jeton de version si `df` est l'objet servi d'un jeu (test d'identité),
+    None pour tout autre DataFrame (copie, sous-ensemble filtré…).
+    """
+    for entry in _entries.values():
+        current = entry.current
+        if current is not None and current.frame is df:
+            return current.version
+    return None
+
+
+def by_version(func):
+    """
+    Mémoïse func(df, *args) sur (version du jeu, args) : aucun hachage du
+    DataFrame. Un df qui n'est pas un jeu servi est calculé sans cache.
+    Les résultats sont partagés entre sessions : ne pas les modifier en place.
+    """
+    memo: dict[tuple, object] = {}
+    lock = threading.Lock()
+
+    @functools.wraps(func)
+    def wrapper(df: pd.DataFrame, *args):
+        token = version_of(df)
+        if token is None:
+            return func(df, *args)
+        key = (token, args)
+        try:
+            return memo[key]
+        except KeyError:
+            pass
+        value = func(df, *args)
+        with lock:
+            # Purge des versions remplacées (rechargement à chaud)
+            live = {e.current.version for e in _entries.values() if e.current is not None}
+            for stale in [k for k in memo if k[0] not in live]:
+                del memo[stale]
+            memo[key] = value
+        return value
+
+    wrapper.cache_clear = memo.clear
+    return wrapper
+
+
+def reload(name: str, rebuild: bool = False,
+           on_bundle_written: Callable[[str, str], None] | None = None) -> bool:
+    """
+    Recharge `name` puis remplace la version servie en une seule affectation.
+    • rebuild=True → relance le loader brut et, si un bundle existe, écrit une
+      nouvelle version du bundle pour ce seul jeu (les autres sont repris) ;
+      on_bundle_written(version remplacée, version écrite) est alors appelé.
+    • En cas d'échec, l'ancienne version reste servie ; renvoie False.
+    """
+    entry = _entries[name]
+    with entry.reload_lock, runtime.capture_notifications() as messages:
+        entry.reloading = True
+        try:
+            previous = bundle.current_version()
+            if rebuild and previous is not None:
+                others = [s.name for s in specs() if s.name != name]
+                written = bundle.write_bundle({name: load_raw(name)}, carry_over=others).name
+                if on_bundle_written is not None:
+                    on_bundle_written(previous, written)
+            loaded = _read(name)
+        except Exception as err:
+            entry.error = f"{type(err).__name__}: {err}"
+            entry.messages = messages
+            return False
+        finally:
+            entry.reloading = False
+        with entry.lock:
+            entry.current = loaded
+            entry.error = None
+            entry.messages = messages
+            entry.status = "ready"
+        return True
+
+
+def status() -> list[dict]:
+    """État de chaque jeu déclaré, par priorité."""
+    rows = []
+    for s in specs():
+        entry = _entries[s.name]
+        current = entry.current
+        rows.append({
+            "name": s.name,
+            "label": s.label,
+            "status": entry.status,
+            "reloading": entry.reloading,
+            "version": current.version if current else None,
+            "source": current.source if current else None,
+            "load_seconds": current.load_seconds if current else None,
+            "error": entry.error,
+            "messages": list(entry.messages),
+        })
+    return rows
+
+
+def is_ready() -> bool:
+    """True quand plus aucun jeu n'attend ou ne charge."""
+    return all(_entries[s.name].status in ("ready", "error") for s in specs())
+
+
+# ─────────────────────────────────────────────────────────────
+# Préchargement en arrière-plan
+# ─────────────────────────────────────────────────────────────
+_warmup_pool: ThreadPoolExecutor | None = None
+
+
+def _warm(name: str) -> None:
+    try:
+        _load(name)
+    except Exception:
+        pass  # l'erreur est consignée dans status()
+
+
+def start_warmup(max_workers: int = 2) -> bool:
+    """
+    Lance (une seule fois par processus) le préchargement de tous les jeux,
+    par ordre de priorité, dans un pool de threads en arrière-plan.
+    Renvoie True si le préchargement vient d'être lancé.
+    """
+    global _warmup_pool
+    with _guard:
+        if _warmup_pool is not None:
+            return False
+        _warmup_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gpi-warmup")
+    for s in specs():
+        _warmup_pool.submit(_warm, s.name)
+    return True
@@ -0,0 +1,109 @@
+# core/date_dimension.py – v2025-07-11
+# ------------------------------------------------------------
+# Dimension date précalculée (une fois par version de jeu)
+# • Dates triées + clé entière AAAAMMJJ → une année ou un mois = une tranche
+#   contiguë (searchsorted), sans passe .dt.year / .dt.month / zfill
+# • years() / months(year) / days(year, month) → options des sélecteurs
+# • select(year, month, day) → positions dans l'entrée d'origine
+#   (contiguous() → tranche directe quand l'entrée est déjà triée par date)
+# • Utilisée par Big Mac (une dimension par identifiant) et BIS (colonnes-dates)
+# ------------------------------------------------------------
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class DateDimension:
+    key: np.ndarray                    # AAAAMMJJ (int64), trié
+    order: np.ndarray                  # key[i] ↔ position order[i] dans l'entrée
+    labels: np.ndarray | None = None   # libellés d'origine alignés sur l'entrée (ex. noms de colonnes)
+
+    # ─────────────────────────────────────────────────────────
+    @classmethod
+    def build(cls, dates, labels=None) -> "DateDimension":
+        """Dates (datetime-like) d'origine, NaT ignorées ; `labels` alignés sur `dates`."""
+        dt = pd.DatetimeIndex(pd.to_datetime(dates, errors="coerce"))
+        valid = ~dt.isna()
+        # NaT → année 0, écartée par from_parts
+        return cls.from_parts(np.where(valid, dt.year, 0), np.where(valid, dt.month, 0),
+                              np.where(valid, dt.day, 0), labels)
+
+    @classmethod
+    def from_parts(cls, year, month, day, labels=None) -> "DateDimension":
+        """Colonnes année / mois / jour entières déjà calculées (année ≤ 0 = date absente)."""
+        year, month, day = (np.asarray(a, dtype=np.int64) for a in (year, month, day))
+        valid = np.flatnonzero(year > 0)
+        key = year[valid] * 10000 + month[valid] * 100 + day[valid]
+        sort = np.argsort(key, kind="stable")
+        lab = None if labels is None else np.asarray(labels, dtype=object)
+        return cls(key[sort], valid[sort], lab)
+
+    @classmethod
+    def union(cls, dims: list["DateDimension"]) -> "DateDimension":
+        """Dimension des dates de plusieurs dimensions (positions non conservées)."""
+        key = np.unique(np.concatenate([d.key for d in dims])) if dims else np.empty(0, np.int64)
+        return cls(key, np.arange(len(key)))
+
+    def __len__(self) -> int:
+        return len(self.key)
+
+    # ─────────────────────────────────────────────────────────
+    def _span(self, year: int | None, month: int | None) -> slice:
+        if year is None:
+            return slice(0, len(self.key))
+        lo, hi = (year * 10000, (year + 1) * 10000) if month is None else \
+                 (year * 10000 + month * 100, year * 10000 + (month + 1) * 100)
+        return slice(int(np.searchsorted(self.key, lo)), int(np.searchsorted(self.key, hi)))
+
+    def _mask(self, year, month, day) -> np.ndarray | slice:
+        span = self._span(year, month)
+        if day is None and (month is None or year is not None):
+            return span                                  # tranche contiguë
+        # mois sans année / jour : filtre restreint à la tranche
+        sub = self.key[span]
+        mask = np.ones(len(sub), dtype=bool)
+        if month is not None and year is None:
+            mask &= sub // 100 % 100 == month
+        if day is not None:
+            mask &= sub % 100 == day
+        return np.arange(span.start, span.stop)[mask]
+
+    def years(self) -> list[int]:
+        return np.unique(self.key // 10000).tolist()
+
+    def months(self, year: int | None = None) -> list[int]:
+        return np.unique(self.key[self._span(year, None)] // 100 % 100).tolist()
+
+    def days(self, year: int | None = None, month: int | None = None) -> list[int]:
+        return np.unique(self.key[self._mask(year, month, None)] % 100).tolist()
+
+    def contiguous(self, year: int | None = None, month: int | None = None,
+                   day: int | None = None) -> slice | None:
+        """
+        Tranche des positions d'origine retenues si elle est contiguë (entrée déjà
+        triée par date, ex. disposition (identifiant, date) de Big Mac), sinon None.
+        """
+        mask = self._mask(year, month, day)
+        if not isinstance(mask, slice):
+            return None
+        if mask.stop <= mask.start:
+            return slice(0, 0)
+        pos = self.order[mask]
+        first = int(pos[0])
+        if not np.array_equal(pos, np.arange(first, first + len(pos))):
+            return None
+        return slice(first, first + len(pos))
+
+    def select(self, year: int | None = None, month: int | None = None, day: int | None = None) -> np.ndarray:
+        """Positions (dans l'entrée d'origine, ordre chronologique) des dates retenues."""
+        return self.order[self._mask(year, month, day)]
+
+    def labels_for(self, year: int | None = None, month: int | None = None, day: int | None = None) -> list:
+        if self.labels is None:
+            raise ValueError("Dimension construite sans libellés")
+        return self.labels[self.select(year, month, day)].tolist()
@@ -0,0 +1,109 @@
+# core/fx.py – v2025-07-11
+# ------------------------------------------------------------
+# Conversion de devises sur une table de taux mise en cache
+# • Matrice dense dates × devises (unités de devise pour 1 USD), construite
+#   une fois par version des jeux sources, trous comblés vers l'avant
+#   → taux « à date » = un searchsorted sur les dates + une lecture de matrice
+# • Conversion de colonnes entières en un appel vectorisé (aucune boucle par ligne)
+# • Sources : Big Mac (dollar_ex par devise et par édition) ; USD = 1
+#       table = fx.get_fx_table()
+#       eur = table.convert(prices, from_currencies, "EUR", dates)
+# ------------------------------------------------------------
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from core import datasets
+from core.instrumentation import timed
+
+BASE = "USD"
+
+# Symboles (Numbeo…) → code ISO ; symboles ambigus résolus par le pays
+SYMBOLS = {
+    "$": "USD", "US$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY", "R$": "BRL",
+    "C$": "CAD", "A$": "AUD", "₹": "INR", "руб": "RUB", "₽": "RUB", "MAD": "MAD",
+    "CHF": "CHF", "zł": "PLN", "₩": "KRW", "₺": "TRY", "R": "ZAR",
+}
+AMBIGUOUS = {
+    "kr": {"Sweden": "SEK", "Denmark": "DKK", "Norway": "NOK", "Iceland": "ISK"},
+}
+
+
+def resolve_symbol(symbol: str, country: str | None = None) -> str | None:
+    """Code ISO d'un symbole de devise (None si inconnu)."""
+    symbol = (symbol or "").strip()
+    if symbol in AMBIGUOUS:
+        return AMBIGUOUS[symbol].get((country or "").strip())
+    if len(symbol) == 3 and symbol.isupper() and symbol not in SYMBOLS:
+        return symbol
+    return SYMBOLS.get(symbol)
+
+
+@dataclass(frozen=True)
+class FxTable:
+    dates: np.ndarray           # (t,) datetime64[ns] triées
+    currencies: pd.Index        # (c,) codes ISO
+    per_usd: np.ndarray         # (t, c) unités de devise pour 1 USD, trous comblés vers l'avant
+
+    def _rows(self, dates) -> np.ndarray:
+        d = np.asarray(pd.to_datetime(dates), dtype="datetime64[ns]")
+        rows = np.searchsorted(self.dates, d, side="right") - 1
+        # NaT triée après toutes les dates : date inconnue → pas de taux (NaN)
+        return np.where(np.isnat(d), -1, rows)
+
+    def rates(self, currencies, dates=None) -> np.ndarray:
+        """
+        Unités de devise pour 1 USD au dernier taux connu à `dates`
+        (None → taux le plus récent). Devise / date inconnue → NaN.
+        """
+        cur = np.atleast_1d(np.asarray(currencies, dtype=object))
+        cols = self.currencies.get_indexer(cur)
+        rows = np.full(len(cur), len(self.dates) - 1) if dates is None else \
+            np.broadcast_to(self._rows(np.atleast_1d(dates)), cur.shape)
+        out = np.full(len(cur), np.nan)
+        ok = (cols >= 0) & (rows >= 0)
+        out[ok] = self.per_usd[rows[ok], cols[ok]]
+        return out
+
+    def rate(self, currency: str, date=None) -> float:
+        return float(self.rates([currency], None if date is None else [date])[0])
+
+    def factors(self, from_currencies, to_currency: str, dates=None) -> np.ndarray:
+        """Multiplicateurs devise source → `to_currency` (un par élément)."""
+        src = self.rates(from_currencies, dates)
+        cur = np.atleast_1d(np.asarray(from_currencies, dtype=object))
+        dst = self.rates(np.full(len(cur), to_currency, dtype=object), dates)
+        return dst / src
+
+    def convert(self, values, from_currencies, to_currency: str, dates=None) -> np.ndarray:
+        """Convertit une colonne entière vers `to_currency` (taux à date si `dates`)."""
+        return np.asarray(values, dtype="float64") * self.factors(from_currencies, to_currency, dates)
+
+
+# ─────────────────────────────────────────────────────────────
+def _big_mac_rates(df: pd.DataFrame) -> pd.DataFrame:
+    return df[["date", "currency_code", "dollar_ex"]].set_axis(["date", "currency", "per_usd"], axis=1)
+
+
+@datasets.by_version
+@timed("fx.build")
+def build_table(big_mac: pd.DataFrame) -> FxTable:
+    """Pivot dense dates × devises depuis les sources de taux ingérées."""
+    long = _big_mac_rates(big_mac)
+    long = long[long["per_usd"].gt(0) & long["date"].notna()]
+    wide = long.pivot_table(index="date", columns="currency", values="per_usd", aggfunc="last").sort_index()
+    wide[BASE] = 1.0
+    wide = wide.ffill()
+    return FxTable(wide.index.to_numpy("datetime64[ns]"), pd.Index(wide.columns), wide.to_numpy("float64"))
+
+
+def get_fx_table() -> FxTable:
+    return build_table(datasets.get("big_mac"))
+
+
+def currencies() -> list[str]:
+    return sorted(get_fx_table().currencies)
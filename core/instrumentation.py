@@ -0,0 +1,269 @@
+# core/instrumentation.py – v2025-07-10
+# ------------------------------------------------------------
+# Instrumentation légère des chemins chauds (chargement, filtrage, rendu)
+# • timed("étape")    → décorateur OU context manager
+# • histogrammes de latence (seaux fixes, format Prometheus)
+# • delta de mémoire résidente (RSS) par étape
+# • render_prometheus() / start_metrics_server() → export texte
+# Activation : GPI_INSTRUMENTATION=1 ou enable() ; désactivé, le coût
+# se résume à un test booléen par appel.
+# ------------------------------------------------------------
+
+from __future__ import annotations
+
+import functools
+import os
+import threading
+import time
+
+ENABLE_ENV = "GPI_INSTRUMENTATION"
+PORT_ENV = "GPI_METRICS_PORT"
+
+# Bornes supérieures des seaux de latence (secondes)
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+_enabled = os.environ.get(ENABLE_ENV, "") not in ("", "0", "false")
+_lock = threading.Lock()
+_stats: dict[str, "StageStats"] = {}
+_collectors: list = []
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+# ─────────────────────────────────────────────────────────────
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    """Efface toutes les mesures accumulées."""
+    with _lock:
+        _stats.clear()
+
+
+def rss_bytes() -> int:
+    """Mémoire résidente actuelle du processus (0 si indisponible)."""
+    try:
+        with open("/proc/self/statm", "rb") as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        try:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except (ImportError, OSError):
+            return 0
+
+
+# ─────────────────────────────────────────────────────────────
+class StageStats:
+    """Histogramme de latence + cumul des deltas mémoire d'une étape."""
+
+    __slots__ = ("counts", "count", "total", "max", "mem_delta_total", "mem_delta_last")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.mem_delta_total = 0
+        self.mem_delta_last = 0
+
+    def observe(self, seconds: float, mem_delta: int) -> None:
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.mem_delta_total += mem_delta
+        self.mem_delta_last = mem_delta
+
+    def quantile(self, q: float) -> float:
+        """Estimation d'un quantile : borne supérieure du seau qui le contient."""
+        if not self.count:
+            return 0.0
+        target, seen = q * self.count, 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+
+def record(stage: str, seconds: float, mem_delta: int = 0) -> None:
+    """Enregistre une mesure pour `stage` (sans effet si l'instrumentation est coupée)."""
+    if not _enabled:
+        return
+    with _lock:
+        stats = _stats.get(stage)
+        if stats is None:
+            stats = _stats[stage] = StageStats()
+        stats.observe(seconds, mem_delta)
+
+
+# ─────────────────────────────────────────────────────────────
+class timed:
+    """
+    Mesure la durée et le delta RSS d'une étape.
+
+        @timed("bis.load")
+        def load_bis_reer_data(): ...
+
+        with timed("bis.block.filter"):
+            ...
+    """
+
+    __slots__ = ("stage", "_start", "_rss")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._start = None
+        self._rss = 0
+
+    def __enter__(self):
+        if _enabled:
+            self._rss = rss_bytes()
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self._start is not None:
+            elapsed = time.perf_counter() - self._start
+            record(self.stage, elapsed, rss_bytes() - self._rss)
+            self._start = None
+        return False
+
+    def __call__(self, func):
+        stage = self.stage
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with timed(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+
+# ─────────────────────────────────────────────────────────────
+def snapshot() -> list[dict]:
+    """Résumé par étape (trié par temps cumulé décroissant)."""
+    with _lock:
+        rows = [
+            {
+                "stage": stage,
+                "count": s.count,
+                "total_s": s.total,
+                "mean_ms": s.total / s.count * 1e3 if s.count else 0.0,
+                "p50_ms": s.quantile(0.50) * 1e3,
+                "p95_ms": s.quantile(0.95) * 1e3,
+                "max_ms": s.max * 1e3,
+                "mem_delta_last_mb": s.mem_delta_last / 2**20,
+                "mem_delta_total_mb": s.mem_delta_total / 2**20,
+            }
+            for stage, s in _stats.items()
+        ]
+    return sorted(rows, key=lambda r: r["total_s"], reverse=True)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus() -> str:
+    """Exporte toutes les mesures au format texte Prometheus."""
+    lines = [
+        "# HELP gpi_stage_seconds Latency of instrumented stages.",
+        "# TYPE gpi_stage_seconds histogram",
+    ]
+    with _lock:
+        items = sorted(_stats.items())
+        for name, s in items:
+            stage = _label(name)
+            cumulative = 0
+            for bound, n in zip(BUCKETS, s.counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'gpi_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'gpi_stage_seconds_sum{{stage="{stage}"}} {s.total}')
+            lines.append(f'gpi_stage_seconds_count{{stage="{stage}"}} {s.count}')
+        lines += [
+            "# HELP gpi_stage_rss_delta_bytes Cumulated resident memory delta per stage.",
+            "# TYPE gpi_stage_rss_delta_bytes gauge",
+        ]
+        for name, s in items:
+            stage = _label(name)
+            lines.append(f'gpi_stage_rss_delta_bytes{{stage="{stage}"}} {s.mem_delta_total}')
+    lines += [
+        "# HELP gpi_process_rss_bytes Resident memory of the process.",
+        "# TYPE gpi_process_rss_bytes gauge",
+        f"gpi_process_rss_bytes {rss_bytes()}",
+    ]
+    for collect in list(_collectors):
+        lines += collect()
+    return "\n".join(lines) + "\n"
+
+
+def register_collector(collect) -> None:
+    """Ajoute des lignes Prometheus produites par un autre module (ex. cache de résultats)."""
+    if collect not in _collectors:
+        _collectors.append(collect)
+
+
+# ─────────────────────────────────────────────────────────────
+def _metrics_handler():
+    """Classe de requête /metrics (http.server importé à la demande : ~20 ms)."""
+    from http.server import BaseHTTPRequestHandler
+
+    class _MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return _MetricsHandler
+
+
+_server = None  # http.server.ThreadingHTTPServer, importé au démarrage seulement
+
+
+def start_metrics_server(port: int | None = None):
+    """
+    Démarre (une seule fois par processus) un serveur HTTP exposant /metrics.
+    • port None → variable GPI_METRICS_PORT ; rien n'est démarré si elle est absente.
+    """
+    global _server
+    if port is None:
+        port = int(os.environ[PORT_ENV]) if os.environ.get(PORT_ENV) else None
+    if port is None:
+        return None
+    from http.server import ThreadingHTTPServer
+    with _lock:
+        if _server is None:
+            _server = ThreadingHTTPServer(("0.0.0.0", port), _metrics_handler())
+            threading.Thread(target=_server.serve_forever, name="gpi-metrics", daemon=True).start()
+    return _server
@@ -0,0 +1,139 @@
+# core/numbeo_basket.py – v2025-07-11
+# ------------------------------------------------------------
+# Paniers « coût de la vie » Numbeo, calculés pour toutes les villes d'un coup
+# • Matrice de prix typée (numbeo_loader.get_price_matrix, une fois par version)
+# • Plusieurs paniers = une multiplication matricielle (villes × variables) @ (variables × paniers)
+# • Pouvoir d'achat = salaire local / coût du panier (sans devise → comparable)
+# • Comparaisons ville × ville en un seul broadcast (ratio v[i] / v[j])
+# • Coûts en devise commune si un taux par ville est fourni (ex. core.fx)
+# ------------------------------------------------------------
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from core.instrumentation import timed
+from core.numbeo_loader import PriceMatrix
+
+SALARY = "salary"
+MEASURES = ("purchasing_power", "share_of_salary", "cost", "cost_common")
+
+# Paniers mensuels prédéfinis (quantités par variable)
+PRESETS: dict[str, dict[str, float]] = {
+    "Single, renting outside centre": {
+        "simple_apartment_outside": 1, "base_cost": 1, "internet": 1,
+        "monthly_pass": 1, "common_meal": 8, "meal_for_two": 2,
+    },
+    "Single, renting in centre": {
+        "simple_apartment_centre": 1, "base_cost": 1, "internet": 1,
+        "monthly_pass": 1, "common_meal": 12, "meal_for_two": 3,
+    },
+    "Family, large flat outside centre": {
+        "large_apartment_outside": 1, "base_cost": 1.5, "internet": 1,
+        "monthly_pass": 2, "gasoline": 40, "meal_for_two": 4,
+    },
+}
+
+
+@dataclass(frozen=True)
+class BasketResult:
+    cities: np.ndarray                  # (n,)
+    currencies: np.ndarray              # (n,)
+    baskets: list[str]                  # (b,)
+    cost: np.ndarray                    # (n, b) devise locale
+    salary: np.ndarray                  # (n,) devise locale
+    rates: np.ndarray | None = None     # (n,) local → devise commune
+
+    @property
+    def purchasing_power(self) -> np.ndarray:
+        """Paniers finançables par un salaire mensuel local (n, b)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.salary[:, None] / self.cost
+
+    @property
+    def share_of_salary(self) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.cost / self.salary[:, None]
+
+    @property
+    def cost_common(self) -> np.ndarray | None:
+        return None if self.rates is None else self.cost * self.rates[:, None]
+
+    def index(self, reference: str, measure: str = "purchasing_power", basket: int = 0) -> np.ndarray:
+        """Indice base 100 = ville de référence."""
+        values = self._measure(measure)[:, basket]
+        ref = values[self._position(reference)]
+        return values / ref * 100
+
+    def compare(self, measure: str = "purchasing_power", basket: int = 0,
+                cities: list[str] | None = None) -> pd.DataFrame:
+        """Matrice ville × ville : valeur(ligne) / valeur(colonne), en un broadcast."""
+        values = self._measure(measure)[:, basket]
+        idx = np.arange(len(self.cities)) if cities is None else np.array([self._position(c) for c in cities])
+        v = values[idx]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = v[:, None] / v[None, :]
+        return pd.DataFrame(ratio, index=self.cities[idx], columns=self.cities[idx])
+
+    def to_frame(self, basket: int = 0, reference: str | None = None) -> pd.DataFrame:
+        out = pd.DataFrame({
+            "city": self.cities,
+            "currency": self.currencies,
+            "basket_cost": self.cost[:, basket],
+            "salary": self.salary,
+            "share_of_salary": self.share_of_salary[:, basket],
+            "purchasing_power": self.purchasing_power[:, basket],
+        })
+        if self.rates is not None:
+            out["basket_cost_common"] = self.cost_common[:, basket]
+        if reference is not None:
+            out["pp_index"] = self.index(reference, basket=basket)
+        return out
+
+    # ─────────────────────────────────────────────────────────
+    def _measure(self, measure: str) -> np.ndarray:
+        if measure not in MEASURES:
+            raise ValueError(f"Mesure inconnue : {measure} (choix : {', '.join(MEASURES)})")
+        values = getattr(self, measure)
+        if values is None:
+            raise ValueError(f"Mesure indisponible sans taux de change : {measure}")
+        return values
+
+    def _position(self, city: str) -> int:
+        hits = np.flatnonzero(self.cities == city)
+        if not len(hits):
+            raise KeyError(f"Ville inconnue : {city}")
+        return int(hits[0])
+
+
+# ─────────────────────────────────────────────────────────────
+def weight_matrix(matrix: PriceMatrix, baskets: dict[str, dict[str, float]]) -> np.ndarray:
+    """(variables × paniers) ; les variables inconnues sont ignorées."""
+    col = {v: j for j, v in enumerate(matrix.variables)}
+    w = np.zeros((len(matrix.variables), len(baskets)), dtype="float64")
+    for b, weights in enumerate(baskets.values()):
+        for var, qty in weights.items():
+            if var in col and var != SALARY:
+                w[col[var], b] = qty
+    return w
+
+
+@timed("numbeo.basket")
+def evaluate(matrix: PriceMatrix, baskets: dict[str, dict[str, float]],
+             rates: np.ndarray | None = None) -> BasketResult:
+    """
+    Coût de chaque panier dans chaque ville (une matmul). Un prix manquant
+    utilisé par un panier rend son coût NaN pour la ville concernée.
+    """
+    w = weight_matrix(matrix, baskets)
+    used = w.any(axis=1)
+    prices, w = matrix.values[:, used], w[used]
+    # NaN × 0 = NaN : seuls les prix réellement pondérés propagent l'absence
+    cost = np.nan_to_num(prices) @ w
+    cost[np.isnan(prices) @ (w != 0)] = np.nan
+    salary = matrix.column(SALARY) if SALARY in matrix.variables else np.full(len(matrix.cities), np.nan)
+    return BasketResult(matrix.cities, matrix.currencies, list(baskets), cost, salary,
+                        None if rates is None else np.asarray(rates, dtype="float64"))
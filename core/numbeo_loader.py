@@ -3,19 +3,25 @@
 # • Chargement robuste de la base SQLite (ou fallback CSV)
 # • Extraction dynamique des régions et variables
 # • Filtrage basé sur régions + variables
+# • Matrice de prix typée (villes × variables, float64 + devise par ville)
 # ------------------------------------------------------------
 
+from dataclasses import dataclass
 from pathlib import Path
+import re
 import sqlite3
+import numpy as np
 import pandas as pd
-import streamlit as st
+
+from core import datasets, fx, query_engine, runtime
+from core.instrumentation import timed
 
 # 📂 Chemins vers les fichiers
 DB_PATH = Path("data/raw/numbeo/numbeo.db")
 FALLBACK_CSV = Path("data/raw/numbeo/numbeo_fallback.csv")  # facultatif
 
 # ─────────────────────────────────────────────────────────────
-@st.cache_data(show_spinner=False)
+@timed("numbeo.load")
 def load_numbeo_data(db_path: Path = DB_PATH) -> pd.DataFrame:
     """
     Charge les données de Numbeo depuis la base SQLite (table principale).
@@ -31,15 +37,16 @@ def load_numbeo_data(db_path: Path = DB_PATH) -> pd.DataFrame:
                 df.columns = df.columns.str.strip()
                 return df
         except Exception as e:
-            st.warning(f"⚠️ Échec de lecture du fichier SQLite ({e}). Tentative avec CSV…")
+            runtime.notify("warning", f"⚠️ Échec de lecture du fichier SQLite ({e}). Tentative avec CSV…")
 
     if FALLBACK_CSV.exists():
-        st.info("📄 Chargement du CSV de secours pour Numbeo.")
+        runtime.notify("info", "📄 Chargement du CSV de secours pour Numbeo.")
         return pd.read_csv(FALLBACK_CSV)
 
     raise FileNotFoundError("Aucune source valide trouvée pour les données Numbeo.")
 
 # ─────────────────────────────────────────────────────────────
+@datasets.by_version
 def get_city_options(df: pd.DataFrame) -> list[str]:
     """
     Retourne la liste triée des régions (colonne 'name').
@@ -49,6 +56,7 @@ def get_city_options(df: pd.DataFrame) -> list[str]:
     return sorted(df["name"].dropna().astype(str).str.strip().unique())
 
 # ─────────────────────────────────────────────────────────────
+@datasets.by_version
 def get_variable_options(df: pd.DataFrame) -> list[str]:
     """
     Retourne les variables disponibles à l'exception des colonnes non quantitatives.
@@ -57,6 +65,7 @@ def get_variable_options(df: pd.DataFrame) -> list[str]:
     return [col for col in df.columns if col not in exclude]
 
 # ─────────────────────────────────────────────────────────────
+@timed("numbeo.filter")
 def filter_numbeo_data(df: pd.DataFrame, regions: list[str], variables: list[str]) -> pd.DataFrame:
     """
     Applique les filtres de régions et de variables, retourne un DataFrame propre.
@@ -64,12 +73,66 @@ def filter_numbeo_data(df: pd.DataFrame, regions: list[str], variables: list[str
     if "name" not in df.columns:
         raise ValueError("🧭 Colonne 'name' manquante dans les données Numbeo.")
 
+    base_cols = ["name"]
+    if "status" in df.columns:
+        base_cols.append("status")
+
+    # Moteur paresseux : filtre régions + projection en une seule requête
+    if query_engine.lazy_enabled():
+        # Sans région : aucun IN, seules les lignes sans nom sont écartées
+        where = {"name": regions} if regions else {"name": query_engine.NOT_NULL}
+        return query_engine.run_query(df, where, base_cols + variables)
+
     if not regions:
         regions = df["name"].dropna().unique().tolist()
 
     subset = df[df["name"].isin(regions)].copy()
-    base_cols = ["name"]
-    if "status" in df.columns:
-        base_cols.append("status")
 
     return subset[base_cols + variables].reset_index(drop=True)
+
+
+# ─────────────────────────────────────────────────────────────
+# Matrice de prix typée : "3,024.24 R$" → 3024.24 (devise "R$")
+# ─────────────────────────────────────────────────────────────
+_AMOUNT = re.compile(r"^\s*(-?[\d,]*\.?\d+)\s*(.*?)\s*$")
+
+
+@dataclass(frozen=True)
+class PriceMatrix:
+    cities: np.ndarray          # (n,) noms de ville
+    variables: list[str]        # (k,) colonnes de prix
+    values: np.ndarray          # (n, k) float64, NaN si absent / illisible
+    currencies: np.ndarray      # (n,) symbole de devise de chaque ville ("" si inconnu)
+    codes: np.ndarray           # (n,) code ISO de la devise (None si inconnu, cf. core.fx)
+    as_of: np.ndarray           # (n,) date de mise à jour (colonne status), NaT sinon
+
+    def column(self, variable: str) -> np.ndarray:
+        return self.values[:, self.variables.index(variable)]
+
+
+def _parse_amounts(col: pd.Series) -> tuple[np.ndarray, pd.Series]:
+    parts = col.astype("string").str.extract(_AMOUNT)
+    values = pd.to_numeric(parts[0].str.replace(",", "", regex=False), errors="coerce")
+    return values.to_numpy("float64", na_value=np.nan), parts[1].fillna("")
+
+
+@datasets.by_version
+def get_price_matrix(df: pd.DataFrame) -> PriceMatrix:
+    """Convertit une fois par version les colonnes texte en matrice float64."""
+    variables = get_variable_options(df)
+    values = np.empty((len(df), len(variables)), dtype="float64")
+    symbols = []
+    for j, var in enumerate(variables):
+        values[:, j], sym = _parse_amounts(df[var])
+        symbols.append(sym)
+    # Devise de la ville : symbole le plus fréquent sur ses colonnes
+    currencies = (pd.concat(symbols, axis=1).replace("", pd.NA).mode(axis=1)[0].fillna("")
+                  .to_numpy(dtype=object)) if symbols else np.full(len(df), "", dtype=object)
+    cities = df["name"].astype(str).str.strip().to_numpy(dtype=object)
+    # "kr" & co : le pays (après la dernière virgule) lève l'ambiguïté
+    codes = np.array([fx.resolve_symbol(sym, city.rsplit(",", 1)[-1]) for sym, city in zip(currencies, cities)],
+                     dtype=object)
+    status = df["status"] if "status" in df.columns else pd.Series(pd.NA, index=df.index)
+    as_of = pd.to_datetime(status.astype("string").str.replace("Last update:", "", regex=False).str.strip(),
+                           errors="coerce", format="mixed").to_numpy("datetime64[ns]")
+    return PriceMatrix(cities, variables, values, currencies, codes, as_of)
@@ -5,19 +5,31 @@
 # Expected file location (default):
 #   data/raw/penn_world_table/Penn World Table.xlsx
 # If you rename / relocate the file, pass the new path to load_penn_data().
+# Column-pruned reads: load_penn_columns() (bundle Parquet when available)
+# Panel extraction:    extract_panel() → country × year × variable array
 
+from dataclasses import dataclass
 from pathlib import Path
 from functools import lru_cache
+import numpy as np
 import pandas as pd
-import streamlit as st
+
+from core import bundle, datasets, query_engine
+from core.instrumentation import timed
 
 DEFAULT_PATH = Path("data/raw/penn_world_table/Penn World Table.xlsx")
+ID_COLS = ["countrycode", "country", "currency_unit", "year"]
+
+
+def _standardise(name) -> str:
+    return str(name).strip().lower().replace(" ", "_")
 
 # ------------------------------------------------------------------
 # 1) LOAD DATA ------------------------------------------------------
 # ------------------------------------------------------------------
 
 @lru_cache(maxsize=1)
+@timed("penn.load")
 def load_penn_data(path: Path | str = DEFAULT_PATH) -> pd.DataFrame:
     """Loads the Penn World Table Excel file into a DataFrame."""
     file_path = Path(path)
@@ -27,33 +39,57 @@ def load_penn_data(path: Path | str = DEFAULT_PATH) -> pd.DataFrame:
     df = pd.read_excel(file_path)
 
     # Standardise column names (strip, lower, replace spaces with _)
-    df.columns = [c.strip().lower().replace(" ", "_") for c in df.columns]
+    df.columns = [_standardise(c) for c in df.columns]
     return df
 
+
+@timed("penn.load_columns")
+def load_penn_columns(variables: list[str],
+                      countries: list[str] | None = None) -> pd.DataFrame:
+    """Id columns + `variables` only, read from the cheapest available source.
+
+    • Bundle built (scripts/build_data.py) → Parquet column projection, plus
+      a row filter on `countries` pushed down to the reader.
+    • Otherwise → projection of the shared in-memory frame (core.datasets).
+    """
+    columns = ID_COLS + [v for v in variables if v not in ID_COLS]
+    if bundle.has_dataset("penn"):
+        filters = [("country", "in", list(countries))] if countries else None
+        return bundle.read_dataset("penn", columns=columns, filters=filters)
+
+    df = datasets.get("penn")
+    if countries:
+        df = df[df["country"].isin(countries)]
+    return df[columns].reset_index(drop=True)
+
 # ------------------------------------------------------------------
 # 2) OPTIONS HELPERS ------------------------------------------------
 # ------------------------------------------------------------------
 
-@st.cache_data
+@datasets.by_version
 def get_country_options(df: pd.DataFrame) -> list[str]:
     """Returns a sorted list of country names."""
     return sorted(df["country"].dropna().unique())
 
 
-@st.cache_data
-def get_variable_options(df: pd.DataFrame) -> list[str]:
-    """Returns numeric variable columns (excluding id columns)."""
-    exclude = {"countrycode", "country", "currency_unit", "year"}
-    numeric_cols = [
+def _numeric_variables(df: pd.DataFrame) -> list[str]:
+    """Numeric variable columns (excluding id columns) – dtype checks only."""
+    return [
         c for c in df.columns
-        if c not in exclude and pd.api.types.is_numeric_dtype(df[c])
+        if c not in ID_COLS and pd.api.types.is_numeric_dtype(df[c])
     ]
-    return numeric_cols
+
+
+@datasets.by_version
+def get_variable_options(df: pd.DataFrame) -> list[str]:
+    """Returns numeric variable columns (excluding id columns)."""
+    return _numeric_variables(df)
 
 # ------------------------------------------------------------------
 # 3) FILTER FUNCTION ------------------------------------------------
 # ------------------------------------------------------------------
 
+@timed("penn.filter")
 def filter_penn_data(
     df: pd.DataFrame,
     country: str,
@@ -68,6 +104,15 @@ def filter_penn_data(
         variables (list[str] | None): variables to keep (None = all)
         years (list[int] | None): list of years; None = all years
     """
+    id_cols = ID_COLS
+
+    # Lazy engine: country/year predicates and projection in one query
+    if query_engine.lazy_enabled():
+        where = {"country": country}
+        if years is not None:
+            where["year"] = years
+        return query_engine.run_query(df, where, id_cols + (variables or _numeric_variables(df)))
+
     # Filter by country
     df = df[df["country"] == country]
 
@@ -76,14 +121,73 @@ def filter_penn_data(
         df = df[df["year"].isin(years)]
 
     # Keep id columns + selected variables
-    id_cols = ["countrycode", "country", "currency_unit", "year"]
     if variables:
         keep_cols = id_cols + variables
     else:
-        keep_cols = id_cols + get_variable_options(df)
+        keep_cols = id_cols + _numeric_variables(df)
 
     return df[keep_cols].reset_index(drop=True)
 
+# ------------------------------------------------------------------
+# 4) PANEL EXTRACTION -----------------------------------------------
+# ------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class PennPanel:
+    """Dense panel: values[i, j, k] = variables[k] of countries[i] in years[j] (NaN if absent)."""
+    values: np.ndarray
+    countries: np.ndarray
+    years: np.ndarray
+    variables: list[str]
+
+    def sel(self, country: str) -> pd.DataFrame:
+        """Year × variable table of one country."""
+        i = int(np.searchsorted(self.countries, country))
+        if i >= len(self.countries) or self.countries[i] != country:
+            raise KeyError(country)
+        return pd.DataFrame(self.values[i], index=pd.Index(self.years, name="year"), columns=self.variables)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Back to long-ish format: (country, year) index, one column per variable."""
+        index = pd.MultiIndex.from_product([self.countries, self.years], names=["country", "year"])
+        return pd.DataFrame(self.values.reshape(-1, len(self.variables)), index=index, columns=self.variables)
+
+
+@timed("penn.panel")
+def extract_panel(
+    variables: list[str],
+    countries: list[str] | None = None,
+    years: list[int] | None = None,
+    df: pd.DataFrame | None = None,
+) -> PennPanel:
+    """Country × year × variable float64 array for many countries at once.
+
+    Args:
+        variables: variables to stack on the last axis (order kept)
+        countries: country names; None = all countries present
+        years: years to keep; None = every year present
+        df: source frame; None = column-pruned read (load_penn_columns)
+    """
+    if df is None:
+        df = load_penn_columns(variables, countries)
+    elif countries:
+        df = df[df["country"].isin(countries)]
+    if years is not None:
+        df = df[df["year"].isin(years)]
+    df = df.dropna(subset=["country", "year"])
+
+    country_axis = np.unique(np.asarray(countries if countries else df["country"].unique(), dtype=object))
+    year_axis = np.unique(np.asarray(years if years is not None else df["year"].unique(), dtype=np.int64))
+
+    # Positions on each axis (vectorised); -1 = outside the requested axes
+    ci = pd.Index(country_axis).get_indexer(df["country"])
+    yi = pd.Index(year_axis).get_indexer(df["year"].astype(np.int64))
+    ok = (ci >= 0) & (yi >= 0)
+
+    values = np.full((len(country_axis), len(year_axis), len(variables)), np.nan)
+    values[ci[ok], yi[ok], :] = df[variables].to_numpy(dtype=np.float64)[ok]
+    return PennPanel(values, country_axis, year_axis, list(variables))
+
 # ------------------------------------------------------------------
 # Quick test --------------------------------------------------------
 # ------------------------------------------------------------------
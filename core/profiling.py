@@ -0,0 +1,261 @@
+# core/profiling.py – v2025-07-11
+# ------------------------------------------------------------
+# Profilage opt-in d'un rerun, limité à la session qui le demande
+# • Échantillonneur : un thread lit la pile du thread du script toutes les
+#   GPI_PROFILE_INTERVAL_MS ms (sys._current_frames) ; les autres sessions
+#   ne sont ni échantillonnées ni instrumentées
+# • Opérations pandas lues dans les piles échantillonnées (temps par opération,
+#   sans surcoût) ; comptage exact des appels en option (sys.setprofile sur le
+#   seul thread profilé, ~2× plus lent : les durées mesurées sont alors faussées)
+# • Les wrappers de pandas (décorateurs, `<locals>`) sont résolus vers la
+#   fonction publique qu'ils enveloppent
+# • Sorties dans data/profiles/ :
+#     <id>.speedscope.json  → https://www.speedscope.app
+#     <id>.collapsed.txt    → flamegraph.pl / inferno
+#     <id>.json             → résumé (durée, échantillons, opérations pandas)
+# Activation : bouton « Profile next rerun » (session courante), ?profile=1
+# (premier rerun d'une nouvelle session) ou GPI_PROFILE=1 (tous les reruns) ;
+# ?profile=calls / GPI_PROFILE=calls ajoutent le comptage exact des appels
+# ------------------------------------------------------------
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+ENABLE_ENV = "GPI_PROFILE"
+INTERVAL_ENV = "GPI_PROFILE_INTERVAL_MS"
+PROFILE_DIR = Path("data/profiles")
+KEEP_PROFILES = 50
+
+_PANDAS_DIR = os.path.dirname(pd.__file__) + os.sep
+SAMPLE, CALLS = "sample", "calls"     # modes de profilage
+SESSION_FLAG = "_gpi_profile_next"    # clé d'état : profiler le prochain rerun de la session
+
+
+def mode_from(value: str | None) -> str | None:
+    """Mode demandé par un paramètre / une variable : None, SAMPLE ou CALLS."""
+    if value in (None, "", "0", "false"):
+        return None
+    return CALLS if value == CALLS else SAMPLE
+
+
+def env_mode() -> str | None:
+    return mode_from(os.environ.get(ENABLE_ENV))
+
+
+def _is_pandas(code) -> bool:
+    return code.co_filename.startswith(_PANDAS_DIR)
+
+
+def _qualname(code) -> str:
+    return getattr(code, "co_qualname", code.co_name)
+
+
+def _is_wrapper(code) -> bool:
+    """Fonction interne générée par un décorateur pandas (ex. `…<locals>.wrapper`)."""
+    return "<locals>" in _qualname(code)
+
+
+def _interval() -> float:
+    return max(float(os.environ.get(INTERVAL_ENV, "5")), 0.5) / 1000
+
+
+# ─────────────────────────────────────────────────────────────
+class RerunProfiler:
+    """Échantillonne la pile d'un thread entre start() et stop()."""
+
+    def __init__(self, label: str, interval: float | None = None, count_calls: bool = False):
+        self.label = label
+        self.interval = interval or _interval()
+        self.count_calls = count_calls
+        self.frames: list[tuple[str, str, int]] = []
+        self._frame_ids: dict[tuple[str, str, int], int] = {}
+        self.samples: list[tuple[int, ...]] = []
+        self.weights: list[float] = []
+        self.pandas_calls: Counter = Counter()
+        self._is_pandas: dict[int, bool] = {}     # id de cadre → code pandas ?
+        self._stop = threading.Event()
+
+    # ── échantillonnage ─────────────────────────────────────
+    def _frame_id(self, code) -> int:
+        key = (_qualname(code), code.co_filename, code.co_firstlineno)
+        idx = self._frame_ids.get(key)
+        if idx is None:
+            idx = self._frame_ids[key] = len(self.frames)
+            self.frames.append(key)
+        return idx
+
+    def _sample_loop(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._tid)
+            now = time.perf_counter()
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_id(frame.f_code))
+                self._is_pandas.setdefault(stack[-1], _is_pandas(frame.f_code))
+                if frame is self._root:  # rien au-dessus du code profilé (runner Streamlit)
+                    break
+                frame = frame.f_back
+            if stack:
+                self.samples.append(tuple(reversed(stack)))
+                self.weights.append((now - last) * 1e3)
+            last = now
+
+    # ── comptage exact des appels pandas (opt-in, thread profilé uniquement) ──
+    def _hook(self, frame, event, arg):
+        code = frame.f_code
+        if event == "call" and _is_pandas(code) and not _is_wrapper(code):
+            # Remonte les wrappers pandas : compté si appelé depuis le code de l'application
+            back = frame.f_back
+            while back is not None and _is_pandas(back.f_code) and _is_wrapper(back.f_code):
+                back = back.f_back
+            if back is not None and not _is_pandas(back.f_code):
+                self.pandas_calls[_qualname(code)] += 1
+        if self._previous_hook is not None:
+            self._previous_hook(frame, event, arg)
+
+    def pandas_ops(self) -> Counter:
+        """
+        Temps (ms) par opération pandas appelée depuis l'application, lu dans
+        les piles échantillonnées : première fonction pandas non-wrapper
+        sous la frontière application → pandas.
+        """
+        ops: Counter = Counter()
+        for stack, weight in zip(self.samples, self.weights):
+            entry = next((d for d, idx in enumerate(stack) if self._is_pandas[idx]), None)
+            if entry is None:
+                continue
+            op = stack[entry]
+            for idx in stack[entry:]:
+                if not self._is_pandas[idx]:
+                    break
+                if "<locals>" not in self.frames[idx][0]:
+                    op = idx
+                    break
+            ops[self.frames[op][0]] += weight
+        return ops
+
+    # ─────────────────────────────────────────────────────────
+    def start(self, root_frame=None) -> None:
+        self._tid = threading.get_ident()
+        self._root = root_frame or sys._getframe(1)
+        self._previous_hook = sys.getprofile()
+        if self.count_calls:
+            sys.setprofile(self._hook)
+        self._t0 = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample_loop, name="gpi-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.wall_ms = (time.perf_counter() - self._t0) * 1e3
+        if self.count_calls:
+            sys.setprofile(self._previous_hook)
+        self._stop.set()
+        self._thread.join()
+
+    # ── exports ─────────────────────────────────────────────
+    def speedscope(self) -> dict:
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "gpi-profiling",
+            "name": self.label,
+            "shared": {"frames": [{"name": n, "file": f, "line": l} for n, f, l in self.frames]},
+            "profiles": [{
+                "type": "sampled",
+                "name": self.label,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(self.weights), 3),
+                "samples": [list(s) for s in self.samples],
+                "weights": [round(w, 3) for w in self.weights],
+            }],
+        }
+
+    def collapsed(self) -> str:
+        """Piles repliées « a;b;c poids » (poids en microsecondes)."""
+        totals: Counter = Counter()
+        for stack, weight in zip(self.samples, self.weights):
+            totals[";".join(f"{self.frames[i][0]} ({Path(self.frames[i][1]).name}:{self.frames[i][2]})"
+                            for i in stack)] += weight
+        return "\n".join(f"{k} {int(v * 1000)}" for k, v in totals.most_common()) + "\n"
+
+    def summary(self) -> dict:
+        self_time: Counter = Counter()
+        for stack, weight in zip(self.samples, self.weights):
+            self_time[self.frames[stack[-1]][0]] += weight
+        return {
+            "label": self.label,
+            "wall_ms": round(self.wall_ms, 1),
+            "samples": len(self.samples),
+            "interval_ms": self.interval * 1e3,
+            "pandas_ops_ms": {k: round(v, 1) for k, v in self.pandas_ops().most_common()},
+            "pandas_calls": dict(self.pandas_calls.most_common()) if self.count_calls else None,
+            "top_self_ms": {k: round(v, 1) for k, v in self_time.most_common(15)},
+        }
+
+
+# ─────────────────────────────────────────────────────────────
+def _write(profiler: RerunProfiler, profile_dir: Path) -> str:
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    pid = f"{time.strftime('%Y%m%d-%H%M%S')}-{re.sub(r'[^A-Za-z0-9_-]+', '_', profiler.label)}"
+    (profile_dir / f"{pid}.speedscope.json").write_text(json.dumps(profiler.speedscope()), encoding="utf-8")
+    (profile_dir / f"{pid}.collapsed.txt").write_text(profiler.collapsed(), encoding="utf-8")
+    summary = {"id": pid, "created_at": time.time(), **profiler.summary()}
+    (profile_dir / f"{pid}.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    # Rotation : seuls les KEEP_PROFILES derniers profils sont conservés
+    for old in sorted(profile_dir.glob("*.json"))[:-KEEP_PROFILES * 2]:
+        old.unlink(missing_ok=True)
+    for old in sorted(profile_dir.glob("*.collapsed.txt"))[:-KEEP_PROFILES]:
+        old.unlink(missing_ok=True)
+    return pid
+
+
+@contextmanager
+def rerun_profile(mode: str | None, label: str, profile_dir: Path = PROFILE_DIR):
+    """
+    Profile le bloc (un rerun) si `mode` (SAMPLE ou CALLS), dans le thread
+    appelant seulement. Les exceptions de contrôle de Streamlit (st.stop,
+    st.rerun) traversent le bloc normalement : le profil est écrit dans tous les cas.
+    """
+    if not mode:
+        yield None
+        return
+    profiler = RerunProfiler(label, count_calls=mode == CALLS)
+    profiler.start(sys._getframe(2))  # cadre de l'appelant du `with`
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        try:
+            profiler.id = _write(profiler, Path(profile_dir))
+        except OSError:
+            profiler.id = None
+
+
+def recent(limit: int = 20, profile_dir: Path = PROFILE_DIR) -> list[dict]:
+    """Résumés des derniers profils, du plus récent au plus ancien."""
+    files = sorted((p for p in Path(profile_dir).glob("*.json") if not p.name.endswith(".speedscope.json")),
+                   reverse=True)[:limit]
+    out = []
+    for path in files:
+        try:
+            out.append(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue
+    return out
+
+
+def artifact(pid: str, kind: str, profile_dir: Path = PROFILE_DIR) -> bytes:
+    """Contenu d'un fichier de profil (kind : "speedscope.json" | "collapsed.txt")."""
+    return (Path(profile_dir) / f"{pid}.{kind}").read_bytes()
@@ -0,0 +1,117 @@
+# core/query_engine.py – v2025-07-10
+# ------------------------------------------------------------
+# Moteur de requêtes optionnel pour les fonctions filter_* de core
+# • "pandas" (défaut) → chaque filter_* garde son chemin pandas
+# • "duckdb"          → filtres et projection fusionnés en une seule
+#                       requête SQL (DataFrame en mémoire ou table Parquet)
+# Choix du moteur : variable d'environnement GPI_QUERY_ENGINE ou set_engine()
+# ------------------------------------------------------------
+
+from __future__ import annotations
+
+import importlib.util
+import os
+import threading
+from typing import Iterable
+
+import pandas as pd
+
+from core.columnar_store import STORE_DIR, table_path
+
+# duckdb est importé au premier usage seulement (import lourd, ~50 ms)
+_HAS_DUCKDB = importlib.util.find_spec("duckdb") is not None
+
+ENGINE_ENV = "GPI_QUERY_ENGINE"
+ENGINES = ("pandas", "duckdb")
+
+# Valeur de prédicat « colonne non nulle » : {col: NOT_NULL} → col IS NOT NULL
+NOT_NULL = object()
+
+_engine = os.environ.get(ENGINE_ENV, "pandas").lower()
+_local = threading.local()
+
+
+# ─────────────────────────────────────────────────────────────
+def get_engine() -> str:
+    """Moteur effectivement utilisé ("duckdb" retombe sur "pandas" s'il n'est pas installé)."""
+    if _engine == "duckdb" and _HAS_DUCKDB:
+        return "duckdb"
+    return "pandas"
+
+
+def set_engine(name: str) -> None:
+    """Change le moteur pour tout le processus ("pandas" ou "duckdb")."""
+    global _engine
+    name = name.lower()
+    if name not in ENGINES:
+        raise ValueError(f"Moteur inconnu « {name} » (attendu : {', '.join(ENGINES)})")
+    _engine = name
+
+
+def lazy_enabled() -> bool:
+    """True si les filter_* doivent passer par le moteur paresseux."""
+    return get_engine() == "duckdb"
+
+
+# ─────────────────────────────────────────────────────────────
+def _connection():
+    """Une connexion DuckDB par thread (les connexions ne sont pas partagées)."""
+    con = getattr(_local, "con", None)
+    if con is None:
+        import duckdb
+        con = _local.con = duckdb.connect()
+    return con
+
+
+def _quote(col: str) -> str:
+    return '"' + str(col).replace('"', '""') + '"'
+
+
+def _where_clause(where: dict[str, object]) -> tuple[str, list]:
+    """{col: valeur | liste | NOT_NULL} → (« col = ? AND col IN (?, ?) », paramètres)."""
+    parts, params = [], []
+    for col, val in where.items():
+        if val is NOT_NULL:
+            parts.append(f"{_quote(col)} IS NOT NULL")
+        elif isinstance(val, (list, tuple, set, pd.Index)):
+            vals = list(val)
+            if not vals:
+                parts.append("FALSE")
+                continue
+            parts.append(f"{_quote(col)} IN ({', '.join('?' * len(vals))})")
+            params.extend(vals)
+        else:
+            parts.append(f"{_quote(col)} = ?")
+            params.append(val)
+    return (" AND ".join(parts) or "TRUE"), params
+
+
+def run_query(source: pd.DataFrame | str,
+              where: dict[str, object] | None = None,
+              columns: Iterable[str] | None = None) -> pd.DataFrame:
+    """
+    Exécute SELECT <columns> FROM <source> WHERE <where> en une seule passe.
+    • source : DataFrame en mémoire, ou nom d'une table du store colonnaire
+      (les prédicats et la projection sont alors poussés dans la lecture Parquet).
+    • where  : {colonne: valeur} (égalité), {colonne: [valeurs]} (IN)
+      ou {colonne: NOT_NULL} (IS NOT NULL).
+    • columns None → toutes les colonnes.
+    """
+    if not _HAS_DUCKDB:
+        raise RuntimeError("DuckDB n'est pas installé : moteur de requêtes paresseux indisponible.")
+
+    select = ", ".join(_quote(c) for c in columns) if columns is not None else "*"
+    clause, params = _where_clause(where or {})
+    con = _connection()
+
+    if isinstance(source, str):
+        pattern = (table_path(source, STORE_DIR) / "**" / "*.parquet").as_posix()
+        sql = f"SELECT {select} FROM read_parquet(?, hive_partitioning = true) WHERE {clause}"
+        return con.execute(sql, [pattern] + params).df()
+
+    con.register("_gpi_source", source)
+    try:
+        sql = f"SELECT {select} FROM _gpi_source WHERE {clause}"
+        return con.execute(sql, params).df()
+    finally:
+        con.unregister("_gpi_source")
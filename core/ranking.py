@@ -0,0 +1,193 @@
+# core/ranking.py – v2025-07-11
+# ------------------------------------------------------------
+# Classements et percentiles entre pays (ou villes) pour un indicateur
+# • Un tableau trié par (indicateur, période), construit une fois par version
+#   du jeu (datasets.by_version) → rang / percentile d'un pays en O(log n)
+#   (searchsorted), top-N = simple tranche
+# • Sources : cpi, penn, icp (une période = une année),
+#   numbeo (instantané ; prix en part du salaire local, les devises différant)
+#       ranking.rank("penn", "rgdpe", "France", period=2019)
+#       ranking.top("cpi", "Consumer price index (2010 = 100)", n=10)
+# ------------------------------------------------------------
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from core import datasets
+from core.instrumentation import timed
+
+
+@dataclass(frozen=True)
+class Leaderboard:
+    entities: np.ndarray        # triées par valeur croissante
+    values: np.ndarray          # float64 croissantes, sans NaN
+    position: dict              # entité → indice dans values
+
+    @classmethod
+    def build(cls, entities, values) -> "Leaderboard":
+        values = np.asarray(values, dtype="float64")
+        entities = np.asarray(entities, dtype=object)
+        keep = ~np.isnan(values)
+        order = np.argsort(values[keep], kind="stable")
+        ent, val = entities[keep][order], values[keep][order]
+        return cls(ent, val, {e: i for i, e in enumerate(ent)})
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def value(self, entity) -> float | None:
+        i = self.position.get(entity)
+        return None if i is None else float(self.values[i])
+
+    def _ranks(self, values: np.ndarray, descending: bool) -> np.ndarray:
+        # Rang « compétition » : les ex æquo partagent le meilleur rang
+        if descending:
+            return len(self.values) - np.searchsorted(self.values, values, side="right") + 1
+        return np.searchsorted(self.values, values, side="left") + 1
+
+    def _percentiles(self, values: np.ndarray) -> np.ndarray:
+        # Part des entités dont la valeur est ≤ (100 = la plus élevée)
+        return np.searchsorted(self.values, values, side="right") / len(self.values) * 100
+
+    def rank(self, entity, descending: bool = True) -> int | None:
+        v = self.value(entity)
+        return None if v is None else int(self._ranks(np.array([v]), descending)[0])
+
+    def percentile(self, entity) -> float | None:
+        v = self.value(entity)
+        return None if v is None else float(self._percentiles(np.array([v]))[0])
+
+    def top(self, n: int | None = 10, descending: bool = True) -> pd.DataFrame:
+        """Les n premiers (tranche du tableau trié) ; n=None → classement complet."""
+        sl = slice(None, None, -1) if descending else slice(None)
+        ent, val = self.entities[sl][:n], self.values[sl][:n]
+        return pd.DataFrame({
+            "rank": self._ranks(val, descending),
+            "entity": ent,
+            "value": val,
+            "percentile": self._percentiles(val).round(1),
+        })
+
+
+# ─────────────────────────────────────────────────────────────
+# Sources : indicateurs disponibles + format long (entity, period, value)
+# ─────────────────────────────────────────────────────────────
+@dataclass(frozen=True)
+class Source:
+    dataset: str
+    entity: str                                           # libellé des entités classées
+    indicators: Callable[[pd.DataFrame], list]
+    long: Callable[[pd.DataFrame, object], pd.DataFrame]
+    unit: str = ""
+
+
+def _cpi_indicators(df):
+    from core.world_bank_cpi_loader import get_series_options
+    return get_series_options(df)
+
+
+def _cpi_long(df, indicator):
+    sub = df.loc[df["series_name"] == indicator, ["country_name", "year", "value"]]
+    return sub.set_axis(["entity", "period", "value"], axis=1)
+
+
+def _penn_indicators(df):
+    from core.penn_loader import get_variable_options
+    return [v for v in get_variable_options(df) if v != "year"]
+
+
+def _penn_long(df, indicator):
+    return df[["country", "year", indicator]].set_axis(["entity", "period", "value"], axis=1)
+
+
+def _icp_indicators(df):
+    # Indicateur = (classification, série) effectivement présent
+    pairs = df.index.droplevel(["country_name", "year"]).unique()
+    return sorted(pairs.tolist())
+
+
+def _icp_long(df, indicator):
+    sub = df.xs(tuple(indicator), level=["classification_name", "series_name"])["value"]
+    return sub.reset_index().set_axis(["entity", "period", "value"], axis=1)
+
+
+def _numbeo_indicators(df):
+    from core.numbeo_loader import get_price_matrix
+    return [v for v in get_price_matrix(df).variables if v != "salary"]
+
+
+def _numbeo_long(df, indicator):
+    # Prix en devises locales : classement sur le prix rapporté au salaire mensuel local
+    from core.numbeo_loader import get_price_matrix
+    m = get_price_matrix(df)
+    salary = m.column("salary")
+    share = np.divide(m.column(indicator), salary, out=np.full(len(salary), np.nan), where=salary > 0)
+    return pd.DataFrame({"entity": m.cities, "period": None, "value": share})
+
+
+SOURCES: dict[str, Source] = {
+    "cpi": Source("cpi", "Country", _cpi_indicators, _cpi_long),
+    "penn": Source("penn", "Country", _penn_indicators, _penn_long),
+    "icp": Source("icp", "Country", _icp_indicators, _icp_long),
+    "numbeo": Source("numbeo", "City", _numbeo_indicators, _numbeo_long, unit="share of local monthly salary"),
+}
+
+
+# ─────────────────────────────────────────────────────────────
+# Tableaux triés par (indicateur, période), une fois par version
+# ─────────────────────────────────────────────────────────────
+@datasets.by_version
+@timed("ranking.build")
+def _boards(df: pd.DataFrame, source: str, indicator) -> dict:
+    long = SOURCES[source].long(df, indicator)
+    long = long[long["value"].notna()].drop_duplicates(["entity", "period"])
+    if long["period"].isna().all():
+        return {None: Leaderboard.build(long["entity"], long["value"])}
+    return {
+        period: Leaderboard.build(g["entity"], g["value"])
+        for period, g in long.groupby("period", sort=True)
+    }
+
+
+def _frame(source: str) -> pd.DataFrame:
+    if source not in SOURCES:
+        raise ValueError(f"Source de classement inconnue : {source} (choix : {', '.join(SOURCES)})")
+    return datasets.get(SOURCES[source].dataset)
+
+
+def indicators(source: str) -> list:
+    return SOURCES[source].indicators(_frame(source))
+
+
+def periods(source: str, indicator) -> list:
+    """Périodes disponibles, croissantes ([None] pour un instantané)."""
+    return list(_boards(_frame(source), source, indicator))
+
+
+def leaderboard(source: str, indicator, period=None) -> Leaderboard:
+    """Classement d'une (indicateur, période) ; period None → période la plus récente."""
+    boards = _boards(_frame(source), source, indicator)
+    if not boards:
+        return Leaderboard.build([], [])
+    if period is None:
+        period = next(reversed(boards))
+    return boards.get(period) or Leaderboard.build([], [])
+
+
+def rank(source: str, indicator, entity, period=None, descending: bool = True) -> dict | None:
+    """Rang, effectif, percentile et valeur d'une entité ; None si absente."""
+    board = leaderboard(source, indicator, period)
+    value = board.value(entity)
+    if value is None:
+        return None
+    return {"rank": board.rank(entity, descending), "of": len(board),
+            "percentile": board.percentile(entity), "value": value}
+
+
+def top(source: str, indicator, n: int | None = 10, period=None, descending: bool = True) -> pd.DataFrame:
+    return leaderboard(source, indicator, period).top(n, descending)
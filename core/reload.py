@@ -0,0 +1,136 @@
+# core/reload.py – v2025-07-11
+# ------------------------------------------------------------
+# Rechargement à chaud des jeux de données, sans redémarrer le serveur
+# • Surveille (par scrutation) les fichiers bruts de chaque jeu
+#   (DatasetSpec.sources) et le pointeur CURRENT du bundle
+# • Fichier brut modifié → seul le jeu concerné est reconstruit
+# • Nouvelle version du bundle → seuls les jeux dont le checksum a changé
+#   sont relus
+# • Le remplacement dans le cache partagé est atomique (core.datasets.reload)
+# Réglage : GPI_RELOAD_INTERVAL (secondes, 0 = désactivé)
+# ------------------------------------------------------------
+
+from __future__ import annotations
+
+import glob
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from core import bundle, datasets
+
+INTERVAL_ENV = "GPI_RELOAD_INTERVAL"
+DEFAULT_INTERVAL = 5.0
+
+
+def _fingerprint(patterns: tuple[str, ...]) -> tuple:
+    """Empreinte (chemin, mtime, taille) des fichiers correspondant aux motifs."""
+    files = sorted({p for pattern in patterns for p in glob.glob(pattern)})
+    prints = []
+    for path in files:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        prints.append((path, st.st_mtime_ns, st.st_size))
+    return tuple(prints)
+
+
+class ReloadService:
+    """Thread de scrutation + petit pool de reconstruction en arrière-plan."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, max_workers: int = 1):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gpi-reload")
+        self._pending: set[str] = set()
+        self._pending_lock = threading.Lock()
+        self._raw_prints = {s.name: _fingerprint(s.sources) for s in datasets.specs()}
+        self._bundle_version = bundle.current_version()
+        self._thread = threading.Thread(target=self._run, name="gpi-reload-watch", daemon=True)
+
+    # ─────────────────────────────────────────────────────────
+    def start(self) -> "ReloadService":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._pool.shutdown(wait=False)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as err:  # la surveillance ne doit jamais s'arrêter
+                print(f"⚠️ Rechargement à chaud : {err}")
+
+    # ─────────────────────────────────────────────────────────
+    def check(self) -> list[str]:
+        """Une passe de détection ; renvoie les jeux mis en reconstruction."""
+        scheduled = []
+
+        for spec in datasets.specs():
+            current = _fingerprint(spec.sources)
+            # Empreinte retenue seulement si la reconstruction est planifiée :
+            # un jeu déjà en cours de rechargement sera repris au prochain passage
+            if current != self._raw_prints.get(spec.name) and self._schedule(spec.name, rebuild=True):
+                self._raw_prints[spec.name] = current
+                scheduled.append(spec.name)
+
+        version = bundle.current_version()
+        with self._pending_lock:
+            changed = version != self._bundle_version
+            self._bundle_version = version
+        if changed:
+            man = bundle.manifest() or {"datasets": {}}
+            for name, info in man["datasets"].items():
+                served = datasets.version(name)
+                if served is not None and served != f"{name}-{info['sha256'][:12]}":
+                    if self._schedule(name, rebuild=False):
+                        scheduled.append(name)
+        return scheduled
+
+    def _schedule(self, name: str, rebuild: bool) -> bool:
+        """Planifie la reconstruction de `name` (jamais deux fois en parallèle)."""
+        with self._pending_lock:
+            if name in self._pending:
+                return False
+            self._pending.add(name)
+        self._pool.submit(self._reload, name, rebuild)
+        return True
+
+    def _own_write(self, previous: str, written: str) -> None:
+        """
+        Notre propre écriture du bundle ne doit pas redéclencher de relecture :
+        la version vue n'avance que si elle était celle que nous avons remplacée.
+        Une version publiée entre-temps par un build externe reste à traiter.
+        """
+        with self._pending_lock:
+            if self._bundle_version == previous:
+                self._bundle_version = written
+
+    def _reload(self, name: str, rebuild: bool) -> None:
+        try:
+            datasets.reload(name, rebuild=rebuild, on_bundle_written=self._own_write)
+        finally:
+            with self._pending_lock:
+                self._pending.discard(name)
+
+
+# ─────────────────────────────────────────────────────────────
+_service: ReloadService | None = None
+_guard = threading.Lock()
+
+
+def start_reload_service(interval: float | None = None) -> ReloadService | None:
+    """Démarre le service une seule fois par processus (None si désactivé)."""
+    global _service
+    if interval is None:
+        interval = float(os.environ.get(INTERVAL_ENV, DEFAULT_INTERVAL))
+    if interval <= 0:
+        return None
+    with _guard:
+        if _service is None:
+            _service = ReloadService(interval).start()
+    return _service
@@ -0,0 +1,165 @@
+# core/result_cache.py – v2025-07-11
+# ------------------------------------------------------------
+# Cache des résultats de filtrage, partagé par toutes les sessions
+# • Clé : (version du jeu, paramètres de filtre normalisés)
+# • Valeur : DataFrame filtré + dérivés construits à la demande (CSV, graphiques)
+# • Éviction LRU (nombre d'entrées) + TTL ; compteurs hit / miss
+# Réglages : GPI_RESULT_CACHE_SIZE (entrées), GPI_RESULT_CACHE_TTL (secondes)
+# ------------------------------------------------------------
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+import numpy as np
+import pandas as pd
+
+from core import datasets, instrumentation
+
+SIZE_ENV = "GPI_RESULT_CACHE_SIZE"
+TTL_ENV = "GPI_RESULT_CACHE_TTL"
+
+
+# ─────────────────────────────────────────────────────────────
+def normalize(value) -> Hashable:
+    """
+    Forme canonique et hachable d'un paramètre de filtre :
+    • list / set → tuple trié (l'ordre de sélection n'importe pas)
+    • tuple      → ordre conservé (ex. variables : ordre des colonnes du résultat)
+    • dict       → tuple trié de paires normalisées
+    • None, "", [], "All" → None (absence de filtre)
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), normalize(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset, pd.Index)):
+        items = [normalize(v) for v in value]
+        if not items:
+            return None
+        if isinstance(value, tuple):
+            return ("ordered",) + tuple(items)
+        return tuple(sorted(items, key=repr))
+    if isinstance(value, str):
+        value = value.strip()
+        return None if value in ("", "All") else value
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class CachedResult:
+    """Résultat partagé : ne jamais modifier `frame` en place."""
+
+    __slots__ = ("frame", "_artifacts", "_lock")
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self._artifacts: dict[Hashable, object] = {}
+        self._lock = threading.Lock()
+
+    def artifact(self, key: Hashable, build: Callable[[pd.DataFrame], object]):
+        """Dérivé du résultat (export, figure…) construit au premier appel seulement."""
+        try:
+            return self._artifacts[key]
+        except KeyError:
+            pass
+        with self._lock:
+            if key not in self._artifacts:
+                self._artifacts[key] = build(self.frame)
+            return self._artifacts[key]
+
+    def csv(self) -> bytes:
+        """Export CSV (UTF-8), encodé au premier appel seulement."""
+        return self.artifact("csv", lambda df: df.to_csv(index=False).encode("utf-8"))
+
+
+# ─────────────────────────────────────────────────────────────
+class ResultCache:
+    def __init__(self, max_entries: int = 256, ttl: float = 900.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: OrderedDict[tuple, tuple[float, CachedResult]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get_or_compute(self, dataset: str, params: dict,
+                       compute: Callable[[], pd.DataFrame]) -> CachedResult:
+        """
+        Renvoie le résultat en cache pour (version de `dataset`, params),
+        sinon exécute `compute()` et le mémorise.
+        """
+        key = (dataset, datasets.version(dataset), normalize(params))
+        now = time.monotonic()
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is not None:
+                created, result = hit
+                if now - created <= self.ttl:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return result
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+
+        # Calcul hors verrou : les autres clés restent servies pendant ce temps
+        result = CachedResult(compute())
+        with self._lock:
+            self._data[key] = (now, result)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "ttl_s": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+# ─────────────────────────────────────────────────────────────
+# Instance partagée par le processus
+# ─────────────────────────────────────────────────────────────
+cache = ResultCache(
+    max_entries=int(os.environ.get(SIZE_ENV, 256)),
+    ttl=float(os.environ.get(TTL_ENV, 900)),
+)
+
+
+def get_or_compute(dataset: str, params: dict, compute: Callable[[], pd.DataFrame]) -> CachedResult:
+    return cache.get_or_compute(dataset, params, compute)
+
+
+def _prometheus_lines() -> list[str]:
+    s = cache.stats()
+    return [
+        "# HELP gpi_result_cache_events_total Result cache lookups and evictions.",
+        "# TYPE gpi_result_cache_events_total counter",
+        f'gpi_result_cache_events_total{{event="hit"}} {s["hits"]}',
+        f'gpi_result_cache_events_total{{event="miss"}} {s["misses"]}',
+        f'gpi_result_cache_events_total{{event="eviction"}} {s["evictions"]}',
+        f'gpi_result_cache_events_total{{event="expiration"}} {s["expirations"]}',
+        "# HELP gpi_result_cache_entries Entries currently held by the result cache.",
+        "# TYPE gpi_result_cache_entries gauge",
+        f"gpi_result_cache_entries {s['entries']}",
+    ]
+
+
+instrumentation.register_collector(_prometheus_lines)
@@ -0,0 +1,133 @@
+# core/runtime.py – v2025-07-11
+# ------------------------------------------------------------
+# Services d'exécution injectables : cache mémoïsé + notifications
+# • Par défaut (CLI, workers, scripts) : functools.lru_cache + warnings/logging,
+#   aucun import de Streamlit
+# • L'application installe le backend Streamlit au démarrage :
+#       runtime.install_streamlit()   → st.cache_data + st.warning / st.info
+# • Les modules core n'importent jamais streamlit directement :
+#       @runtime.memoize(maxsize=4)
+#       def _lookup_table(version): ...
+#       runtime.notify("warning", "…")
+# • capture_notifications() : collecte en plus les messages émis par le thread
+#   courant (core.datasets les rattache au statut du jeu en cours de chargement,
+#   visibles même quand le chargement a eu lieu hors session)
+# ------------------------------------------------------------
+
+from __future__ import annotations
+
+import functools
+import logging
+import threading
+import warnings
+from contextlib import contextmanager
+from typing import Callable
+
+log = logging.getLogger("gpi")
+_capture = threading.local()
+
+
+class Backend:
+    """Backend par défaut : sans dépendance, utilisable hors Streamlit."""
+
+    name = "default"
+
+    def memoize(self, func: Callable, maxsize: int) -> Callable:
+        return functools.lru_cache(maxsize=maxsize)(func)
+
+    def notify(self, level: str, message: str) -> None:
+        if level in ("warning", "error"):
+            warnings.warn(message, stacklevel=3)
+        else:
+            log.info(message)
+
+
+class StreamlitBackend(Backend):
+    """st.cache_data (copies par appel) + messages affichés dans la page."""
+
+    name = "streamlit"
+
+    def __init__(self):
+        import streamlit as st
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        self._st = st
+        self._ctx = get_script_run_ctx
+
+    def memoize(self, func: Callable, maxsize: int) -> Callable:
+        return self._st.cache_data(max_entries=maxsize)(func)
+
+    def notify(self, level: str, message: str) -> None:
+        # Threads d'arrière-plan (préchargement, rechargement) : pas de page où écrire
+        if self._ctx() is None:
+            super().notify(level, message)
+            return
+        getattr(self._st, level if level in ("warning", "error", "info", "success") else "info")(message)
+
+
+_backend: Backend = Backend()
+_lock = threading.Lock()
+
+
+def backend() -> Backend:
+    return _backend
+
+
+def set_backend(new: Backend) -> None:
+    """Remplace le backend ; les fonctions mémoïsées se réinstallent au prochain appel."""
+    global _backend
+    with _lock:
+        _backend = new
+
+
+def install_streamlit() -> None:
+    """Appelé par l'application : caches et messages passent par Streamlit."""
+    if _backend.name != "streamlit":
+        set_backend(StreamlitBackend())
+
+
+# ─────────────────────────────────────────────────────────────
+def memoize(maxsize: int = 128):
+    """
+    Mémoïsation via le backend actif. Résolue au premier appel (et après tout
+    changement de backend), donc indépendante de l'ordre des imports.
+    """
+    def decorate(func: Callable) -> Callable:
+        bound: dict[str, object] = {}
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            current = _backend
+            if bound.get("backend") is not current:
+                with _lock:
+                    bound["impl"] = current.memoize(func, maxsize)
+                    bound["backend"] = current
+            return bound["impl"](*args, **kwargs)
+
+        def cache_clear() -> None:
+            impl = bound.get("impl")
+            if impl is not None:
+                (getattr(impl, "cache_clear", None) or impl.clear)()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorate
+
+
+def notify(level: str, message: str) -> None:
+    """Message utilisateur (warning / info / error) via le backend actif."""
+    sink = getattr(_capture, "messages", None)
+    if sink is not None:
+        sink.append((level, message))
+    _backend.notify(level, message)
+
+
+@contextmanager
+def capture_notifications():
+    """Liste des (niveau, message) notifiés par ce thread dans le bloc (toujours transmis au backend)."""
+    previous = getattr(_capture, "messages", None)
+    messages: list[tuple[str, str]] = []
+    _capture.messages = messages
+    try:
+        yield messages
+    finally:
+        _capture.messages = previous
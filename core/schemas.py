@@ -0,0 +1,169 @@
+# core/schemas.py – v2025-07-11
+# ------------------------------------------------------------
+# Schémas déclaratifs par source, appliqués UNE fois à l'ingestion
+# (core.datasets, avant mise en cache / écriture du bundle)
+# • Correspondance des colonnes (noms nettoyés + alias)
+# • Colonnes / niveaux d'index obligatoires → SchemaError sinon
+# • Types cibles (numériques, entiers, dates, catégories)
+# • Colonnes « valeurs » (dates BIS, variables Penn / Big Mac…) typées en bloc
+# Le résultat est tamponné dans df.attrs["gpi_schema"] : les blocs d'interface
+# lisent value_columns() au lieu de redécouvrir / revérifier les colonnes.
+# ------------------------------------------------------------
+
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass
+
+import pandas as pd
+
+ATTR = "gpi_schema"
+_UNNAMED = re.compile(r"^(Unnamed: \d+|nan|None)?$")
+
+
+class SchemaError(ValueError):
+    """Jeu de données non conforme à son schéma (colonne obligatoire absente…)."""
+
+
+@dataclass(frozen=True)
+class Column:
+    name: str
+    dtype: str | None = None           # "float64" | "int64" | "datetime64" | "category" | None (inchangé)
+    required: bool = True
+    aliases: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class Schema:
+    source: str
+    columns: tuple[Column, ...]
+    index: tuple[str, ...] = ()        # niveaux d'index obligatoires (format long ICP)
+    values: str | None = None          # type des colonnes hors schéma : "float64" | "numeric" | None
+    drop_unnamed: bool = True          # colonnes sans nom (Excel) supprimées
+    extras_numeric_only: bool = False  # value_columns() : colonnes numériques seulement
+
+    @property
+    def fingerprint(self) -> str:
+        return hashlib.sha256(repr(self).encode("utf-8")).hexdigest()[:12]
+
+    @property
+    def names(self) -> list[str]:
+        return [c.name for c in self.columns]
+
+
+# ─────────────────────────────────────────────────────────────
+# Schémas des sources
+# ─────────────────────────────────────────────────────────────
+SCHEMAS: dict[str, Schema] = {s.source: s for s in [
+    Schema("cpi", (
+        Column("country_name", "category"),
+        Column("country_code", "category", required=False),
+        Column("series_name", "category"),
+        Column("series_code", "category", required=False),
+        Column("year", "int64"),
+        Column("value", "float64"),
+    )),
+    Schema("icp", (
+        Column("value", "float64"),
+    ), index=("country_name", "classification_name", "series_name", "year")),
+    Schema("bis", (
+        Column("Dataflow ID", required=False),
+        Column("Timeseries Key", required=False),
+        Column("Frequency"),
+        Column("Type"),
+        Column("Basket"),
+        Column("Reference area", aliases=("Reference Area", "REF_AREA")),
+        Column("Unit"),
+    ), values="float64"),                # une colonne par date "AAAA-MM-JJ"
+    Schema("penn", (
+        Column("countrycode"),
+        Column("country"),
+        Column("currency_unit", required=False),
+        Column("year", "int64"),
+    ), extras_numeric_only=True),
+    Schema("big_mac", (
+        Column("date", "datetime64"),
+        Column("iso_a3"),
+        Column("currency_code"),
+        Column("name"),
+        Column("year", "int64", required=False),    # précalculées par core.big_mac
+        Column("month", "int64", required=False),
+        Column("day", "int64", required=False),
+    ), values="numeric", extras_numeric_only=True),
+    Schema("numbeo", (
+        Column("id_city", "int64", required=False),
+        Column("name"),
+        Column("status", required=False),
+    )),
+]}
+
+
+# ─────────────────────────────────────────────────────────────
+def _normalise(name) -> str:
+    return str(name).strip()
+
+
+def _coerce(s: pd.Series, dtype: str) -> pd.Series:
+    if dtype == "float64":
+        return s if s.dtype == "float64" else pd.to_numeric(s, errors="coerce").astype("float64")
+    if dtype == "numeric":
+        return s if pd.api.types.is_numeric_dtype(s) else pd.to_numeric(s, errors="coerce")
+    if dtype == "int64":
+        if pd.api.types.is_integer_dtype(s):
+            return s
+        num = pd.to_numeric(s, errors="coerce")
+        return num.astype("int64") if num.notna().all() else num.astype("Int64")
+    if dtype == "datetime64":
+        return s if pd.api.types.is_datetime64_any_dtype(s) else pd.to_datetime(s, errors="coerce")
+    if dtype == "category":
+        return s if isinstance(s.dtype, pd.CategoricalDtype) else s.astype("category")
+    raise ValueError(f"Type de schéma inconnu : {dtype}")
+
+
+def apply(source: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Valide et convertit `df` selon le schéma de `source` ; renvoie un nouveau DataFrame tamponné."""
+    schema = SCHEMAS[source]
+    df = df.copy(deep=False)
+
+    # 1) Noms de colonnes : nettoyage, alias, colonnes sans nom
+    names = [_normalise(c) for c in df.columns]
+    alias_of = {a: c.name for c in schema.columns for a in c.aliases}
+    df.columns = [alias_of.get(n, n) for n in names]
+    if schema.drop_unnamed:
+        df = df.loc[:, [not _UNNAMED.match(c) for c in df.columns]]
+
+    # 2) Obligatoires
+    missing = [c.name for c in schema.columns if c.required and c.name not in df.columns]
+    missing += [lvl for lvl in schema.index if lvl not in df.index.names]
+    if missing:
+        raise SchemaError(f"{source} : colonnes obligatoires absentes → {missing}")
+
+    # 3) Types
+    for col in schema.columns:
+        if col.dtype and col.name in df.columns:
+            df[col.name] = _coerce(df[col.name], col.dtype)
+    extras = [c for c in df.columns if c not in schema.names]
+    if schema.values and extras:
+        df[extras] = df[extras].apply(_coerce, dtype=schema.values)
+
+    if schema.extras_numeric_only:
+        extras = [c for c in extras if pd.api.types.is_numeric_dtype(df[c])]
+    df.attrs[ATTR] = {"source": source, "fingerprint": schema.fingerprint, "value_columns": extras}
+    return df
+
+
+def conform(source: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Comme apply(), sans rien refaire si `df` porte déjà le tampon du schéma courant."""
+    stamp = df.attrs.get(ATTR)
+    if stamp and stamp.get("source") == source and stamp.get("fingerprint") == SCHEMAS[source].fingerprint:
+        return df
+    return apply(source, df)
+
+
+def value_columns(df: pd.DataFrame) -> list[str]:
+    """Colonnes « valeurs » déterminées à l'ingestion (dates BIS, variables Penn / Big Mac…)."""
+    stamp = df.attrs.get(ATTR)
+    if not stamp:
+        raise SchemaError("DataFrame non validé : passer par core.datasets (schéma appliqué à l'ingestion).")
+    return list(stamp["value_columns"])
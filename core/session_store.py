@@ -0,0 +1,188 @@
+# core/session_store.py – v2025-07-11
+# ------------------------------------------------------------
+# État de session compact + budget mémoire par session
+# • Sélections stockées en bitset (int Python) ou, si l'ordre compte, en codes
+#   entiers (int32) sur la liste d'options du jeu, avec le jeton de version
+#   (core.datasets) : jamais de copie des options
+# • enforce_budget() → mesure l'état d'une session (suivi par session) et,
+#   au-delà du budget, supprime les plus grosses sélections de ce module
+#   (jamais les clés de widgets ou d'autres modules)
+# • Statistiques exportées vers core.instrumentation (Prometheus)
+# Réglage : GPI_SESSION_BUDGET_KB (défaut 256)
+# Aucune dépendance à Streamlit : `state` est un MutableMapping
+# (st.session_state côté application).
+# ------------------------------------------------------------
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections.abc import MutableMapping, Sequence
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from core import instrumentation
+
+BUDGET_ENV = "GPI_SESSION_BUDGET_KB"
+BUDGET_BYTES = int(os.environ.get(BUDGET_ENV, 256)) * 1024
+SESSION_TTL = 3600.0  # une session inactive depuis 1 h sort des statistiques
+
+
+# ─────────────────────────────────────────────────────────────
+# Sélections en bitset / codes entiers
+# ─────────────────────────────────────────────────────────────
+def to_bits(options: Sequence, selected) -> int:
+    """Bit i levé ⇔ options[i] sélectionnée (valeurs inconnues ignorées)."""
+    wanted = set(selected)
+    bits = 0
+    for i, opt in enumerate(options):
+        if opt in wanted:
+            bits |= 1 << i
+    return bits
+
+
+def from_bits(options: Sequence, bits: int) -> list:
+    """Options sélectionnées, dans l'ordre de la liste d'options."""
+    return [opt for i, opt in enumerate(options) if bits >> i & 1]
+
+
+def to_codes(options: Sequence, selected) -> bytes:
+    """Positions des valeurs sélectionnées (ordre de sélection conservé), int32."""
+    position = {opt: i for i, opt in enumerate(options)}
+    return np.array([position[v] for v in selected if v in position], dtype=np.int32).tobytes()
+
+
+def from_codes(options: Sequence, codes: bytes) -> list:
+    return [options[i] for i in np.frombuffer(codes, dtype=np.int32) if i < len(options)]
+
+
+class Selection(NamedTuple):
+    """Entrée d'état écrite par put_selection (seules entrées que le budget peut supprimer)."""
+    token: str | None
+    payload: int | bytes
+
+
+def put_selection(state: MutableMapping, key: str, options: Sequence, selected, token: str | None,
+                  ordered: bool = False) -> None:
+    """
+    Mémorise `selected` sous forme (jeton de version, charge compacte) :
+    bitset par défaut, codes int32 si `ordered` (l'ordre de sélection compte).
+    """
+    payload = to_codes(options, selected) if ordered else to_bits(options, selected)
+    state[key] = Selection(token, payload)
+
+
+def get_selection(state: MutableMapping, key: str, options: Sequence, token: str | None,
+                  default: Sequence = ()) -> list:
+    """
+    Relit une sélection compacte. Si le jeu a changé de version depuis
+    l'enregistrement (options réordonnées), la sélection repart de `default`.
+    """
+    stored = state.get(key)
+    if not isinstance(stored, tuple) or len(stored) != 2 or stored[0] != token:
+        return list(default)
+    payload = stored[1]
+    return from_codes(options, payload) if isinstance(payload, bytes) else from_bits(options, payload)
+
+
+# ─────────────────────────────────────────────────────────────
+# Taille de l'état
+# ─────────────────────────────────────────────────────────────
+def sizeof(value, _seen: set | None = None) -> int:
+    """Taille estimée (octets) d'une valeur de session, conteneurs inclus."""
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(sizeof(k, seen) + sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(sizeof(v, seen) for v in value)
+    return size
+
+
+def entry_sizes(state: MutableMapping) -> dict[str, int]:
+    return {str(k): sizeof(v) for k, v in list(state.items())}
+
+
+# ─────────────────────────────────────────────────────────────
+# Suivi par session + budget
+# ─────────────────────────────────────────────────────────────
+_lock = threading.Lock()
+_sessions: dict[str, tuple[float, int]] = {}  # id → (vu à, octets)
+_trimmed = 0
+
+
+def enforce_budget(state: MutableMapping, session_id: str,
+                   budget: int = BUDGET_BYTES, keep: set[str] = frozenset()) -> list[str]:
+    """
+    Mesure l'état de la session puis supprime les plus grosses sélections
+    compactes (Selection, hors `keep`) jusqu'à repasser sous le budget ;
+    renvoie les clés supprimées (les sélections concernées repartent du
+    défaut). Les autres entrées (widgets…) sont mesurées, jamais supprimées.
+    """
+    global _trimmed
+    sizes = entry_sizes(state)
+    total = sum(sizes.values())
+    removed = []
+    for key, size in sorted(sizes.items(), key=lambda kv: kv[1], reverse=True):
+        if total <= budget:
+            break
+        if key in keep or not isinstance(state.get(key), Selection):
+            continue
+        del state[key]
+        total -= size
+        removed.append(key)
+    now = time.time()
+    with _lock:
+        _sessions[session_id] = (now, total)
+        _trimmed += len(removed)
+        for sid in [s for s, (seen, _) in _sessions.items() if now - seen > SESSION_TTL]:
+            del _sessions[sid]
+    return removed
+
+
+def stats() -> dict:
+    with _lock:
+        sizes = [b for _, b in _sessions.values()]
+        trimmed = _trimmed
+    return {
+        "sessions": len(sizes),
+        "budget_bytes": BUDGET_BYTES,
+        "total_bytes": int(sum(sizes)),
+        "max_bytes": int(max(sizes, default=0)),
+        "mean_bytes": float(np.mean(sizes)) if sizes else 0.0,
+        "over_budget": sum(b > BUDGET_BYTES for b in sizes),
+        "trimmed_entries": trimmed,
+    }
+
+
+def _prometheus_lines() -> list[str]:
+    s = stats()
+    return [
+        "# HELP gpi_session_state_bytes Estimated session state size across live sessions.",
+        "# TYPE gpi_session_state_bytes gauge",
+        f'gpi_session_state_bytes{{agg="total"}} {s["total_bytes"]}',
+        f'gpi_session_state_bytes{{agg="max"}} {s["max_bytes"]}',
+        f'gpi_session_state_bytes{{agg="mean"}} {s["mean_bytes"]}',
+        "# HELP gpi_sessions Live sessions tracked by the session state budget.",
+        "# TYPE gpi_sessions gauge",
+        f"gpi_sessions {s['sessions']}",
+        "# HELP gpi_session_state_trimmed_total Entries dropped to keep sessions under budget.",
+        "# TYPE gpi_session_state_trimmed_total counter",
+        f"gpi_session_state_trimmed_total {s['trimmed_entries']}",
+    ]
+
+
+instrumentation.register_collector(_prometheus_lines)
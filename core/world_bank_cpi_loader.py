@@ -15,7 +15,9 @@ import re
 from pathlib import Path
 from typing import List, Optional
 import pandas as pd
-import streamlit as st
+
+from core import datasets, query_engine
+from core.instrumentation import timed
 
 WB_DIR = Path("data/raw/world_bank")
 PATTERN = "World Bank CPI ("  # to match only CPI files
@@ -32,6 +34,7 @@ def _clean_year_col(col: str) -> Optional[int]:
     return None
 
 
+@timed("cpi.load")
 def load_wb_cpi_data(directory: Path = WB_DIR) -> pd.DataFrame:
     """Load all CPI Excel files, reshape to long format, and concatenate."""
     files = sorted([f for f in directory.glob("*.xlsx") if PATTERN in f.name])
@@ -59,17 +62,17 @@ def load_wb_cpi_data(directory: Path = WB_DIR) -> pd.DataFrame:
 # 2) OPTIONS ---------------------------------------------------------
 # ------------------------------------------------------------------
 
-@st.cache_data
+@datasets.by_version
 def get_country_options(df: pd.DataFrame) -> List[str]:
     return sorted(df["country_name"].unique())
 
 
-@st.cache_data
+@datasets.by_version
 def get_series_options(df: pd.DataFrame) -> List[str]:
     return sorted(df["series_name"].unique())
 
 
-@st.cache_data
+@datasets.by_version
 def get_year_options(df: pd.DataFrame) -> List[int]:
     return sorted(df["year"].unique())
 
@@ -77,12 +80,19 @@ def get_year_options(df: pd.DataFrame) -> List[int]:
 # 3) FILTER ----------------------------------------------------------
 # ------------------------------------------------------------------
 
+@timed("cpi.filter")
 def filter_wb_cpi_data(
     df: pd.DataFrame,
     country: str,
     series: str,
     years: Optional[List[int]] = None,
 ) -> pd.DataFrame:
+    if query_engine.lazy_enabled():
+        where = {"country_name": country, "series_name": series}
+        if years is not None:
+            where["year"] = years
+        return query_engine.run_query(df, where)
+
     sub = df[(df["country_name"] == country) & (df["series_name"] == series)]
     if years is not None:
         sub = sub[sub["year"].isin(years)]
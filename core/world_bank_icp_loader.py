@@ -5,9 +5,11 @@
 
 import pandas as pd
 from pathlib import Path
-import streamlit as st
 import re
 
+from core import datasets
+from core.instrumentation import timed
+
 # Path to the World Bank ICP Excel file
 ICP_PATH = Path("data/raw/world_bank/World Bank ICP.xlsx")
 
@@ -17,64 +19,92 @@ def to_snake_case(s):
     s = re.sub(r"\s+", "_", s)     # Replace whitespace with underscores
     return s.lower().strip()
 
+# Long format: one row per (country, classification, series, year) with data
+ID_COLS = ["country_name", "classification_name", "series_name"]
+CODE_COLS = ["country_code", "classification_code", "series_code"]
+INDEX_COLS = ID_COLS + ["year"]
+BASE_COLS = [
+    "country_name", "country_code",
+    "classification_name", "classification_code",
+    "series_name", "series_code"
+]
+
 # Load the dataset
-@st.cache_data
+@timed("icp.load")
 def load_icp_data():
     df = pd.read_excel(ICP_PATH, skiprows=0)
-    df.columns = df.columns.str.strip()
-
-    # Convert all non-numeric column names to snake_case
-    df.columns = [to_snake_case(col) if not isinstance(col, int) else col for col in df.columns]
+    df.columns = df.columns.astype(str).str.strip()
 
-    # Rename year columns: "2011 [YR2011]" → 2011
-    df.rename(columns={c: int(c[:4]) for c in df.columns if isinstance(c, str) and c[:4].isdigit()}, inplace=True)
-
-    # ✅ Fix: separate metadata and year columns to avoid mixed-type sorting
+    # Rename year columns: "2011 [YR2011]" → 2011, other columns → snake_case
+    df.columns = [int(col[:4]) if col[:4].isdigit() else to_snake_case(col) for col in df.columns]
     meta_cols = [col for col in df.columns if not isinstance(col, int)]
-    year_cols = sorted([col for col in df.columns if isinstance(col, int)])
-    df = df[meta_cols + year_cols]
+    year_cols = [col for col in df.columns if isinstance(col, int)]
+
+    # Wide → long; ".." and empty cells are dropped, so only years with data exist
+    df = df.dropna(subset=ID_COLS).melt(
+        id_vars=meta_cols, value_vars=year_cols, var_name="year", value_name="value"
+    )
+    df["value"] = pd.to_numeric(df["value"], errors="coerce")
+    df = df.dropna(subset=["value"])
+    df["year"] = df["year"].astype("int16")
+
+    # Categorical codes + sorted multi-index → lookups are index slices
+    for col in ID_COLS + CODE_COLS:
+        df[col] = df[col].astype(str).astype("category")
+    df = df.set_index(INDEX_COLS)[CODE_COLS + ["value"]].sort_index()
+    df.index = df.index.remove_unused_levels()
 
     return df
 
 # Get unique country names
-@st.cache_data
+@datasets.by_version
 def get_country_options(df):
-    return sorted(df["country_name"].dropna().unique())
+    return df.index.levels[0].tolist()
 
 # Get metadata options
-@st.cache_data
+@datasets.by_version
 def get_metadata_options(df):
-    classification_names = df["classification_name"].dropna().unique()
-    series_names = df["series_name"].dropna().unique()
-    return sorted(classification_names), sorted(series_names)
+    return df.index.levels[1].tolist(), df.index.levels[2].tolist()
 
-# Get all available years (based on column names)
-@st.cache_data
+# Get all available years (only years holding at least one value)
+@datasets.by_version
 def get_year_options(df):
-    return sorted([col for col in df.columns if isinstance(col, int)])
+    return df.index.levels[3].tolist()
+
+# Classifications available for one country (index slice)
+@datasets.by_version
+def get_classification_options(df, country):
+    return df.loc[country].index.get_level_values("classification_name").unique().tolist()
+
+# Series available for one country / classification (index slice)
+@datasets.by_version
+def get_series_options(df, country, classification_name):
+    return df.loc[(country, classification_name)].index.get_level_values("series_name").unique().tolist()
 
 # Filter the data based on selected values (All → None)
+@timed("icp.filter")
 def filter_icp_data(df, country=None, classification_name=None, series_name=None, years=None):
-    filtered = df.copy()
-
-    if country:
-        filtered = filtered[filtered["country_name"] == country]
-    if classification_name:
-        filtered = filtered[filtered["classification_name"] == classification_name]
-    if series_name:
-        filtered = filtered[filtered["series_name"] == series_name]
-
-    # Select relevant columns
-    base_cols = [
-        "country_name", "country_code", 
-        "classification_name", "classification_code",
-        "series_name", "series_code"
-    ]
-
-    if years:
-        year_cols = [years] if isinstance(years, int) else years
-        filtered = filtered[base_cols + year_cols]
-    else:
-        filtered = filtered.dropna(axis=1, how="all")
-
-    return filtered.reset_index(drop=True)
+    if isinstance(years, int):
+        years = [years]
+    key = (
+        country or slice(None),
+        classification_name or slice(None),
+        series_name or slice(None),
+        list(years) if years else slice(None),
+    )
+    try:
+        filtered = df.loc[key, :]
+    except KeyError:
+        filtered = df.iloc[0:0]
+
+    if filtered.empty:
+        return pd.DataFrame(columns=BASE_COLS)
+
+    # Long → wide on the selection only: one column per year that holds data
+    wide = filtered.set_index(CODE_COLS, append=True)["value"].unstack("year")
+    year_cols = sorted(wide.columns)
+    wide = wide.reset_index().rename_axis(columns=None)
+    for col in BASE_COLS:
+        wide[col] = wide[col].astype(str)
+
+    return wide[BASE_COLS + year_cols].reset_index(drop=True)
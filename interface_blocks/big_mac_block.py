@@ -4,30 +4,29 @@
 # ---------------------------------------------------------------------
 
 import streamlit as st
-from core.big_mac import load_data as load_big_mac, get_lookup_table, filter_data as filter_big_mac
-
-@st.cache_data(show_spinner=False)
-def load_big_mac_cached():
-    return load_big_mac()
+from core import datasets, fx, result_cache, schemas
+from core.big_mac import get_date_dimension, get_lookup_table, filter_data as filter_big_mac
+from core.instrumentation import timed
+from viz import charts
 
 def display_big_mac_block():
     st.markdown("#### 1 – Pick one identifier")
-    lookup = get_lookup_table()
-
     for k in ("iso_sel", "cur_sel", "name_sel"):
         st.session_state.setdefault(k, "")
 
-    df_filter = lookup.copy()
-    if st.session_state.iso_sel:
-        df_filter = df_filter[df_filter["iso_a3"] == st.session_state.iso_sel]
-    if st.session_state.cur_sel:
-        df_filter = df_filter[df_filter["currency_code"] == st.session_state.cur_sel]
-    if st.session_state.name_sel:
-        df_filter = df_filter[df_filter["name"] == st.session_state.name_sel]
+    with timed("big_mac.block.options"):
+        lookup = get_lookup_table()
+        df_filter = lookup.copy()
+        if st.session_state.iso_sel:
+            df_filter = df_filter[df_filter["iso_a3"] == st.session_state.iso_sel]
+        if st.session_state.cur_sel:
+            df_filter = df_filter[df_filter["currency_code"] == st.session_state.cur_sel]
+        if st.session_state.name_sel:
+            df_filter = df_filter[df_filter["name"] == st.session_state.name_sel]
 
-    iso_options = [""] + sorted(df_filter["iso_a3"].unique())
-    cur_options = [""] + sorted(df_filter["currency_code"].unique())
-    name_options = [""] + sorted(df_filter["name"].unique())
+        iso_options = [""] + sorted(df_filter["iso_a3"].unique())
+        cur_options = [""] + sorted(df_filter["currency_code"].unique())
+        name_options = [""] + sorted(df_filter["name"].unique())
 
     c1, c2, c3 = st.columns([1, 1, 2])
     with c1:
@@ -56,51 +55,71 @@ def display_big_mac_block():
 
     with st.spinner("📊 Loading Big Mac data..."):
         st.markdown("#### 2 – Select parameters")
-        big_mac_df = load_big_mac_cached()
-        big_mac_df.columns = [col if col else "empty_column" for col in big_mac_df.columns]
-        numeric_cols = [c for c in big_mac_df.columns if c not in ["date", "iso_a3", "currency_code", "name", "empty_column"] and big_mac_df[c].dtype != object]
+        big_mac_df = datasets.get("big_mac")
+        numeric_cols = schemas.value_columns(big_mac_df)  # colonnes sans nom retirées à l'ingestion
         select_all = st.checkbox("ALL", value=False)
         vars_sel = st.multiselect("Parameters", numeric_cols, default=(numeric_cols if select_all else numeric_cols[:2]))
+        target = "Local"
+        if "local_price" in vars_sel and currency:
+            target = st.selectbox("Show local price in", ["Local", *fx.currencies()])
 
         st.markdown("#### 3 – Select date")
-        data_filtered = big_mac_df.copy()
-        if iso:
-            data_filtered = data_filtered[data_filtered["iso_a3"] == iso]
-        if currency:
-            data_filtered = data_filtered[data_filtered["currency_code"] == currency]
-        if country:
-            data_filtered = data_filtered[data_filtered["name"] == country]
-
-        years = sorted(data_filtered["date"].dt.year.unique())
-        year = st.selectbox("Year", ["All"] + [str(y) for y in years])
-        months = sorted(data_filtered[data_filtered["date"].dt.year == int(year)]["date"].dt.month.unique()) if year != "All" else sorted(data_filtered["date"].dt.month.unique())
-        month = st.selectbox("Month", ["All"] + [str(m) for m in months])
-        days = sorted(data_filtered[(data_filtered["date"].dt.year == int(year)) & (data_filtered["date"].dt.month == int(month))]["date"].dt.day.unique()) if (month != "All" and year != "All") else sorted(data_filtered["date"].dt.day.unique())
-        day = st.selectbox("Day", ["All"] + [str(d) for d in days])
+        # Dimension date précalculée par identifiant : options = tranches de tableaux triés
+        dim = get_date_dimension(iso or None, currency or None, country or None)
+        year = st.selectbox("Year", ["All"] + [str(y) for y in dim.years()])
+        year_i = None if year == "All" else int(year)
+        month = st.selectbox("Month", ["All"] + [str(m) for m in dim.months(year_i)])
+        month_i = None if month == "All" else int(month)
+        day = st.selectbox("Day", ["All"] + [str(d) for d in dim.days(year_i, month_i)])
 
         st.markdown("#### 4 – Results")
-        res = filter_big_mac(
-            iso=iso or None,
-            currency=currency or None,
-            name=country or None,
-            year=None if year == "All" else int(year),
-            month=None if month == "All" else int(month),
-            day=None if day == "All" else int(day),
-            variables=vars_sel,
-        )
-        res = res.loc[:, res.columns != "empty_column"]
-        res["date"] = res["date"].dt.date
-        res_display = res.reset_index(drop=True)
-        res_display.index += 1
-        res_display.index.name = "Numéro de ligne"
+        def compute():
+            res = filter_big_mac(
+                iso=iso or None,
+                currency=currency or None,
+                name=country or None,
+                year=year_i,
+                month=month_i,
+                day=None if day == "All" else int(day),
+                variables=vars_sel,
+            )
+            if target != "Local":
+                # Taux de l'édition (table fx dense, conversion de la colonne en un appel)
+                res[f"local_price_{target}"] = fx.get_fx_table().convert(
+                    res["local_price"], [currency] * len(res), target, res["date"])
+            res["date"] = res["date"].dt.date
+            out = res.reset_index(drop=True)
+            out.index += 1
+            out.index.name = "Numéro de ligne"
+            return out
+
+        with timed("big_mac.block.filter"):
+            result = result_cache.get_or_compute(
+                "big_mac",
+                {"iso": iso, "currency": currency, "name": country,
+                 "year": year, "month": month, "day": day, "variables": vars_sel, "currency_out": target},
+                compute,
+            )
+            res_display = result.frame
 
     st.success(f"{len(res_display)} rows selected.")
     show_all = st.checkbox("Show all rows", value=False)
-    st.dataframe(res_display if show_all else res_display.head(10), use_container_width=True)
+    with timed("big_mac.block.render"):
+        st.dataframe(res_display if show_all else res_display.head(10), use_container_width=True)
+
+    value_cols = [c for c in res_display.columns if c != "date"]
+    if value_cols and len(res_display) and st.checkbox("📈 Show chart", value=False):
+        with timed("big_mac.block.chart"):
+            png = result.artifact(("chart", charts.WIDTH_PX), lambda df: charts.render_png(
+                charts.series_from_columns(df, "date", value_cols), title=country or iso or currency,
+            ))
+        st.image(png, use_container_width=True)
 
+    with timed("big_mac.block.csv"):
+        csv_bytes = result.csv()
     st.download_button(
         "Download CSV",
-        res_display.to_csv(index=False).encode(),
+        csv_bytes,
         file_name=f"big_mac_{iso or currency or country}.csv",
         mime="text/csv",
     )  
\ No newline at end of file
@@ -1,41 +1,48 @@
 from __future__ import annotations
 import streamlit as st
-import pandas as pd
-from core.bis_loader import load_bis_reer_data, filter_bis_data
-
-@st.cache_data(show_spinner=False)
-def _load_bis_reer():
-    return load_bis_reer_data()
-
-def _unique(df, col):
-    return sorted(df[col].dropna().unique().tolist())
+from core import datasets, result_cache, session_store
+from core.bis_loader import filter_bis_data, get_bis_dates, get_bis_index
+from core.instrumentation import timed
+from viz import charts
 
 def display_bis_block() -> None:
     st.markdown("#### 1 – Select filters")
-    df = _load_bis_reer()
+    df = datasets.get("bis")
 
     if df.empty:
         st.error("❌ Aucune donnée BIS-REER trouvée.\n\n➡ Vérifie le dossier `data/raw/bis/` et les formats `.csv` ou `.xlsx`.")
         return
 
     # ── Préparation des options ─────────────────────────────
-    ref_options = _unique(df, "Reference area")
-    freq_options = _unique(df, "Frequency")
-    type_options = _unique(df, "Type")
-    basket_options = _unique(df, "Basket")
-    unit_options = _unique(df, "Unit")
-
-    for k in ("ref_sel", "freq_sel", "type_sel", "basket_sel", "unit_sel"):
-        st.session_state.setdefault(k, [])
+    with timed("bis.block.options"):
+        index = get_bis_index(df)
+        ref_options = index.options("Reference area")
+        freq_options = index.options("Frequency")
+        type_options = index.options("Type")
+        basket_options = index.options("Basket")
+        unit_options = index.options("Unit")
+
+    # État compact : bitset sur la liste d'options (jamais de copie des options).
+    # Clé de widget stable : le widget n'est rempli depuis le bitset qu'au premier
+    # rendu (ou après changement de version du jeu), jamais via un `default=` qui
+    # varierait d'un rerun à l'autre et recréerait le widget.
+    token = datasets.version("bis")
+
+    def select_all(key, box, options):
+        session_store.put_selection(st.session_state, key, options, options, token)
+        st.session_state[box] = list(options)
 
     def multiselect_with_all(label, options, key, btn_key):
+        box = f"{key}_box"
+        stored = st.session_state.get(key)
+        if box not in st.session_state or (isinstance(stored, session_store.Selection) and stored.token != token):
+            st.session_state[box] = session_store.get_selection(st.session_state, key, options, token)
         col1, col2 = st.columns([5, 1])
         with col1:
-            sel = st.multiselect(label, options, default=st.session_state[key], key=f"{key}_box")
+            sel = st.multiselect(label, options, key=box)
         with col2:
-            if st.button("✓ All", key=btn_key):
-                st.session_state[key] = options.copy()
-                st.rerun()
+            st.button("✓ All", key=btn_key, on_click=select_all, args=(key, box, options))
+        session_store.put_selection(st.session_state, key, options, sel, token)
         return sel
 
     ref_sel = multiselect_with_all("Reference Area", ref_options, "ref_sel", "ref_all")
@@ -45,75 +52,70 @@ def display_bis_block() -> None:
     unit_sel = multiselect_with_all("Unit", unit_options, "unit_sel", "unit_all")
 
     # ── Dates dynamiques (année → mois → jour) ───────────────
-    meta_cols = ["Dataflow ID", "Timeseries Key", "Frequency", "Type", "Basket", "Reference area", "Unit"]
-    raw_date_cols = [c for c in df.columns if c not in meta_cols]
-
-    try:
-        parsed_dates = pd.to_datetime(raw_date_cols, format="%Y-%m-%d", errors="coerce")
-        date_map = {d.strftime("%Y-%m-%d"): d for d in parsed_dates if not pd.isna(d)}
-    except Exception:
-        st.warning("⚠ Impossible d'interpréter les colonnes de dates.")
-        return
-
-    df_dates = pd.DataFrame({"col": list(date_map.keys()), "dt": list(date_map.values())})
-    df_dates["year"] = df_dates["dt"].dt.year.astype(str)
-    df_dates["month"] = df_dates["dt"].dt.month.astype(str).str.zfill(2)
-    df_dates["day"] = df_dates["dt"].dt.day.astype(str).str.zfill(2)
+    # Dimension date précalculée (une fois par version) : options et sélection = tranches
+    dim = get_bis_dates(df)
 
     st.markdown("#### 2 – Select date")
-    year_sel = st.selectbox("Year", options=["All"] + sorted(df_dates["year"].unique()), index=0)
-    if year_sel == "All":
-        month_options = sorted(df_dates["month"].unique())
-    else:
-        month_options = sorted(df_dates[df_dates["year"] == year_sel]["month"].unique())
-
-    month_sel = st.selectbox("Month", options=["All"] + month_options, index=0)
-    if month_sel == "All":
-        day_options = sorted(df_dates[(df_dates["year"] == year_sel) if year_sel != "All" else slice(None)]["day"].unique())
-    else:
-        day_options = sorted(df_dates[
-            (df_dates["year"] == year_sel if year_sel != "All" else True) &
-            (df_dates["month"] == month_sel)
-        ]["day"].unique())
-
-    day_sel = st.selectbox("Day", options=["All"] + day_options, index=0)
-
-    mask = pd.Series(True, index=df_dates.index)
-    if year_sel != "All":
-        mask &= df_dates["year"] == year_sel
-    if month_sel != "All":
-        mask &= df_dates["month"] == month_sel
-    if day_sel != "All":
-        mask &= df_dates["day"] == day_sel
-
-    final_dates = df_dates[mask]["col"].tolist()
+    year_sel = st.selectbox("Year", options=["All"] + [str(y) for y in dim.years()], index=0)
+    year = None if year_sel == "All" else int(year_sel)
+    month_sel = st.selectbox("Month", options=["All"] + [f"{m:02d}" for m in dim.months(year)], index=0)
+    month = None if month_sel == "All" else int(month_sel)
+    day_sel = st.selectbox("Day", options=["All"] + [f"{d:02d}" for d in dim.days(year, month)], index=0)
+    day = None if day_sel == "All" else int(day_sel)
+
+    final_dates = dim.labels_for(year, month, day)
 
     # ── Filtrage et affichage ───────────────────────────────
+    # Sélection vide = aucune restriction (dimension ignorée par le filtre)
     filters = {
-        "Reference area": ref_sel or ref_options,
-        "Frequency": freq_sel or freq_options,
-        "Type": type_sel or type_options,
-        "Basket": basket_sel or basket_options,
-        "Unit": unit_sel or unit_options,
+        "Reference area": ref_sel,
+        "Frequency": freq_sel,
+        "Type": type_sel,
+        "Basket": basket_sel,
+        "Unit": unit_sel,
     }
 
-    filtered = filter_bis_data(df, filters)
+    show_cols = ["Reference area", "Frequency", "Type", "Basket", "Unit"] + final_dates
+
+    def compute():
+        filtered = filter_bis_data(df, filters)
+        return filtered[show_cols] if final_dates else filtered[show_cols[:5]]
+
+    with timed("bis.block.filter"):
+        result = result_cache.get_or_compute(
+            "bis",
+            {"ref": ref_sel, "freq": freq_sel, "type": type_sel, "basket": basket_sel,
+             "unit": unit_sel, "dates": tuple(final_dates)},
+            compute,
+        )
+    to_show = result.frame
 
     st.markdown("#### 3 – Results")
-    show_cols = ["Reference area", "Frequency", "Type", "Basket", "Unit"] + final_dates
-    to_show = filtered[show_cols] if final_dates else filtered[show_cols[:5]]
 
     st.success(f"{len(to_show)} rows selected.")
-    st.dataframe(
-        to_show if st.checkbox("Show all rows", value=False) else to_show.head(10),
-        use_container_width=True,
-    )
+    show_all = st.checkbox("Show all rows", value=False)
+    with timed("bis.block.render"):
+        st.dataframe(to_show if show_all else to_show.head(10), use_container_width=True)
+
+    # ── Graphique (une courbe par ligne, sous-échantillonnée) ──
+    if final_dates and len(to_show) and st.checkbox("📈 Show chart", value=False):
+        method = st.radio("Downsampling", ["lttb", "minmax"], horizontal=True)
+        with timed("bis.block.chart"):
+            png = result.artifact(("chart", charts.WIDTH_PX, method), lambda df: charts.render_png(
+                charts.series_from_wide(df, ["Reference area", "Type", "Basket"], final_dates),
+                ylabel="REER", method=method,
+            ))
+        if len(to_show) > charts.MAX_SERIES:
+            st.caption(f"Only the first {charts.MAX_SERIES} series are drawn.")
+        st.image(png, use_container_width=True)
 
     # ── Export CSV ───────────────────────────────────────────
     safe_ref = ref_sel[0].replace(" ", "_") if ref_sel else "bis_reer_filtered"
+    with timed("bis.block.csv"):
+        csv_bytes = result.csv()
     st.download_button(
         "📥 Download CSV",
-        data=to_show.to_csv(index=False).encode("utf-8"),
+        data=csv_bytes,
         file_name=f"{safe_ref}.csv",
         mime="text/csv",
     )
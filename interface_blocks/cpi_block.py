@@ -4,49 +4,68 @@
 # ---------------------------------------------------------------------
 
 import streamlit as st
+from core import datasets, result_cache
 from core.world_bank_cpi_loader import (
-    load_wb_cpi_data,
     get_country_options as get_cpi_countries,
     get_series_options,
     get_year_options as get_cpi_years,
     filter_wb_cpi_data,
 )
-
-@st.cache_data(show_spinner=False)
-def load_cpi_cached():
-    return load_wb_cpi_data()
+from core.instrumentation import timed
+from viz import charts
 
 def display_wb_cpi_block():
     st.markdown("#### 1 – Select filters")
     with st.spinner("📊 Loading World Bank CPI data..."):
-        df_cpi = load_cpi_cached()
+        df_cpi = datasets.get("cpi")
+
+        with timed("cpi.block.options"):
+            country_options = get_cpi_countries(df_cpi)
+            series_options = get_series_options(df_cpi)
+            years_available = get_cpi_years(df_cpi)
 
         c1, c2 = st.columns(2)
-        country = c1.selectbox("Country", get_cpi_countries(df_cpi))
-        series = c2.selectbox("CPI Series", get_series_options(df_cpi))
+        country = c1.selectbox("Country", country_options)
+        series = c2.selectbox("CPI Series", series_options)
 
-        years_available = get_cpi_years(df_cpi)
         years = st.multiselect("Years (optional)", years_available)
 
         st.markdown("#### 2 – Results")
-        filtered = filter_wb_cpi_data(
-            df_cpi,
-            country=country,
-            series=series,
-            years=years or None,
-        )
+        def compute():
+            out = filter_wb_cpi_data(
+                df_cpi,
+                country=country,
+                series=series,
+                years=years or None,
+            ).reset_index(drop=True)
+            out.index += 1
+            out.index.name = "Numéro de ligne"
+            return out
 
-        filtered = filtered.reset_index(drop=True)
-        filtered.index += 1
-        filtered.index.name = "Numéro de ligne"
+        with timed("cpi.block.filter"):
+            result = result_cache.get_or_compute(
+                "cpi", {"country": country, "series": series, "years": years}, compute
+            )
+        filtered = result.frame
 
     st.success(f"{len(filtered)} rows selected.")
     show_all = st.checkbox("Show all rows", value=False)
-    st.dataframe(filtered if show_all else filtered.head(10), use_container_width=True)
+    with timed("cpi.block.render"):
+        st.dataframe(filtered if show_all else filtered.head(10), use_container_width=True)
+
+    if st.checkbox("📈 Show chart", value=False):
+        with timed("cpi.block.chart"):
+            png = result.artifact(("chart", charts.WIDTH_PX), lambda df: charts.render_png(
+                charts.series_from_long(df, "year", "value", ["country_name", "series_name"]),
+                title=f"{country} – {series}",
+            ))
+        st.image(png, use_container_width=True)
 
+    with timed("cpi.block.csv"):
+        csv_bytes = result.csv()
     st.download_button(
         "Download CSV",
-        filtered.to_csv(index=False).encode(),
+        csv_bytes,
         file_name=f"wb_cpi_{country}_{series.replace(' ', '_')}.csv",
         mime="text/csv",
     )
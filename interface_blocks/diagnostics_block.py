@@ -0,0 +1,112 @@
+# interface_blocks/diagnostics_block.py – v2025-07-10
+# ---------------------------------------------------------------------
+# • Page de diagnostic cachée (URL ?diagnostics=1)
+# • Latences par étape (chargement, filtrage, options, rendu, export CSV)
+# • Cache des résultats de filtrage (hits / misses / évictions)
+# • Taille de l'état de session (budget par session)
+# • Export texte au format Prometheus
+# • Profils de rerun (speedscope / flamegraph + opérations pandas)
+# ---------------------------------------------------------------------
+
+import pandas as pd
+import streamlit as st
+
+from core import instrumentation, profiling, result_cache, session_store
+
+
+def display_diagnostics_block() -> None:
+    st.subheader("🩺 Diagnostics")
+
+    if not instrumentation.is_enabled():
+        st.info(
+            f"Instrumentation is disabled. Set `{instrumentation.ENABLE_ENV}=1` "
+            "before starting the server, or enable it for this process below."
+        )
+        if st.button("Enable instrumentation"):
+            instrumentation.enable()
+            st.rerun()
+        display_profiles_section()
+        return
+
+    c1, c2 = st.columns(2)
+    c1.metric("Process RSS", f"{instrumentation.rss_bytes() / 2**20:.0f} MB")
+    if c2.button("🧹 Reset measurements"):
+        instrumentation.reset()
+        st.rerun()
+
+    rows = instrumentation.snapshot()
+    if not rows:
+        st.caption("No measurement yet — browse a data source to collect timings.")
+    else:
+        table = pd.DataFrame(rows).set_index("stage")
+        st.dataframe(table.round(2), use_container_width=True)
+
+    st.markdown("##### Result cache")
+    stats = result_cache.cache.stats()
+    r1, r2, r3, r4 = st.columns(4)
+    r1.metric("Entries", f"{stats['entries']} / {stats['max_entries']}")
+    r2.metric("Hit ratio", f"{stats['hit_ratio']:.0%}")
+    r3.metric("Hits / misses", f"{stats['hits']} / {stats['misses']}")
+    r4.metric("Evicted / expired", f"{stats['evictions']} / {stats['expirations']}")
+    if st.button("🧹 Clear result cache"):
+        result_cache.cache.clear()
+        st.rerun()
+
+    st.markdown("##### Session state")
+    sess = session_store.stats()
+    s1, s2, s3, s4 = st.columns(4)
+    s1.metric("Live sessions", sess["sessions"])
+    s2.metric("Max / budget", f"{sess['max_bytes'] / 1024:.0f} / {sess['budget_bytes'] / 1024:.0f} KB")
+    s3.metric("Mean", f"{sess['mean_bytes'] / 1024:.1f} KB")
+    s4.metric("Over budget / trimmed", f"{sess['over_budget']} / {sess['trimmed_entries']}")
+
+    metrics_text = instrumentation.render_prometheus()
+    with st.expander("Prometheus metrics"):
+        st.code(metrics_text, language="text")
+    st.download_button("📥 Download metrics", metrics_text.encode("utf-8"),
+                       file_name="gpi_metrics.txt", mime="text/plain")
+
+    display_profiles_section()
+
+
+# ─────────────────────────────────────────────────────────────
+def display_profiles_section() -> None:
+    st.markdown("##### Profiles")
+    st.markdown(
+        "To profile a rerun of an open session, enable instrumentation and use "
+        "**⏱ Profiling → Profile next rerun** in the app sidebar. "
+        "[Open the app with profiling](?profile=1) starts a *new* session and profiles its first rerun "
+        f"(`?profile=calls` also counts pandas calls; `{profiling.ENABLE_ENV}=1` profiles every rerun). "
+        "Open `.speedscope.json` files at [speedscope.app](https://www.speedscope.app); "
+        "`.collapsed.txt` files feed `flamegraph.pl` / `inferno`."
+    )
+    profiles = profiling.recent()
+    if not profiles:
+        st.caption("No profile yet.")
+        return
+
+    st.dataframe(
+        pd.DataFrame([{"profile": p["id"], "wall_ms": p["wall_ms"], "samples": p["samples"],
+                       "pandas_ms": round(sum(p.get("pandas_ops_ms", {}).values()), 1),
+                       "calls_counted": p.get("pandas_calls") is not None} for p in profiles]),
+        hide_index=True, use_container_width=True,
+    )
+    chosen = st.selectbox("Profile", [p["id"] for p in profiles])
+    summary = next(p for p in profiles if p["id"] == chosen)
+    c1, c2 = st.columns(2)
+    c1.caption("Pandas operations called from app code (sampled ms)")
+    ops = pd.Series(summary.get("pandas_ops_ms", {}), name="ms", dtype="float64")
+    if summary.get("pandas_calls") is not None:
+        ops = pd.concat([ops, pd.Series(summary["pandas_calls"], name="calls", dtype="Int64")], axis=1)
+    c1.dataframe(ops.head(30), use_container_width=True)
+    c2.caption("Top self time (ms)")
+    c2.dataframe(pd.Series(summary["top_self_ms"], name="ms", dtype="float64"),
+                 use_container_width=True)
+    d1, d2 = st.columns(2)
+    try:
+        d1.download_button("📥 speedscope.json", profiling.artifact(chosen, "speedscope.json"),
+                           file_name=f"{chosen}.speedscope.json", mime="application/json")
+        d2.download_button("📥 collapsed.txt (flamegraph)", profiling.artifact(chosen, "collapsed.txt"),
+                           file_name=f"{chosen}.collapsed.txt", mime="text/plain")
+    except OSError:
+        st.caption("Profile files were rotated out.")
@@ -4,74 +4,76 @@
 # ---------------------------------------------------------------
 
 import streamlit as st
-import pandas as pd
 
+from core import datasets, result_cache
 from core.world_bank_icp_loader import (
-    load_icp_data,
     get_country_options as get_icp_countries,
     get_metadata_options,
     get_year_options as get_icp_years,
+    get_classification_options,
+    get_series_options,
     filter_icp_data,
 )
-
-@st.cache_data(show_spinner=False)
-def load_icp_cached():
-    return load_icp_data()
+from core.instrumentation import timed
 
 def display_wb_icp_block():
     st.markdown("#### 1 – Select filters")
 
     with st.spinner("📊 Loading ICP data..."):
-        df_icp = load_icp_cached()
-
-        # Vérification stricte des colonnes attendues
-        required_cols = ["country_name", "classification_name", "series_name"]
-        missing_cols = [col for col in required_cols if col not in df_icp.columns]
-
-        if missing_cols:
-            st.error(f"❌ The following columns are missing from the dataset: {missing_cols}")
-            st.write("Available columns:", df_icp.columns.tolist())
-            st.dataframe(df_icp.head())
-            st.stop()
+        # Niveaux d'index garantis par le schéma (core.schemas, vérifié à l'ingestion)
+        df_icp = datasets.get("icp")
 
         # Étape 1 – Country
-        countries = sorted(df_icp["country_name"].dropna().unique())
+        with timed("icp.block.options"):
+            countries = get_icp_countries(df_icp)
         country = st.selectbox("Country", countries)
 
-        # Étape 2 – Classification et Series
-        filtered_class = df_icp[df_icp["country_name"] == country]
-        classifications = sorted(filtered_class["classification_name"].dropna().unique())
+        # Étape 2 – Classification et Series (tranches de l'index trié)
+        with timed("icp.block.options"):
+            classifications = get_classification_options(df_icp, country)
         classification = st.selectbox("Classification", classifications)
 
-        filtered_series = filtered_class[filtered_class["classification_name"] == classification]
-        series_names = sorted(filtered_series["series_name"].dropna().unique())
+        with timed("icp.block.options"):
+            series_names = get_series_options(df_icp, country, classification)
         series = st.selectbox("Series", series_names)
 
         # Étape 3 – Années disponibles
-        year_cols = [col for col in df_icp.columns if isinstance(col, int)]
+        with timed("icp.block.options"):
+            year_cols = get_icp_years(df_icp)
         years = st.multiselect("Years (optional)", year_cols)
 
     # Résultats
     st.markdown("#### 2 – Results")
-    filtered = filter_icp_data(
-        df_icp,
-        country=country,
-        classification_name=classification,
-        series_name=series,
-        years=years or None,
-    )
+    def compute():
+        out = filter_icp_data(
+            df_icp,
+            country=country,
+            classification_name=classification,
+            series_name=series,
+            years=years or None,
+        ).reset_index(drop=True)
+        out.index += 1
+        out.index.name = "Numéro de ligne"
+        return out
 
-    filtered = filtered.reset_index(drop=True)
-    filtered.index += 1
-    filtered.index.name = "Numéro de ligne"
+    with timed("icp.block.filter"):
+        result = result_cache.get_or_compute(
+            "icp",
+            {"country": country, "classification": classification, "series": series, "years": years},
+            compute,
+        )
+    filtered = result.frame
 
     st.success(f"{len(filtered)} rows selected.")
     show_all = st.checkbox("Show all rows", value=False)
-    st.dataframe(filtered if show_all else filtered.head(10), use_container_width=True)
+    with timed("icp.block.render"):
+        st.dataframe(filtered if show_all else filtered.head(10), use_container_width=True)
 
+    with timed("icp.block.csv"):
+        csv_bytes = result.csv()
     st.download_button(
         "Download CSV",
-        filtered.to_csv(index=False).encode(),
+        csv_bytes,
         file_name=f"wb_icp_{country.replace(' ', '_')}_{series.replace(' ', '_')}.csv",
         mime="text/csv",
     )
@@ -4,35 +4,38 @@
 # • Sélection de régions et de variables avec persistance
 # • Affichage des résultats (max 10 colonnes par défaut)
 # • Export des résultats filtrés en CSV
+# • Panier coût de la vie (toutes les villes d'un coup, core.numbeo_basket)
 # ------------------------------------------------------------
 
 from __future__ import annotations
+import pandas as pd
 import streamlit as st
 
+from core import datasets, fx, numbeo_basket, result_cache, session_store
 from core.numbeo_loader import (
-    load_numbeo_data,
     get_city_options,
+    get_price_matrix,
     get_variable_options,
     filter_numbeo_data,
 )
-
-# ─────────────────────────────────────────────────────────────
-@st.cache_data(show_spinner=False)
-def _load_cached_data():
-    return load_numbeo_data()
+from core.instrumentation import timed
 
 # ─────────────────────────────────────────────────────────────
 def display_numbeo_block() -> None:
     st.markdown("#### 1 – Select filters")
 
     # Chargement initial (depuis SQLite ou fallback CSV)
-    df_full = _load_cached_data()
-    region_list = get_city_options(df_full)
-    variable_list = get_variable_options(df_full)
+    df_full = datasets.get("numbeo")
+    with timed("numbeo.block.options"):
+        region_list = get_city_options(df_full)
+        variable_list = get_variable_options(df_full)
 
-    # Initialisation de l’état local Streamlit
-    st.session_state.setdefault("numbeo_regions", [])
-    st.session_state.setdefault("numbeo_variables", variable_list[:5])
+    # État local compact : codes entiers sur les listes d'options du jeu
+    token = datasets.version("numbeo")
+    saved_regions = session_store.get_selection(st.session_state, "numbeo_regions", region_list, token)
+    saved_vars = session_store.get_selection(
+        st.session_state, "numbeo_variables", variable_list, token, default=variable_list[:5]
+    )
 
     # 🏙️ Sélecteur de régions
     col1, col2 = st.columns([5, 1])
@@ -40,7 +43,7 @@ def display_numbeo_block() -> None:
         selected_regions = st.multiselect(
             "Region (city, country)",
             options=region_list,
-            default=st.session_state.numbeo_regions,
+            default=saved_regions,
         )
     with col2:
         if st.button("✓ Select All", key="select_all_regions"):
@@ -52,37 +55,90 @@ def display_numbeo_block() -> None:
         selected_vars = st.multiselect(
             "Variables",
             options=variable_list,
-            default=st.session_state.numbeo_variables,
+            default=saved_vars,
         )
     with col4:
         if st.button("✓ Select All", key="select_all_variables"):
             selected_vars = variable_list.copy()
 
     # 🔄 Mise à jour de l’état local
-    st.session_state.numbeo_regions = selected_regions
-    st.session_state.numbeo_variables = selected_vars
+    session_store.put_selection(st.session_state, "numbeo_regions", region_list, selected_regions, token, ordered=True)
+    session_store.put_selection(st.session_state, "numbeo_variables", variable_list, selected_vars, token, ordered=True)
 
-    # ⚠️ Validation minimale
+    # ⚠️ Validation minimale (le panier ne dépend pas des variables affichées)
     if not selected_vars:
         st.warning("Please select at least one variable.")
+        display_basket_section(df_full, selected_regions)
         return
 
     # 📥 Filtrage des données
-    filtered_df = filter_numbeo_data(df_full, selected_regions or None, selected_vars)
+    # Variables en tuple : leur ordre fixe celui des colonnes du résultat
+    with timed("numbeo.block.filter"):
+        result = result_cache.get_or_compute(
+            "numbeo",
+            {"regions": selected_regions, "variables": tuple(selected_vars)},
+            lambda: filter_numbeo_data(df_full, selected_regions or None, selected_vars),
+        )
+    filtered_df = result.frame
     st.success(f"{len(filtered_df)} rows selected.")
 
     # 📋 Aperçu interactif (limité à 10 colonnes par défaut)
     show_all_cols = st.checkbox("Show all columns", value=False)
-    if not show_all_cols and len(filtered_df.columns) > 10:
-        st.dataframe(filtered_df.iloc[:, :10], use_container_width=True)
-        st.caption("Only the first 10 columns are shown. Enable toggle to see all.")
-    else:
-        st.dataframe(filtered_df, use_container_width=True)
+    with timed("numbeo.block.render"):
+        if not show_all_cols and len(filtered_df.columns) > 10:
+            st.dataframe(filtered_df.iloc[:, :10], use_container_width=True)
+            st.caption("Only the first 10 columns are shown. Enable toggle to see all.")
+        else:
+            st.dataframe(filtered_df, use_container_width=True)
 
     # 💾 Export CSV
+    with timed("numbeo.block.csv"):
+        csv_bytes = result.csv()
     st.download_button(
         label="📥 Download CSV",
-        data=filtered_df.to_csv(index=False).encode("utf-8"),
+        data=csv_bytes,
         file_name="numbeo_filtered.csv",
         mime="text/csv",
     )
+
+    display_basket_section(df_full, selected_regions)
+
+
+# ─────────────────────────────────────────────────────────────
+def display_basket_section(df_full, selected_regions: list[str]) -> None:
+    st.markdown("#### 🧺 Cost-of-living basket")
+    matrix = get_price_matrix(df_full)
+    price_vars = [v for v in matrix.variables if v != numbeo_basket.SALARY]
+
+    preset = st.selectbox("Preset", ["Custom", *numbeo_basket.PRESETS], index=1)
+    base = numbeo_basket.PRESETS.get(preset, {})
+    weights_df = st.data_editor(
+        pd.DataFrame({"variable": price_vars, "quantity": [float(base.get(v, 0)) for v in price_vars]}),
+        disabled=["variable"], hide_index=True, use_container_width=True, key=f"basket_{preset}",
+    )
+    # Cellule vidée dans l'éditeur → NaN : ignorée (sinon tout le panier vaut NaN)
+    weights = {v: q for v, q in zip(weights_df["variable"], weights_df["quantity"]) if pd.notna(q) and q > 0}
+    if not weights:
+        st.info("Set a quantity for at least one item.")
+        return
+
+    c1, c2 = st.columns(2)
+    target = c2.selectbox("Display currency", ["Local", *fx.currencies()])
+    with timed("numbeo.block.basket"):
+        # Taux à la date de mise à jour de chaque ville (table fx mise en cache)
+        rates = None if target == "Local" else fx.get_fx_table().factors(matrix.codes, target, matrix.as_of)
+        result = numbeo_basket.evaluate(matrix, {preset: weights}, rates)
+    cities = result.cities.tolist()
+    reference = c1.selectbox("Reference city (index = 100)", cities)
+    table = (result.to_frame(reference=reference)
+             .rename(columns={"basket_cost_common": f"basket_cost_{target}"})
+             .sort_values("pp_index", ascending=False))
+    st.caption("Purchasing power = local monthly salary / basket cost (currency-free).")
+    st.dataframe(table, hide_index=True, use_container_width=True)
+
+    compared = st.multiselect("Compare cities", cities, default=selected_regions[:8] or cities[:8])
+    if len(compared) >= 2:
+        with timed("numbeo.block.compare"):
+            grid = result.compare("purchasing_power", cities=compared)
+        st.caption("Purchasing power of the row city relative to the column city.")
+        st.dataframe(grid.round(2), use_container_width=True)
@@ -4,50 +4,69 @@
 # ---------------------------------------------------------------------
 
 import streamlit as st
+from core import datasets, result_cache
 from core.penn_loader import (
-    load_penn_data,
     get_country_options as get_penn_countries,
     get_variable_options,
     filter_penn_data,
 )
-
-@st.cache_data(show_spinner=False)
-def load_penn_cached():
-    return load_penn_data()
+from core.instrumentation import timed
+from viz import charts
 
 def display_penn_block():
     st.markdown("#### 1 – Select filters")
     with st.spinner("📊 Loading Penn World Table..."):
-        df_pwt = load_penn_cached()
+        df_pwt = datasets.get("penn")
+
+        with timed("penn.block.options"):
+            country_options = get_penn_countries(df_pwt)
+            all_vars = get_variable_options(df_pwt)
+            year_options = sorted(df_pwt["year"].unique())
 
         c1, c2 = st.columns(2)
-        country = c1.selectbox("Country", get_penn_countries(df_pwt))
+        country = c1.selectbox("Country", country_options)
 
-        all_vars = get_variable_options(df_pwt)
         select_all = c2.checkbox("Select ALL variables", value=False)
         vars_sel = st.multiselect("Variables", all_vars, default=(all_vars if select_all else all_vars[:3]))
 
-        years_sel = st.multiselect("Years (optional)", sorted(df_pwt["year"].unique()))
+        years_sel = st.multiselect("Years (optional)", year_options)
 
         st.markdown("#### 2 – Results")
-        filtered = filter_penn_data(
-            df_pwt,
-            country=country,
-            variables=vars_sel,
-            years=years_sel or None,
-        )
+        def compute():
+            out = filter_penn_data(
+                df_pwt,
+                country=country,
+                variables=vars_sel,
+                years=years_sel or None,
+            ).reset_index(drop=True)
+            out.index += 1
+            out.index.name = "Numéro de ligne"
+            return out
 
-        filtered = filtered.reset_index(drop=True)
-        filtered.index += 1
-        filtered.index.name = "Numéro de ligne"
+        # Variables en tuple : leur ordre fixe celui des colonnes du résultat
+        with timed("penn.block.filter"):
+            result = result_cache.get_or_compute(
+                "penn", {"country": country, "variables": tuple(vars_sel), "years": years_sel}, compute
+            )
+        filtered = result.frame
 
     st.success(f"{len(filtered)} rows selected.")
     show_all = st.checkbox("Show all rows", value=False)
-    st.dataframe(filtered if show_all else filtered.head(10), use_container_width=True)
+    with timed("penn.block.render"):
+        st.dataframe(filtered if show_all else filtered.head(10), use_container_width=True)
+
+    if vars_sel and st.checkbox("📈 Show chart", value=False):
+        with timed("penn.block.chart"):
+            png = result.artifact(("chart", charts.WIDTH_PX), lambda df: charts.render_png(
+                charts.series_from_columns(df, "year", vars_sel), title=country,
+            ))
+        st.image(png, use_container_width=True)
 
+    with timed("penn.block.csv"):
+        csv_bytes = result.csv()
     st.download_button(
         "Download CSV",
-        filtered.to_csv(index=False).encode(),
+        csv_bytes,
         file_name=f"penn_{country.replace(' ', '_')}.csv",
         mime="text/csv",
     )
@@ -0,0 +1,69 @@
+# interface_blocks/ranking_block.py – v1
+# ---------------------------------------------------------------------
+# • Leaderboard : rang / percentile d'un pays (ou d'une ville) pour un
+#   indicateur et une période, + top-N (tableaux triés de core.ranking).
+# ---------------------------------------------------------------------
+
+import streamlit as st
+from core import ranking
+from core.instrumentation import timed
+
+SOURCE_LABELS = {
+    "penn": "Penn World Table",
+    "cpi": "World Bank – CPI",
+    "icp": "World Bank – ICP",
+    "numbeo": "Numbeo – Cost of Living",
+}
+
+
+def _indicator_label(indicator) -> str:
+    return " – ".join(indicator) if isinstance(indicator, tuple) else str(indicator)
+
+
+def display_ranking_block():
+    st.subheader("🏆 Leaderboard")
+    st.markdown("#### 1 – Select indicator")
+
+    c1, c2 = st.columns([1, 2])
+    source = c1.selectbox("Source", list(SOURCE_LABELS), format_func=SOURCE_LABELS.get)
+    try:
+        with timed("ranking.block.options"):
+            indicator_options = ranking.indicators(source)
+    except Exception as e:
+        st.error(f"❌ {SOURCE_LABELS[source]} unavailable: {e}")
+        return
+    if not indicator_options:
+        st.warning("No indicator available for this source.")
+        return
+    indicator = c2.selectbox("Indicator", indicator_options, format_func=_indicator_label)
+
+    with timed("ranking.block.build"):
+        period_options = ranking.periods(source, indicator)
+    period = None
+    if period_options != [None]:
+        period = st.selectbox("Year", period_options[::-1])  # plus récente d'abord
+
+    c3, c4 = st.columns(2)
+    n = c3.slider("Top N", min_value=5, max_value=100, value=10, step=5)
+    descending = c4.radio("Order", ["Highest first", "Lowest first"], horizontal=True) == "Highest first"
+
+    board = ranking.leaderboard(source, indicator, period)
+    unit = ranking.SOURCES[source].unit
+    if unit:
+        st.caption(f"Values: {unit}.")
+
+    st.markdown("#### 2 – Where does it rank?")
+    entity_label = ranking.SOURCES[source].entity
+    entity = st.selectbox(entity_label, [""] + sorted(board.position))
+    if entity:
+        info = ranking.rank(source, indicator, entity, period, descending)
+        m1, m2, m3 = st.columns(3)
+        m1.metric("Rank", f"{info['rank']} / {info['of']}")
+        m2.metric("Percentile", f"{info['percentile']:.1f}")
+        m3.metric("Value", f"{info['value']:,.4g}")
+
+    st.markdown("#### 3 – Leaderboard")
+    with timed("ranking.block.top"):
+        table = board.top(n, descending).rename(columns={"entity": entity_label})
+    st.success(f"{len(board)} ranked ({entity_label.lower()} level).")
+    st.dataframe(table, hide_index=True, use_container_width=True)
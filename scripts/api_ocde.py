@@ -1,16 +1,66 @@
-import requests
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Iterator
+
+import ijson
+import numpy as np
 import pandas as pd
 
+# Ajoute le dossier parent au chemin d'import (accès à core/)
+sys.path.append(os.path.abspath(os.path.join(Path(__file__).parent, "..")))
+
+from core.columnar_store import STORE_DIR, write_batches
+from scripts.downloader import DownloadManager, DownloadError
+
+CHUNK_OBS = 100_000         # nombre d'observations par lot décodé
+OBS_PREFIX = "dataSets.item.observations"
+
+
+_manager: DownloadManager | None = None
+
+
+def get_download_manager() -> DownloadManager:
+    """Gestionnaire partagé (pool de connexions + cache disque)."""
+    global _manager
+    if _manager is None:
+        _manager = DownloadManager()
+    return _manager
+
+
 def fetch_ocde_api(url: str) -> dict:
     """
     Télécharge et retourne le JSON brut depuis une API OCDE SDMX (version flat).
     """
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        path = get_download_manager().fetch(url)
+    except DownloadError as e:
         raise RuntimeError(f"Erreur lors de la requête API OCDE : {e}")
+    return json.loads(path.read_bytes())
+
+
+def _decode_observations(keys: list[str], values: list, structure: list[dict]) -> pd.DataFrame:
+    """
+    Décode un lot d'observations SDMX en colonnes catégorielles.
+    • Les clés "0:1:2" sont converties en une matrice d'entiers en un seul passage NumPy.
+    • Chaque dimension devient un pd.Categorical construit à partir de ses codes.
+    """
+    n_dims = len(structure)
+    if keys:
+        codes = np.array(":".join(keys).split(":"), dtype=np.int32).reshape(len(keys), n_dims)
+    else:
+        codes = np.empty((0, n_dims), dtype=np.int32)
+
+    columns = {
+        dim["name"]: pd.Categorical.from_codes(
+            codes[:, i], categories=[v["id"] for v in dim["values"]]
+        )
+        for i, dim in enumerate(structure)
+    }
+    columns["Value"] = np.asarray(values, dtype="float64")
+    return pd.DataFrame(columns)
+
 
 def flatten_ocde_data(json_data: dict) -> pd.DataFrame:
     """
@@ -21,16 +71,84 @@ def flatten_ocde_data(json_data: dict) -> pd.DataFrame:
 
     structure = json_data["structure"]["dimensions"]["observation"]
     series_data = json_data["dataSets"][0]["observations"]
-    series_keys = list(series_data.keys())
-    observations = []
+    values = [obs[0] for obs in series_data.values()]
+
+    return _decode_observations(list(series_data.keys()), values, structure)
 
-    for key in series_keys:
-        dim_indexes = list(map(int, key.split(":")))
-        values = [structure[i]["values"][dim_indexes[i]]["id"] for i in range(len(dim_indexes))]
-        obs_value = series_data[key][0]
-        observations.append(values + [obs_value])
 
-    columns = [dim["name"] for dim in structure] + ["Value"]
-    df = pd.DataFrame(observations, columns=columns)
+# ─────────────────────────────────────────────────────────────
+# Lecture en flux (la réponse n'est jamais chargée entièrement en mémoire)
+# ─────────────────────────────────────────────────────────────
+def read_ocde_structure(path: Path) -> list[dict]:
+    """Lit uniquement la liste des dimensions d'observation du fichier SDMX-JSON."""
+    with open(path, "rb") as fh:
+        for structure in ijson.items(fh, "structure.dimensions.observation"):
+            return structure
+    raise ValueError("Structure SDMX absente de la réponse JSON.")
 
-    return df
+
+def iter_ocde_observations(path: Path, chunk_size: int = CHUNK_OBS) -> Iterator[tuple[list[str], list]]:
+    """
+    Parcourt les observations du premier dataSet de façon incrémentale
+    (lecture arrêtée à la fin de ce dataSet, comme flatten_ocde_data).
+    Renvoie des lots (clés, valeurs) d'au plus `chunk_size` éléments.
+    """
+    keys: list[str] = []
+    values: list = []
+    pending = False     # clé lue, valeur (1er élément du tableau) attendue
+    with open(path, "rb") as fh:
+        for prefix, event, value in ijson.parse(fh, use_float=True):
+            if event == "map_key" and prefix == OBS_PREFIX:
+                keys.append(value)
+                pending = True
+            elif pending and event != "start_array":
+                values.append(value)
+                pending = False
+                if len(keys) >= chunk_size:
+                    yield keys, values
+                    keys, values = [], []
+            elif event == "end_map" and prefix == "dataSets.item":
+                break
+    if keys:
+        yield keys, values
+
+
+def stream_ocde_frames(path: Path, chunk_size: int = CHUNK_OBS) -> Iterator[pd.DataFrame]:
+    """Décode le fichier SDMX-JSON en DataFrames catégoriels, lot par lot."""
+    structure = read_ocde_structure(path)
+    for keys, values in iter_ocde_observations(path, chunk_size):
+        yield _decode_observations(keys, values, structure)
+
+
+def ingest_ocde_api(url: str, table: str, chunk_size: int = CHUNK_OBS,
+                    store_dir: Path = STORE_DIR) -> Path:
+    """
+    Télécharge une requête SDMX de l'OCDE et l'écrit directement dans le store
+    colonnaire (core.columnar_store), sans matérialiser le JSON en mémoire.
+    """
+    try:
+        raw = get_download_manager().fetch(url)
+    except DownloadError as e:
+        raise RuntimeError(f"Erreur lors de la requête API OCDE : {e}")
+    return write_batches(stream_ocde_frames(raw, chunk_size), table, store_dir)
+
+
+def ingest_ocde_queries(queries: dict[str, str], chunk_size: int = CHUNK_OBS,
+                        store_dir: Path = STORE_DIR) -> dict[str, Path | Exception]:
+    """
+    Télécharge plusieurs requêtes SDMX en parallèle puis les ingère.
+    • queries : {nom de table: url}
+    Renvoie {table: chemin de la table} ou {table: exception} en cas d'échec.
+    """
+    downloads = get_download_manager().fetch_many(list(queries.values()))
+    results: dict[str, Path | Exception] = {}
+    for table, url in queries.items():
+        raw = downloads[url]
+        if isinstance(raw, Exception):
+            results[table] = raw
+            continue
+        try:
+            results[table] = write_batches(stream_ocde_frames(raw, chunk_size), table, store_dir)
+        except Exception as err:
+            results[table] = err
+    return results
@@ -0,0 +1,105 @@
+"""
+benchmark_filters.py
+────────────────────
+• Compare le chemin pandas et le moteur paresseux (core.query_engine) des fonctions filter_*
+• Chaque cas est exécuté --repeat fois par moteur ; on affiche la médiane et le meilleur temps
+• Vérifie au passage que les deux moteurs renvoient le même nombre de lignes / colonnes
+• À lancer depuis la racine du projet : python scripts/benchmark_filters.py --engines pandas duckdb
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Ajoute le dossier parent au chemin d'import (accès à core/)
+sys.path.append(os.path.abspath(os.path.join(Path(__file__).parent, "..")))
+
+from core import query_engine
+
+
+# ─────────── Cas de test (chargement + appel représentatif) ───────────
+def _bis_case():
+    from core import datasets
+    from core.bis_loader import get_filter_options, filter_bis_data
+    df = datasets.get("bis")  # jeu servi : index bitmap construit une seule fois
+    opts = get_filter_options(df)
+    selections = {"Reference area": opts["Reference area"][:10], "Unit": opts["Unit"][:1]}
+    return lambda: filter_bis_data(df, selections)
+
+
+def _numbeo_case():
+    from core.numbeo_loader import load_numbeo_data, get_city_options, get_variable_options, filter_numbeo_data
+    df = load_numbeo_data()
+    regions = get_city_options(df)[:5]
+    variables = get_variable_options(df)[:5]
+    return lambda: filter_numbeo_data(df, regions, variables)
+
+
+def _cpi_case():
+    from core.world_bank_cpi_loader import load_wb_cpi_data, filter_wb_cpi_data
+    df = load_wb_cpi_data()
+    country, series = df["country_name"].iloc[0], df["series_name"].iloc[0]
+    return lambda: filter_wb_cpi_data(df, country, series)
+
+
+def _penn_case():
+    from core.penn_loader import load_penn_data, filter_penn_data
+    df = load_penn_data()
+    country = df["country"].dropna().iloc[0]
+    return lambda: filter_penn_data(df, country)
+
+
+CASES = {
+    "bis": _bis_case,
+    "numbeo": _numbeo_case,
+    "cpi": _cpi_case,
+    "penn": _penn_case,
+}
+
+
+# ─────────── Mesure ───────────
+def _time(fn, repeat: int) -> tuple[list[float], object]:
+    timings, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark des fonctions filter_* par moteur.")
+    parser.add_argument("--engines", nargs="+", choices=query_engine.ENGINES, default=list(query_engine.ENGINES))
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=sorted(CASES))
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    print(f"{'case':<8} {'engine':<8} {'median ms':>10} {'best ms':>10} {'shape':>12}")
+    for name in args.cases:
+        try:
+            run = CASES[name]()
+        except FileNotFoundError as e:
+            print(f"{name:<8} ⚠️ ignoré ({e})")
+            continue
+
+        shapes = {}
+        for engine in args.engines:
+            query_engine.set_engine(engine)
+            if query_engine.get_engine() != engine:
+                print(f"{name:<8} {engine:<8} ⚠️ moteur indisponible")
+                continue
+            run()  # échauffement (caches, connexion)
+            timings, result = _time(run, args.repeat)
+            shapes[engine] = result.shape
+            print(f"{name:<8} {engine:<8} {statistics.median(timings) * 1e3:>10.2f} "
+                  f"{min(timings) * 1e3:>10.2f} {str(result.shape):>12}")
+
+        if len(set(shapes.values())) > 1:
+            print(f"❌ {name} : résultats différents selon le moteur → {shapes}")
+
+
+if __name__ == "__main__":
+    main()
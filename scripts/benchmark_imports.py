@@ -0,0 +1,73 @@
+"""
+benchmark_imports.py
+────────────────────
+• Mesure le temps d'import des modules core (processus Python neufs, médiane sur N essais)
+• Deux mesures par module :
+    - à froid (pandas / numpy compris)
+    - avec pandas déjà importé → coût propre du module (ce que paie un worker déjà chargé)
+• Indique si Streamlit a été importé au passage, et son propre coût à titre de comparaison
+• À lancer depuis la racine du projet :
+      python scripts/benchmark_imports.py
+      python scripts/benchmark_imports.py --repeat 9 --modules core.big_mac core.bis_loader
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = [
+    "core.datasets",
+    "core.big_mac",
+    "core.bis_loader",
+    "core.numbeo_loader",
+    "core.penn_loader",
+    "core.world_bank_cpi_loader",
+    "core.world_bank_icp_loader",
+]
+
+PROBE = """
+import sys, time, json
+{preload}
+t = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t
+print(json.dumps({{"ms": elapsed * 1e3, "streamlit": "streamlit" in sys.modules}}))
+"""
+
+
+def probe(module: str, preload: str = "") -> dict:
+    """Importe `module` dans un interpréteur neuf ; renvoie durée (ms) + présence de Streamlit."""
+    code = PROBE.format(module=module, preload=preload)
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                         env={**os.environ, "PYTHONPATH": str(ROOT)}, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure(module: str, repeat: int, preload: str = "") -> tuple[float, bool]:
+    runs = [probe(module, preload) for _ in range(repeat)]
+    return statistics.median(r["ms"] for r in runs), any(r["streamlit"] for r in runs)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Temps d'import des modules core.")
+    parser.add_argument("--modules", nargs="+", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'module':<30} {'froid ms':>10} {'+pandas ms':>11}  streamlit")
+    for module in ["streamlit", *args.modules]:
+        cold, st_loaded = measure(module, args.repeat)
+        warm, _ = measure(module, args.repeat, preload="import pandas, numpy")
+        flag = "—" if module == "streamlit" else ("⚠️ importé" if st_loaded else "non")
+        print(f"{module:<30} {cold:>10.1f} {warm:>11.1f}  {flag}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+build_data.py
+─────────────
+• Étape de build hors-ligne : exécute une fois le nettoyage / remodelage de chaque loader
+  (fusion BIS, melt CPI, format long ICP, colonnes Penn, typage Numbeo, dates Big Mac)
+• Écrit un bundle Parquet versionné + manifest.json (checksums SHA-256) dans data/bundle/
+• L'application lit ensuite uniquement ce bundle (core.datasets) : plus de parsing au démarrage
+• À lancer depuis la racine du projet :
+      python scripts/build_data.py                 → build complet
+      python scripts/build_data.py --only bis cpi  → build partiel (le reste est repris)
+      python scripts/build_data.py --verify        → contrôle des checksums de la version active
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Ajoute le dossier parent au chemin d'import (accès à core/)
+sys.path.append(os.path.abspath(os.path.join(Path(__file__).parent, "..")))
+
+from core import bundle, datasets
+
+
+def build(names: list[str]) -> Path | None:
+    """Construit les jeux `names` ; les autres jeux sont repris de la version active."""
+    frames = {}
+    for name in names:
+        start = time.perf_counter()
+        try:
+            frames[name] = datasets.load_raw(name)
+        except Exception as e:
+            print(f"❌ {name:<8} ignoré → {type(e).__name__}: {e}")
+            continue
+        print(f"✅ {name:<8} {len(frames[name]):>9} lignes  ({time.perf_counter() - start:.2f}s)")
+
+    all_names = [spec.name for spec in datasets.specs()]
+    carry_over = [n for n in all_names if n not in frames]
+    if not frames and bundle.current_version() is None:
+        print("⚠️ Aucun jeu construit : bundle non écrit.")
+        return None
+
+    root = bundle.write_bundle(frames, carry_over=carry_over)
+    manifest = bundle.manifest(version=root.name)
+    reused = [n for n, info in manifest["datasets"].items() if "carried_over_from" in info]
+    print(f"\n📦 Bundle {root.name} → {root}")
+    if reused:
+        print(f"   Repris de la version précédente : {', '.join(reused)}")
+    return root
+
+
+def verify() -> bool:
+    results = bundle.verify_bundle()
+    for name, ok in results.items():
+        print(f"{'✅' if ok else '❌'} {name}")
+    return all(results.values())
+
+
+def main(argv: list[str] | None = None) -> int:
+    names = [spec.name for spec in datasets.specs()]
+    parser = argparse.ArgumentParser(description="Construit le bundle de données pré-traitées.")
+    parser.add_argument("--only", nargs="+", choices=names, help="jeux à reconstruire")
+    parser.add_argument("--verify", action="store_true", help="vérifie la version active sans rien construire")
+    args = parser.parse_args(argv)
+
+    if args.verify:
+        return 0 if verify() else 1
+    return 0 if build(args.only or names) is not None else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+# scripts/downloader.py – v2025-07-10
+# ------------------------------------------------------------
+# Gestionnaire de téléchargements pour les sources distantes (OCDE, …)
+# • Pool de connexions HTTP partagé (requests.Session)
+# • Concurrence bornée (pool de threads)
+# • Retry avec backoff exponentiel (erreurs réseau, 429, 5xx)
+# • Requêtes conditionnelles ETag / Last-Modified + cache disque
+# • Reprise des téléchargements interrompus (en-tête Range)
+# ------------------------------------------------------------
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 📂 Cache disque des réponses
+CACHE_DIR = Path("data/cache/http")
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+CHUNK_BYTES = 1 << 20
+
+
+class DownloadError(RuntimeError):
+    """Échec définitif d'un téléchargement (après tous les essais)."""
+
+
+# ─────────────────────────────────────────────────────────────
+class DownloadManager:
+    """
+    Télécharge des URLs vers un cache disque, en parallèle et de façon reprenable.
+
+    Pour chaque URL, le cache contient :
+      <clé>.body       → dernier corps complet reçu
+      <clé>.meta.json  → ETag / Last-Modified / date de récupération
+      <clé>.part       → téléchargement en cours (repris au prochain essai)
+    """
+
+    def __init__(self,
+                 cache_dir: Path = CACHE_DIR,
+                 max_workers: int = 4,
+                 retries: int = 3,
+                 backoff: float = 0.5,
+                 timeout: float = 30):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # Un seul téléchargement à la fois par URL
+        self._url_locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    # ─────────────────────────────────────────────────────────
+    def _paths(self, url: str) -> tuple[Path, Path, Path]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+        base = self.cache_dir / key
+        return base.with_suffix(".body"), base.with_suffix(".meta.json"), base.with_suffix(".part")
+
+    def _lock_for(self, url: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._url_locks.setdefault(url, threading.Lock())
+
+    @staticmethod
+    def _read_meta(meta_path: Path) -> dict:
+        if meta_path.exists():
+            try:
+                return json.loads(meta_path.read_text(encoding="utf-8"))
+            except ValueError:
+                pass
+        return {}
+
+    # ─────────────────────────────────────────────────────────
+    def fetch(self, url: str) -> Path:
+        """
+        Renvoie le chemin du corps de réponse en cache, téléchargé si nécessaire.
+        • Réponse 304 → le cache existant est réutilisé tel quel.
+        • Lève DownloadError après `retries` essais infructueux.
+        """
+        with self._lock_for(url):
+            last_err: Exception | None = None
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    time.sleep(self.backoff * 2 ** (attempt - 1))
+                try:
+                    return self._fetch_once(url)
+                except (requests.exceptions.ConnectionError,
+                        requests.exceptions.Timeout,
+                        requests.exceptions.ChunkedEncodingError) as err:
+                    last_err = err
+                except requests.exceptions.HTTPError as err:
+                    last_err = err
+                    if err.response is None or err.response.status_code not in RETRY_STATUS:
+                        break
+            raise DownloadError(f"Échec du téléchargement {url} : {last_err}")
+
+    @staticmethod
+    def _drop_part(part_path: Path, meta_path: Path, meta: dict) -> None:
+        """Oublie un téléchargement partiel (fichier .part + validateur)."""
+        part_path.unlink(missing_ok=True)
+        if meta.pop("part_validator", None) is not None:
+            meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+    def _fetch_once(self, url: str) -> Path:
+        body_path, meta_path, part_path = self._paths(url)
+        meta = self._read_meta(meta_path)
+
+        headers = {}
+        if body_path.exists():
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        # Reprise : on ne redemande que les octets manquants
+        resume_from = part_path.stat().st_size if part_path.exists() else 0
+        part_validator = meta.get("part_validator")
+        if resume_from and part_validator:
+            headers["Range"] = f"bytes={resume_from}-"
+            headers["If-Range"] = part_validator
+
+        with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+            if response.status_code == 304:
+                # Corps en cache toujours valide : un .part éventuel est périmé
+                self._drop_part(part_path, meta_path, meta)
+                return body_path
+            restart = response.status_code == 416 and "Range" in headers
+            if not restart:
+                response.raise_for_status()
+
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+                append = response.status_code == 206 and "Range" in headers
+                if not append:
+                    # 200 à une requête Range : la ressource a changé, on repart de zéro
+                    self._drop_part(part_path, meta_path, meta)
+
+                # Mémorise le validateur avant d'écrire, pour pouvoir reprendre
+                meta["part_validator"] = etag or last_modified
+                meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+                with open(part_path, "ab" if append else "wb") as fh:
+                    for block in response.iter_content(chunk_size=CHUNK_BYTES):
+                        fh.write(block)
+
+        if restart:
+            # 416 : .part déjà complet (processus interrompu avant os.replace)
+            # ou plus long que la ressource → on le jette et on repart de l'octet 0
+            self._drop_part(part_path, meta_path, meta)
+            return self._fetch_once(url)
+
+        os.replace(part_path, body_path)
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+        return body_path
+
+    # ─────────────────────────────────────────────────────────
+    def fetch_many(self, urls: list[str]) -> dict[str, Path | Exception]:
+        """
+        Télécharge plusieurs URLs en parallèle (au plus `max_workers` à la fois).
+        Renvoie {url: chemin} ou {url: exception} pour les échecs.
+        """
+        results: dict[str, Path | Exception] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {url: pool.submit(self.fetch, url) for url in dict.fromkeys(urls)}
+            for url, fut in futures.items():
+                try:
+                    results[url] = fut.result()
+                except Exception as err:
+                    results[url] = err
+        return results
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "DownloadManager":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
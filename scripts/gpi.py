@@ -0,0 +1,241 @@
+"""
+gpi.py
+──────
+• Outil en ligne de commande pour les traitements par lots (jobs nocturnes)
+• Exécute les loaders et filtres de core/ sans importer Streamlit
+• gpi extract : mêmes extractions que l'interface, une requête en ligne de commande
+  ou plusieurs requêtes lues depuis un fichier (JSON ou JSON Lines), en parallèle
+• Écrit chaque résultat (csv / parquet / json) + un manifest.json récapitulatif
+• À lancer depuis la racine du projet :
+      python scripts/gpi.py extract --source penn --country France --vars rgdpe pop --format parquet
+      python scripts/gpi.py extract --spec queries.jsonl --workers 4 --out data/exports/nightly
+  Exemple de requête (une ligne JSONL) :
+      {"name": "fr_pwt", "source": "penn", "country": "France", "vars": ["rgdpe"], "years": [2018, 2019]}
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+# Ajoute le dossier parent au chemin d'import (accès à core/)
+sys.path.append(os.path.abspath(os.path.join(Path(__file__).parent, "..")))
+
+from core import datasets
+
+OUT_DIR = Path("data/exports")
+FORMATS = ("csv", "parquet", "json")
+RESERVED_NAMES = {"manifest"}   # manifest.json est écrit à côté des résultats
+
+
+# ─────────── Extracteurs (un par source, imports différés) ───────────
+def _penn(q: dict) -> pd.DataFrame:
+    from core.penn_loader import filter_penn_data
+    return filter_penn_data(datasets.get("penn"), country=q["country"],
+                            variables=q.get("vars"), years=q.get("years"))
+
+
+def _cpi(q: dict) -> pd.DataFrame:
+    from core.world_bank_cpi_loader import filter_wb_cpi_data
+    return filter_wb_cpi_data(datasets.get("cpi"), country=q["country"],
+                              series=q["series"], years=q.get("years"))
+
+
+def _icp(q: dict) -> pd.DataFrame:
+    from core.world_bank_icp_loader import filter_icp_data
+    return filter_icp_data(datasets.get("icp"), country=q.get("country"),
+                           classification_name=q.get("classification"),
+                           series_name=q.get("series"), years=q.get("years"))
+
+
+BIS_KEYS = {"area": "Reference area", "frequency": "Frequency", "type": "Type",
+            "basket": "Basket", "unit": "Unit"}
+
+
+def _bis(q: dict) -> pd.DataFrame:
+    from core.bis_loader import META_COLS, filter_bis_data
+    out = filter_bis_data(datasets.get("bis"), {col: q.get(key) or [] for key, col in BIS_KEYS.items()})
+    # dates : préfixes "AAAA" / "AAAA-MM" / "AAAA-MM-JJ" des colonnes-dates à garder
+    if q.get("dates"):
+        prefixes = tuple(str(d) for d in q["dates"])
+        keep = [c for c in out.columns if c in META_COLS or str(c).startswith(prefixes)]
+        out = out[keep]
+    return out
+
+
+def _numbeo(q: dict) -> pd.DataFrame:
+    from core.numbeo_loader import filter_numbeo_data, get_variable_options
+    df = datasets.get("numbeo")
+    return filter_numbeo_data(df, q.get("regions"), q.get("vars") or get_variable_options(df))
+
+
+def _big_mac(q: dict) -> pd.DataFrame:
+    from core import big_mac
+    iso, currency, name = q.get("iso"), q.get("currency"), q.get("country")
+    if None in (iso, currency, name):
+        # Un seul identifiant suffit : les deux autres sont déduits
+        given = {k: v for k, v in (("iso", iso), ("currency", currency), ("name", name)) if v is not None}
+        if len(given) != 1:
+            raise ValueError("big_mac : fournir --iso, --currency ou --country (ou les trois)")
+        ident = big_mac.resolve_identity(**given)
+        if ident.empty:
+            raise ValueError(f"big_mac : identifiant inconnu {given}")
+        iso, currency, name = ident.iloc[0][big_mac.ID_COLS]
+    return big_mac.filter_data(iso, currency, name, year=q.get("year"), month=q.get("month"),
+                               day=q.get("day"), variables=q.get("vars"))
+
+
+EXTRACTORS = {
+    "penn": _penn,
+    "cpi": _cpi,
+    "icp": _icp,
+    "bis": _bis,
+    "numbeo": _numbeo,
+    "big_mac": _big_mac,
+}
+
+
+# ─────────── Exécution ───────────
+def _slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", text).strip("_")[:60] or "query"
+
+
+def query_name(q: dict, i: int) -> str:
+    if q.get("name"):
+        return _slug(str(q["name"]))
+    detail = q.get("country") or q.get("iso") or q.get("currency") or ""
+    return _slug(f"{i:03d}_{q.get('source', '?')}_{detail}")
+
+
+def check_query_names(queries: list[dict]) -> list[str]:
+    """
+    Noms de fichiers des requêtes, vérifiés avant toute exécution : deux
+    requêtes ne doivent pas écrire le même fichier (workers parallèles), ni
+    écraser manifest.json. Comparaison insensible à la casse (systèmes de
+    fichiers macOS / Windows).
+    """
+    names = [query_name(q, i) for i, q in enumerate(queries)]
+    seen: dict[str, int] = {}
+    for i, name in enumerate(names):
+        folded = name.casefold()
+        if folded in RESERVED_NAMES:
+            raise ValueError(f"requête {i} : nom réservé « {name} »")
+        if folded in seen:
+            raise ValueError(f"requêtes {seen[folded]} et {i} : même nom de fichier « {name} »")
+        seen[folded] = i
+    return names
+
+
+def write_frame(df: pd.DataFrame, path: Path, fmt: str) -> None:
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    elif fmt == "parquet":
+        df.to_parquet(path, index=False)
+    else:
+        df.to_json(path, orient="records", lines=True, date_format="iso", force_ascii=False)
+
+
+def run_query(q: dict, i: int, out_dir: Path, fmt: str) -> dict:
+    name = query_name(q, i)
+    start = time.perf_counter()
+    try:
+        if q.get("source") not in EXTRACTORS:
+            raise ValueError(f"source inconnue : {q.get('source')} (choix : {', '.join(EXTRACTORS)})")
+        df = EXTRACTORS[q["source"]](q)
+        path = out_dir / f"{name}.{fmt}"
+        write_frame(df, path, fmt)
+    except Exception as e:
+        return {"name": name, "query": q, "ok": False, "error": f"{type(e).__name__}: {e}",
+                "seconds": round(time.perf_counter() - start, 3)}
+    return {"name": name, "query": q, "ok": True, "file": path.name, "rows": int(len(df)),
+            "columns": int(df.shape[1]), "seconds": round(time.perf_counter() - start, 3)}
+
+
+def extract(queries: list[dict], out_dir: Path, fmt: str, workers: int) -> list[dict]:
+    """
+    Exécute les requêtes en parallèle (jeux chargés une seule fois, partagés).
+    Lève ValueError avant tout calcul si deux requêtes partagent un nom de fichier.
+    """
+    check_query_names(queries)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gpi-extract") as pool:
+        results = list(pool.map(lambda iq: run_query(iq[1], iq[0], out_dir, fmt), enumerate(queries)))
+    (out_dir / "manifest.json").write_text(
+        json.dumps({"format": fmt, "queries": results}, indent=2, ensure_ascii=False, default=str),
+        encoding="utf-8",
+    )
+    return results
+
+
+def read_spec(path: Path) -> list[dict]:
+    """Requêtes depuis un fichier JSON (liste) ou JSON Lines (un objet par ligne)."""
+    text = Path(path).read_text(encoding="utf-8").strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def query_from_args(args: argparse.Namespace) -> dict:
+    keys = ["source", "country", "series", "classification", "vars", "years", "regions",
+            "iso", "currency", "year", "month", "day", "dates", *BIS_KEYS]
+    return {k: getattr(args, k) for k in keys if getattr(args, k) is not None}
+
+
+# ─────────── CLI ───────────
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="gpi", description="Outils hors interface Global Indices.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ex = sub.add_parser("extract", help="extractions filtrées, en lot")
+    ex.add_argument("--spec", type=Path, help="fichier de requêtes (JSON ou JSONL)")
+    ex.add_argument("--source", choices=list(EXTRACTORS))
+    ex.add_argument("--country")
+    ex.add_argument("--series")
+    ex.add_argument("--classification")
+    ex.add_argument("--vars", nargs="+")
+    ex.add_argument("--years", nargs="+", type=int)
+    ex.add_argument("--regions", nargs="+", help="numbeo")
+    ex.add_argument("--iso", help="big_mac")
+    ex.add_argument("--currency", help="big_mac")
+    ex.add_argument("--year", type=int, help="big_mac")
+    ex.add_argument("--month", type=int, help="big_mac")
+    ex.add_argument("--day", type=int, help="big_mac")
+    for key in BIS_KEYS:
+        ex.add_argument(f"--{key}", nargs="+", help="bis")
+    ex.add_argument("--dates", nargs="+", help="bis : préfixes de dates (AAAA, AAAA-MM…)")
+    ex.add_argument("--format", choices=FORMATS, default="csv")
+    ex.add_argument("--out", type=Path, default=OUT_DIR)
+    ex.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args(argv)
+
+    if args.spec is not None:
+        queries = read_spec(args.spec)
+    elif args.source is not None:
+        queries = [query_from_args(args)]
+    else:
+        parser.error("extract : --spec ou --source requis")
+
+    start = time.perf_counter()
+    try:
+        results = extract(queries, args.out, args.format, args.workers)
+    except ValueError as e:
+        parser.error(f"extract : {e}")
+    for r in results:
+        if r["ok"]:
+            print(f"✅ {r['name']:<40} {r['rows']:>8} lignes  ({r['seconds']:.2f}s)")
+        else:
+            print(f"❌ {r['name']:<40} {r['error']}")
+    failed = sum(not r["ok"] for r in results)
+    print(f"\n📦 {len(results) - failed}/{len(results)} extractions → {args.out} "
+          f"({time.perf_counter() - start:.2f}s)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+"""
+load_test.py
+────────────
+• Test de charge : simule N sessions Streamlit simultanées sur app/main_app.py,
+  sans navigateur (streamlit.testing AppTest, une instance par session)
+• Chaque session enchaîne des parcours réalistes tirés au hasard sur les six blocs
+  (navigation → identifiants / filtres → dates…), avec un temps de réflexion entre actions
+• Mesure chaque rerun : latence p50 / p95 / p99 (globale et par bloc), débit (reruns/s),
+  erreurs, et la mémoire résidente (RSS) du processus échantillonnée dans le temps
+• Montée en charge progressive (--ramp) pour repérer le nombre de sessions où la latence décroche
+• À lancer depuis la racine du projet :
+      python scripts/load_test.py --sessions 8 --duration 60
+      python scripts/load_test.py --sessions 1 2 4 8 16 --duration 30 --json data/exports/load_test.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+
+# Ajoute le dossier parent au chemin d'import (accès à core/)
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+
+from core.instrumentation import rss_bytes
+
+APP = ROOT / "app" / "main_app.py"
+
+
+@dataclass
+class Sample:
+    t: float            # secondes depuis le début du palier
+    session: int
+    block: str
+    step: str
+    ms: float
+    ok: bool
+    error: str = ""
+
+
+# ─────────── AppTest en parallèle ───────────
+def share_app_test_globals() -> None:
+    """
+    AppTest n'est pas prévu pour tourner dans plusieurs threads : chaque run
+    pose puis retire des globals du processus (config « global.appTest »,
+    Runtime._instance). Un run qui se termine les retire sous les pieds des
+    autres (arbres vides, widgets inconnus). On les fixe donc une fois pour
+    toute la durée du test : un seul runtime simulé, partagé comme sur un serveur.
+    """
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.testing.v1 import app_test, util
+
+    config.get_option = util.build_mock_config_get_option({"global.appTest": True})
+    app_test.patch_config_options = lambda overrides: contextlib.nullcontext()
+
+    class _Pinned(type):
+        def __setattr__(cls, name, value):
+            if name != "_instance":
+                super().__setattr__(name, value)
+            elif value is not None and Runtime._instance is None:
+                Runtime._instance = value        # premier runtime simulé conservé
+
+    app_test.Runtime = _Pinned("PinnedRuntime", (Runtime,), {})
+
+
+# ─────────── Accès aux widgets par libellé ───────────
+def _widget(at, kind: str, label: str):
+    for w in getattr(at, kind):
+        if w.label == label:
+            return w
+    raise LookupError(f"{kind} « {label} » absent de la page")
+
+
+def _choose(rng: random.Random, options, skip=("", "All")):
+    choices = [o for o in options if o not in skip]
+    if not choices:
+        raise LookupError("aucune option disponible")
+    return rng.choice(choices)
+
+
+def _nav(at, category: str, source: str):
+    """Navigation latérale : « Explore datas » → catégorie → source."""
+    nav = next(r for r in at.sidebar.radio if "Explore datas" in r.options)
+    if nav.value != "Explore datas":
+        nav.set_value("Explore datas").run()
+    cat = _widget(at.sidebar, "radio", "Category")
+    if cat.value != category:
+        cat.set_value(category).run()
+    return _widget(at.sidebar, "selectbox", "Source").set_value(source)
+
+
+# ─────────── Parcours par bloc : liste d'étapes (nom, action → widget modifié) ───────────
+PRICE = "Price Levels & Purchasing Power Parity"
+
+SCENARIOS = {
+    "big_mac": [
+        ("open", lambda at, rng: _nav(at, PRICE, "The Economist – Big Mac Index")),
+        ("identifier", lambda at, rng: (w := _widget(at, "selectbox", "ISO Code")).set_value(_choose(rng, w.options))),
+        ("year", lambda at, rng: (w := _widget(at, "selectbox", "Year")).set_value(_choose(rng, w.options))),
+    ],
+    "bis": [
+        ("open", lambda at, rng: _nav(at, "Exchange Rates",
+                                      "Bank for International Settlements – REER (Real Effective Exchange Rates)")),
+        ("area", lambda at, rng: (w := _widget(at, "multiselect", "Reference Area")).set_value(
+            rng.sample(w.options, k=min(len(w.options), rng.randint(1, 3))))),
+        ("year", lambda at, rng: (w := _widget(at, "selectbox", "Year")).set_value(_choose(rng, w.options))),
+    ],
+    "cpi": [
+        ("open", lambda at, rng: _nav(at, "Consumer Price Index & Inflation",
+                                      "World Bank – CPI (Consumer Price Index)")),
+        ("country", lambda at, rng: (w := _widget(at, "selectbox", "Country")).set_value(_choose(rng, w.options))),
+        ("series", lambda at, rng: (w := _widget(at, "selectbox", "CPI Series")).set_value(_choose(rng, w.options))),
+    ],
+    "icp": [
+        ("open", lambda at, rng: _nav(at, PRICE, "World Bank – ICP (International Comparison Program) Database")),
+        ("country", lambda at, rng: (w := _widget(at, "selectbox", "Country")).set_value(_choose(rng, w.options))),
+        ("classification", lambda at, rng: (w := _widget(at, "selectbox", "Classification")).set_value(
+            _choose(rng, w.options))),
+    ],
+    "penn": [
+        ("open", lambda at, rng: _nav(at, PRICE, "Penn World Table")),
+        ("country", lambda at, rng: (w := _widget(at, "selectbox", "Country")).set_value(_choose(rng, w.options))),
+        ("years", lambda at, rng: (w := _widget(at, "multiselect", "Years (optional)")).set_value(
+            rng.sample(w.options, k=min(len(w.options), 5)))),
+    ],
+    "numbeo": [
+        ("open", lambda at, rng: _nav(at, "Wages & Purchasing Power",
+                                      "Numbeo – Cost of Living + PPP (Purchasing Power Parity)")),
+        ("regions", lambda at, rng: (w := _widget(at, "multiselect", "Region (city, country)")).set_value(
+            rng.sample(w.options, k=min(len(w.options), 3)))),
+        ("basket", lambda at, rng: (w := _widget(at, "selectbox", "Preset")).set_value(_choose(rng, w.options))),
+    ],
+}
+
+
+# ─────────── Session simulée ───────────
+def run_session(session: int, blocks: list[str], deadline: float, t0: float, think: float,
+                timeout: float, samples: list[Sample], lock: threading.Lock, seed: int) -> None:
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed + session)
+    at = None
+
+    def record(block: str, step: str, action) -> bool:
+        start = time.perf_counter()
+        error = ""
+        try:
+            action().run()
+            if at.exception:
+                error = at.exception[0].value.splitlines()[0][:160]
+        except Exception as e:  # widget absent (jeu indisponible), délai dépassé…
+            error = f"{type(e).__name__}: {e}"[:160]
+        end = time.perf_counter()
+        with lock:
+            samples.append(Sample(end - t0, session, block, step, (end - start) * 1e3, not error, error))
+        return not error
+
+    def reload() -> None:
+        """Nouvelle session (comme un rechargement de page) : arbre d'éléments neuf."""
+        nonlocal at
+        at = AppTest.from_file(str(APP), default_timeout=timeout)
+        record("startup", "load", lambda: at)
+
+    reload()
+    while time.perf_counter() < deadline:
+        block = rng.choice(blocks)
+        for step, action in SCENARIOS[block]:
+            if time.perf_counter() >= deadline:
+                break
+            ok = record(block, step, lambda: action(at, rng))
+            time.sleep(rng.uniform(0, 2 * think))
+            if not ok:  # bloc indisponible : parcours abandonné
+                if not any("Explore datas" in r.options for r in at.sidebar.radio):
+                    reload()  # page vide (rerun interrompu) : la session repart de zéro
+                break
+
+
+def sample_rss(stop: threading.Event, t0: float, interval: float, out: list[tuple[float, float]]) -> None:
+    while not stop.is_set():
+        out.append((time.perf_counter() - t0, rss_bytes() / 2**20))
+        stop.wait(interval)
+
+
+def run_level(n_sessions: int, args) -> dict:
+    """Un palier de charge : n_sessions simultanées pendant args.duration secondes."""
+    samples: list[Sample] = []
+    rss: list[tuple[float, float]] = []
+    lock, stop = threading.Lock(), threading.Event()
+    t0 = time.perf_counter()
+    deadline = t0 + args.ramp + args.duration
+    sampler = threading.Thread(target=sample_rss, args=(stop, t0, args.rss_interval, rss), daemon=True)
+    sampler.start()
+
+    def start(i: int) -> None:
+        time.sleep(args.ramp * i / max(n_sessions, 1))  # montée en charge progressive
+        run_session(i, args.blocks, deadline, t0, args.think, args.timeout, samples, lock, args.seed)
+
+    with ThreadPoolExecutor(max_workers=n_sessions, thread_name_prefix="gpi-load") as pool:
+        list(pool.map(start, range(n_sessions)))
+    stop.set()
+    sampler.join()
+    return summarize(n_sessions, samples, rss, time.perf_counter() - t0)
+
+
+# ─────────── Rapport ───────────
+def _percentiles(ms: list[float]) -> dict:
+    if not ms:
+        return {"n": 0, "p50": None, "p95": None, "p99": None, "max": None}
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"n": len(ms), "p50": round(p50, 1), "p95": round(p95, 1), "p99": round(p99, 1),
+            "max": round(max(ms), 1)}
+
+
+def summarize(n_sessions: int, samples: list[Sample], rss: list[tuple[float, float]], elapsed: float) -> dict:
+    reruns = [s for s in samples if s.block != "startup"]
+    by_block = {}
+    for block in sorted({s.block for s in reruns}):
+        rows = [s for s in reruns if s.block == block]
+        by_block[block] = {**_percentiles([s.ms for s in rows if s.ok]),
+                           "errors": sum(not s.ok for s in rows),
+                           "first_error": next((s.error for s in rows if not s.ok), "")}
+    return {
+        "sessions": n_sessions,
+        "seconds": round(elapsed, 1),
+        "reruns": len(reruns),
+        "throughput": round(len(reruns) / elapsed, 2) if elapsed else 0.0,
+        "errors": sum(not s.ok for s in reruns),
+        "startup": _percentiles([s.ms for s in samples if s.block == "startup"]),
+        "latency": _percentiles([s.ms for s in reruns if s.ok]),
+        "blocks": by_block,
+        "rss_mb": [(round(t, 1), round(mb, 1)) for t, mb in rss],
+        "samples": [asdict(s) for s in samples],
+    }
+
+
+def print_report(level: dict) -> None:
+    lat, rss = level["latency"], [mb for _, mb in level["rss_mb"]]
+    fmt = lambda v: "—" if v is None else f"{v:.0f}"
+    print(f"\n👥 {level['sessions']} sessions · {level['seconds']}s · {level['reruns']} reruns "
+          f"({level['throughput']}/s) · {level['errors']} erreurs")
+    print(f"   latence ms  p50 {fmt(lat['p50'])}  p95 {fmt(lat['p95'])}  p99 {fmt(lat['p99'])}  "
+          f"max {fmt(lat['max'])}  (démarrage p50 {fmt(level['startup']['p50'])})")
+    if rss:
+        print(f"   RSS Mo      début {rss[0]:.0f}  max {max(rss):.0f}  fin {rss[-1]:.0f}")
+    print(f"   {'bloc':<10} {'n':>5} {'p50':>7} {'p95':>7} {'p99':>7} {'err':>5}")
+    for block, b in level["blocks"].items():
+        print(f"   {block:<10} {b['n']:>5} {fmt(b['p50']):>7} {fmt(b['p95']):>7} {fmt(b['p99']):>7} "
+              f"{b['errors']:>5}  {b['first_error'][:60]}")
+
+
+# ─────────── CLI ───────────
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Test de charge de l'application (sessions simulées).")
+    parser.add_argument("--sessions", nargs="+", type=int, default=[4],
+                        help="nombre de sessions simultanées (plusieurs valeurs = paliers successifs)")
+    parser.add_argument("--duration", type=float, default=30, help="durée de chaque palier (s)")
+    parser.add_argument("--ramp", type=float, default=5, help="montée en charge (s)")
+    parser.add_argument("--think", type=float, default=0.5, help="temps de réflexion moyen entre actions (s)")
+    parser.add_argument("--blocks", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--timeout", type=float, default=60, help="délai max d'un rerun (s)")
+    parser.add_argument("--rss-interval", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="écrit le rapport complet (échantillons compris)")
+    args = parser.parse_args(argv)
+
+    os.chdir(ROOT)  # chemins data/… relatifs à la racine, comme `streamlit run`
+    share_app_test_globals()
+    levels = []
+    for n in args.sessions:
+        level = run_level(n, args)
+        print_report(level)
+        levels.append(level)
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps({"args": {k: v for k, v in vars(args).items() if k != "json"},
+                                         "levels": levels}, indent=2, default=str), encoding="utf-8")
+        print(f"\n📝 Rapport → {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
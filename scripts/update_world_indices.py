@@ -1,15 +1,31 @@
 """
 update_world_indices.py
 ───────────────────────
-• Télécharge les valeurs actuelles des indices mondiaux depuis Yahoo Finance
-• Met à jour / crée le fichier world_indices.csv
-• Chemin de sortie : …/global_price_indices/data/raw/yahoo/world_indices.csv
+• Télécharge les valeurs actuelles des indices mondiaux via un fournisseur de cotations
+  (Yahoo Finance par défaut, fournisseur factice hors-ligne pour les essais)
+• Interroge les symboles par lots, en parallèle
+• Ajoute les cotations à l'historique partitionné par jour (store colonnaire),
+  sans doublons (clé : symbole + horodatage de la cotation fourni par la source ;
+  une cotation sans horodatage n'entre pas dans l'historique)
+• Réécrit l'instantané world_indices.csv avec les dernières valeurs
+• Chemin de sortie : data/raw/yahoo/world_indices.csv
 """
 
-import yfinance as yf
-import pandas as pd
+import argparse
+import os
+import sys
+import zlib
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
-from datetime import datetime
+
+import pandas as pd
+
+# Ajoute le dossier parent au chemin d'import (accès à core/)
+sys.path.append(os.path.abspath(os.path.join(Path(__file__).parent, "..")))
+
+from core.columnar_store import STORE_DIR, append_partitioned
 
 # ─────────── Paramètres ───────────
 SYMBOLS = [
@@ -21,42 +37,202 @@ SYMBOLS = [
     "^XDB", "^XDE", "000001.SS", "^N225", "^XDN", "^XDA"
 ]
 
-# Chemin de sortie
-BASE_DIR = Path(r"C:/Users/Timothée ABADJI/OneDrive/Desktop/global_price_indices/data/raw/yahoo")
-BASE_DIR.mkdir(parents=True, exist_ok=True)
+BATCH_SIZE = 10
+MAX_WORKERS = 4
+
+# Chemins de sortie (relatifs à la racine du projet)
+BASE_DIR = Path("data/raw/yahoo")
 CSV_PATH = BASE_DIR / "world_indices.csv"
+HISTORY_TABLE = "world_indices_history"
+KEY_COLS = ["symbol", "timestamp"]
+
+
+# ─────────── Fournisseurs de cotations ───────────
+class QuoteProvider(ABC):
+    """
+    Interface d'un fournisseur : fetch_quotes(lot de symboles) → liste de dicts
+    au format de QUOTE_FIELDS. Les symboles en échec sont simplement omis ;
+    `timestamp` est l'heure de marché de la cotation (None si inconnue).
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def fetch_quotes(self, symbols: list[str]) -> list[dict]:
+        ...
+
+
+QUOTE_FIELDS = [
+    "symbol", "name", "price", "change", "change_pct", "volume",
+    "day_low", "day_high", "wk52_low", "wk52_high", "timestamp",
+]
+
+
+class YahooProvider(QuoteProvider):
+    """Cotations Yahoo Finance (yfinance), un objet Tickers par lot."""
+
+    name = "yahoo"
+
+    def fetch_quotes(self, symbols: list[str]) -> list[dict]:
+        import yfinance as yf
+
+        records = []
+        tickers = yf.Tickers(" ".join(symbols))
+        for symbol in symbols:
+            try:
+                info = tickers.tickers[symbol].info
+                market_time = info.get("regularMarketTime")
+                records.append({
+                    "symbol": symbol,
+                    "name": info.get("longName") or info.get("shortName"),
+                    "price": info.get("regularMarketPrice"),
+                    "change": info.get("regularMarketChange"),
+                    "change_pct": info.get("regularMarketChangePercent"),
+                    "volume": info.get("regularMarketVolume"),
+                    "day_low": info.get("regularMarketDayLow"),
+                    "day_high": info.get("regularMarketDayHigh"),
+                    "wk52_low": info.get("fiftyTwoWeekLow"),
+                    "wk52_high": info.get("fiftyTwoWeekHigh"),
+                    "timestamp": (
+                        datetime.fromtimestamp(market_time, tz=timezone.utc)
+                        if market_time else None
+                    ),
+                })
+            except Exception as e:
+                print(f"[!] Erreur pour {symbol} → {e}")
+        return records
+
+
+class FakeProvider(QuoteProvider):
+    """
+    Fournisseur hors-ligne et déterministe : même symbole + même horodatage
+    → même cotation. Utile pour exercer le pipeline sans réseau.
+    """
+
+    name = "fake"
+
+    def __init__(self, as_of: datetime | None = None):
+        self.as_of = as_of or datetime(2025, 1, 2, 16, 0, tzinfo=timezone.utc)
+
+    def fetch_quotes(self, symbols: list[str]) -> list[dict]:
+        records = []
+        for symbol in symbols:
+            seed = zlib.crc32(f"{symbol}|{self.as_of.isoformat()}".encode())
+            price = 1000 + seed % 9000 + (seed % 100) / 100
+            change = (seed % 200 - 100) / 10
+            records.append({
+                "symbol": symbol,
+                "name": f"Fake index {symbol}",
+                "price": price,
+                "change": change,
+                "change_pct": change / price * 100,
+                "volume": seed % 1_000_000,
+                "day_low": price - abs(change),
+                "day_high": price + abs(change),
+                "wk52_low": price * 0.8,
+                "wk52_high": price * 1.2,
+                "timestamp": self.as_of,
+            })
+        return records
+
+
+PROVIDERS = {"yahoo": YahooProvider, "fake": FakeProvider}
+
 
 # ─────────── Collecte des données ───────────
-records = []
-tickers = yf.Tickers(" ".join(SYMBOLS))
-
-for symbol in SYMBOLS:
-    try:
-        info = tickers.tickers[symbol].info
-        price   = info.get("regularMarketPrice")
-        change  = info.get("regularMarketChange")
-        pct_chg = info.get("regularMarketChangePercent")
-        volume  = info.get("regularMarketVolume")
-        day_low  = info.get("regularMarketDayLow")
-        day_high = info.get("regularMarketDayHigh")
-        wk52_low  = info.get("fiftyTwoWeekLow")
-        wk52_high = info.get("fiftyTwoWeekHigh")
-
-        records.append({
-            "Symbol": symbol,
-            "Name": info.get("longName") or info.get("shortName"),
-            "Price": price,
-            "Change": change,
-            "Change (%)": pct_chg,
-            "Volume": volume,
-            "Day Range": f"{day_low} – {day_high}",
-            "52 Wk Range": f"{wk52_low} – {wk52_high}",
-            "Last Update": datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
-        })
-    except Exception as e:
-        print(f"[!] Erreur pour {symbol} → {e}")
-
-# ─────────── Sauvegarde CSV ───────────
-df = pd.DataFrame(records)
-df.to_csv(CSV_PATH, index=False)
-print(f"✅ Fichier mis à jour : {CSV_PATH}")
+def _batches(items: list[str], size: int) -> list[list[str]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def fetch_all(provider: QuoteProvider,
+              symbols: list[str] = SYMBOLS,
+              batch_size: int = BATCH_SIZE,
+              max_workers: int = MAX_WORKERS) -> pd.DataFrame:
+    """Interroge le fournisseur par lots en parallèle et renvoie un DataFrame typé."""
+    fetched_at = datetime.now(timezone.utc).replace(microsecond=0)
+
+    records: list[dict] = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for batch_records in pool.map(provider.fetch_quotes, _batches(symbols, batch_size)):
+            records.extend(batch_records)
+
+    df = pd.DataFrame.from_records(records, columns=QUOTE_FIELDS)
+    # Horodatage de marché de la source uniquement : l'heure de collecte ferait
+    # entrer la même cotation périmée dans l'historique à chaque exécution
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+    df["fetched_at"] = pd.Timestamp(fetched_at)
+    df["date"] = df["timestamp"].dt.strftime("%Y-%m-%d")
+    return df
+
+
+def save_history(df: pd.DataFrame, store_dir: Path = STORE_DIR) -> tuple[list[Path], int]:
+    """
+    Ajoute les cotations horodatées à l'historique (une partition par jour,
+    sans doublons) ; les cotations sans horodatage de marché sont écartées.
+    Renvoie (partitions réécrites, nombre de cotations nouvelles).
+    """
+    dated = df[df["timestamp"].notna()]
+    if len(dated) < len(df):
+        skipped = ", ".join(df.loc[df["timestamp"].isna(), "symbol"])
+        print(f"[!] Sans horodatage de marché, hors historique : {skipped}")
+    if dated.empty:
+        return [], 0
+    return append_partitioned(dated, HISTORY_TABLE, partition_col="date", key_cols=KEY_COLS,
+                              store_dir=store_dir)
+
+
+def save_snapshot(df: pd.DataFrame, path: Path = CSV_PATH) -> Path:
+    """Réécrit l'instantané CSV (dernières valeurs) au format historique du fichier."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    snapshot = pd.DataFrame({
+        "Symbol": df["symbol"],
+        "Name": df["name"],
+        "Price": df["price"],
+        "Change": df["change"],
+        "Change (%)": df["change_pct"],
+        "Volume": df["volume"],
+        "Day Range": df["day_low"].astype(str) + " – " + df["day_high"].astype(str),
+        "52 Wk Range": df["wk52_low"].astype(str) + " – " + df["wk52_high"].astype(str),
+        "Last Update": df["fetched_at"].dt.strftime("%Y-%m-%d %H:%M UTC"),
+    })
+    snapshot.to_csv(path, index=False)
+    return path
+
+
+# ─────────── Lancement ───────────
+def update(provider: QuoteProvider,
+           store_dir: Path = STORE_DIR,
+           csv_path: Path = CSV_PATH,
+           batch_size: int = BATCH_SIZE,
+           max_workers: int = MAX_WORKERS,
+           symbols: list[str] = SYMBOLS) -> tuple[pd.DataFrame, list[Path], int, Path | None]:
+    """
+    Une exécution complète : collecte, historique, instantané CSV.
+    Renvoie (cotations, partitions réécrites, cotations nouvelles, CSV écrit).
+    """
+    df = fetch_all(provider, symbols, batch_size=batch_size, max_workers=max_workers)
+    if df.empty:
+        return df, [], 0, None
+    partitions, added = save_history(df, store_dir)
+    return df, partitions, added, save_snapshot(df, csv_path)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Met à jour l'historique des indices mondiaux.")
+    parser.add_argument("--provider", choices=sorted(PROVIDERS), default="yahoo")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    args = parser.parse_args(argv)
+
+    provider = PROVIDERS[args.provider]()
+    df, partitions, added, csv_path = update(provider, batch_size=args.batch_size, max_workers=args.workers)
+    if df.empty:
+        print("⚠️ Aucune cotation récupérée.")
+        return
+
+    print(f"✅ {added} cotation(s) ajoutée(s) à l'historique ({len(partitions)} partition(s)).")
+    print(f"✅ Fichier mis à jour : {csv_path}")
+
+
+if __name__ == "__main__":
+    main()
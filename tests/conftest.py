@@ -0,0 +1,58 @@
+# tests/conftest.py – v2025-07-11
+# ------------------------------------------------------------
+# • Racine du dépôt sur sys.path (imports core.* / scripts.*)
+# • Fixture `stub_server` : serveur HTTP local (http.server) dont chaque
+#   test fournit la fonction de réponse ; requêtes reçues enregistrées
+# ------------------------------------------------------------
+
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+class StubServer:
+    """
+    `respond(path, headers)` → (statut, en-têtes, corps) ; par défaut 404.
+    `requests` : liste des (chemin, en-têtes) reçus, dans l'ordre.
+    """
+
+    def __init__(self):
+        self.respond = lambda path, headers: (404, {}, b"")
+        self.requests: list[tuple[str, dict]] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                headers = dict(self.headers)
+                stub.requests.append((self.path, headers))
+                status, extra, body = stub.respond(self.path, headers)
+                self.send_response(status)
+                for name, value in extra.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_port}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    server = StubServer()
+    yield server
+    server.close()
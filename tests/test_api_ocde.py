@@ -0,0 +1,84 @@
+# tests/test_api_ocde.py – v2025-07-11
+# ------------------------------------------------------------
+# Ingestion OCDE en flux : réponses SDMX-JSON enregistrées (tests/fixtures)
+# servies par un serveur local, table Parquet comparée à l'aplatissement
+# historique (flatten_ocde_data)
+# ------------------------------------------------------------
+
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from core.columnar_store import read_table
+from scripts import api_ocde
+from scripts.downloader import DownloadManager
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _reference_flatten(json_data: dict) -> pd.DataFrame:
+    """Aplatissement ligne à ligne d'origine (avant la lecture en flux)."""
+    structure = json_data["structure"]["dimensions"]["observation"]
+    series_data = json_data["dataSets"][0]["observations"]
+    observations = []
+    for key in series_data:
+        dim_indexes = list(map(int, key.split(":")))
+        values = [structure[i]["values"][dim_indexes[i]]["id"] for i in range(len(dim_indexes))]
+        observations.append(values + [series_data[key][0]])
+    return pd.DataFrame(observations, columns=[dim["name"] for dim in structure] + ["Value"])
+
+
+def _plain(df: pd.DataFrame) -> pd.DataFrame:
+    """Catégories → chaînes, valeurs → float64 (comparaison indépendante des dtypes)."""
+    out = df.astype({c: str for c in df.columns if c != "Value"})
+    out["Value"] = pd.to_numeric(out["Value"]).astype("float64")
+    return out.reset_index(drop=True)
+
+
+@pytest.fixture
+def served(stub_server, tmp_path, monkeypatch):
+    """Sert tests/fixtures/<nom> sous /<nom> ; gestionnaire de téléchargement isolé."""
+    def respond(path, headers):
+        fixture = FIXTURES / path.lstrip("/").split("?")[0]
+        if not fixture.is_file():
+            return 404, {}, b""
+        return 200, {"Content-Type": "application/json", "ETag": f'"{fixture.stat().st_mtime_ns}"'}, fixture.read_bytes()
+
+    stub_server.respond = respond
+    monkeypatch.setattr(api_ocde, "_manager", DownloadManager(cache_dir=tmp_path / "http", backoff=0.01))
+    yield stub_server
+    api_ocde._manager.close()
+
+
+# ─────────────────────────────────────────────────────────────
+@pytest.mark.parametrize("fixture", ["ocde_ppp_monthly.json", "ocde_two_datasets.json"])
+@pytest.mark.parametrize("chunk_size", [7, api_ocde.CHUNK_OBS])
+def test_streamed_table_matches_flatten(served, tmp_path, fixture, chunk_size):
+    url = f"{served.url}/{fixture}?startPeriod=2024-01&dimensionAtObservation=AllDimensions"
+    recorded = json.loads((FIXTURES / fixture).read_bytes())
+
+    api_ocde.ingest_ocde_api(url, "ocde", chunk_size=chunk_size, store_dir=tmp_path / "store")
+    streamed = read_table("ocde", store_dir=tmp_path / "store")
+
+    expected = _plain(_reference_flatten(recorded))
+    pd.testing.assert_frame_equal(_plain(streamed), expected)
+    pd.testing.assert_frame_equal(_plain(api_ocde.flatten_ocde_data(api_ocde.fetch_ocde_api(url))), expected)
+    assert len(streamed) == len(recorded["dataSets"][0]["observations"])
+
+
+def test_only_first_dataset_is_read():
+    keys = [k for batch, _ in api_ocde.iter_ocde_observations(FIXTURES / "ocde_two_datasets.json", 50)
+            for k in batch]
+    recorded = json.loads((FIXTURES / "ocde_two_datasets.json").read_bytes())
+    assert keys == list(recorded["dataSets"][0]["observations"])
+
+
+def test_ingest_queries_reports_failures_per_table(served, tmp_path):
+    results = api_ocde.ingest_ocde_queries(
+        {"ppp": f"{served.url}/ocde_ppp_monthly.json", "missing": f"{served.url}/absent.json"},
+        chunk_size=50, store_dir=tmp_path / "store",
+    )
+    assert isinstance(results["missing"], Exception)
+    assert len(read_table("ppp", store_dir=tmp_path / "store")) == 180
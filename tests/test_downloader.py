@@ -0,0 +1,118 @@
+# tests/test_downloader.py – v2025-07-11
+# ------------------------------------------------------------
+# DownloadManager contre un serveur HTTP local :
+# retry / backoff, ETag 304, reprise Range, .part complet (416)
+# ------------------------------------------------------------
+
+import json
+
+import pytest
+
+from scripts.downloader import DownloadError, DownloadManager
+
+BODY = bytes(range(256)) * 40  # 10 240 octets
+ETAG = '"v1"'
+
+
+def _serve_ranges(path, headers):
+    """Ressource BODY avec ETag, Range / If-Range et 304 conditionnel."""
+    if headers.get("If-None-Match") == ETAG:
+        return 304, {"ETag": ETAG}, b""
+    rng = headers.get("Range")
+    if rng and headers.get("If-Range", ETAG) == ETAG:
+        start = int(rng.split("=")[1].rstrip("-"))
+        if start >= len(BODY):
+            return 416, {"Content-Range": f"bytes */{len(BODY)}"}, b""
+        return 206, {"ETag": ETAG, "Content-Range": f"bytes {start}-{len(BODY) - 1}/{len(BODY)}"}, BODY[start:]
+    return 200, {"ETag": ETAG}, BODY
+
+
+@pytest.fixture
+def manager(tmp_path):
+    with DownloadManager(cache_dir=tmp_path, retries=3, backoff=0.01, timeout=5) as dm:
+        yield dm
+
+
+def _seed_part(manager, url, data, validator=ETAG):
+    _, meta_path, part_path = manager._paths(url)
+    part_path.write_bytes(data)
+    meta = json.loads(meta_path.read_text(encoding="utf-8")) if meta_path.exists() else {}
+    meta_path.write_text(json.dumps({**meta, "part_validator": validator}), encoding="utf-8")
+    return part_path
+
+
+# ─────────────────────────────────────────────────────────────
+def test_retries_with_backoff_then_succeeds(stub_server, manager, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("scripts.downloader.time.sleep", sleeps.append)
+    calls = iter([503, 429])
+    stub_server.respond = lambda path, headers: (next(calls, 200), {}, BODY)
+
+    path = manager.fetch(stub_server.url + "/data")
+
+    assert path.read_bytes() == BODY
+    assert len(stub_server.requests) == 3
+    assert sleeps == [0.01, 0.02]
+
+
+def test_gives_up_immediately_on_non_retryable_status(stub_server, manager):
+    stub_server.respond = lambda path, headers: (404, {}, b"")
+    with pytest.raises(DownloadError):
+        manager.fetch(stub_server.url + "/missing")
+    assert len(stub_server.requests) == 1
+
+
+def test_gives_up_after_all_retries(stub_server, manager, monkeypatch):
+    monkeypatch.setattr("scripts.downloader.time.sleep", lambda s: None)
+    stub_server.respond = lambda path, headers: (500, {}, b"")
+    with pytest.raises(DownloadError):
+        manager.fetch(stub_server.url + "/broken")
+    assert len(stub_server.requests) == manager.retries + 1
+
+
+def test_etag_304_reuses_cache_and_drops_stale_part(stub_server, manager):
+    stub_server.respond = _serve_ranges
+    url = stub_server.url + "/data"
+    first = manager.fetch(url)
+    part_path = _seed_part(manager, url, b"stale", validator='"old"')
+
+    second = manager.fetch(url)
+
+    assert second == first and second.read_bytes() == BODY
+    assert stub_server.requests[-1][1].get("If-None-Match") == ETAG
+    assert not part_path.exists()
+    assert "part_validator" not in json.loads(manager._paths(url)[1].read_text(encoding="utf-8"))
+
+
+def test_range_resume_appends_missing_bytes(stub_server, manager):
+    stub_server.respond = _serve_ranges
+    url = stub_server.url + "/data"
+    part_path = _seed_part(manager, url, BODY[:4000])
+
+    path = manager.fetch(url)
+
+    assert path.read_bytes() == BODY
+    assert stub_server.requests[0][1]["Range"] == "bytes=4000-"
+    assert not part_path.exists()
+
+
+def test_changed_resource_restarts_from_zero(stub_server, manager):
+    stub_server.respond = _serve_ranges
+    url = stub_server.url + "/data"
+    _seed_part(manager, url, b"x" * 4000, validator='"old"')   # If-Range périmé → 200
+
+    assert manager.fetch(url).read_bytes() == BODY
+
+
+def test_complete_part_416_refetches_from_zero(stub_server, manager):
+    stub_server.respond = _serve_ranges
+    url = stub_server.url + "/data"
+    part_path = _seed_part(manager, url, BODY)   # interrompu avant os.replace
+
+    path = manager.fetch(url)
+
+    assert path.read_bytes() == BODY
+    assert [h.get("Range") for _, h in stub_server.requests] == [f"bytes={len(BODY)}-", None]
+    assert not part_path.exists()
+    # Les exécutions suivantes ne restent pas bloquées
+    assert manager.fetch(url).read_bytes() == BODY
@@ -0,0 +1,26 @@
+# tests/test_fx.py – v2025-07-11
+# ------------------------------------------------------------
+# FxTable : taux « à date » et dates inconnues (NaT → NaN)
+# ------------------------------------------------------------
+
+import numpy as np
+import pandas as pd
+
+from core.fx import FxTable
+
+
+def _table() -> FxTable:
+    dates = pd.to_datetime(["2024-01-01", "2024-07-01"]).to_numpy("datetime64[ns]")
+    return FxTable(dates, pd.Index(["EUR", "USD"]), np.array([[0.90, 1.0], [0.95, 1.0]]))
+
+
+def test_rate_as_of_date():
+    table = _table()
+    np.testing.assert_allclose(table.rates(["EUR", "EUR"], ["2024-03-01", "2024-08-01"]), [0.90, 0.95])
+    assert table.rate("EUR") == 0.95
+
+
+def test_unknown_or_missing_date_gives_nan():
+    rates = _table().rates(["EUR", "EUR", "EUR"], [pd.NaT, "2023-01-01", "2024-03-01"])
+    assert np.isnan(rates[0]) and np.isnan(rates[1]) and rates[2] == 0.90
+    assert np.isnan(_table().convert([10.0], ["EUR"], "USD", [pd.NaT])[0])
@@ -0,0 +1,75 @@
+# tests/test_update_world_indices.py – v2025-07-11
+# ------------------------------------------------------------
+# Mise à jour des indices avec FakeProvider (hors-ligne) :
+# une relance n'ajoute aucune ligne à l'historique
+# ------------------------------------------------------------
+
+import pandas as pd
+import pytest
+
+from core.columnar_store import read_table
+from scripts import update_world_indices as uwi
+
+SYMBOLS = ["^GSPC", "^FCHI", "^N225", "^FTSE"]
+
+
+class PartlyUndatedProvider(uwi.FakeProvider):
+    """FakeProvider dont une cotation arrive sans horodatage de marché."""
+
+    def fetch_quotes(self, symbols):
+        records = super().fetch_quotes(symbols)
+        for record in records:
+            if record["symbol"] == "^N225":
+                record["timestamp"] = None
+        return records
+
+
+def _run(provider, tmp_path):
+    return uwi.update(provider, store_dir=tmp_path / "store", csv_path=tmp_path / "world_indices.csv",
+                      batch_size=2, max_workers=2, symbols=SYMBOLS)
+
+
+def _history(tmp_path) -> pd.DataFrame:
+    return read_table(uwi.HISTORY_TABLE, store_dir=tmp_path / "store")
+
+
+def test_provider_interface_is_abstract():
+    with pytest.raises(TypeError):
+        uwi.QuoteProvider()
+
+
+def test_rerun_does_not_duplicate_history(tmp_path):
+    _run(uwi.FakeProvider(), tmp_path)
+    first = _history(tmp_path)
+    _run(uwi.FakeProvider(), tmp_path)
+    second = _history(tmp_path)
+
+    assert len(first) == len(SYMBOLS)
+    assert len(second) == len(first)
+    assert pd.read_csv(tmp_path / "world_indices.csv")["Symbol"].tolist() == SYMBOLS
+
+
+def test_rerun_reports_no_new_quotes(tmp_path):
+    _, _, first, _ = _run(uwi.FakeProvider(), tmp_path)
+    _, partitions, second, _ = _run(uwi.FakeProvider(), tmp_path)
+
+    assert first == len(SYMBOLS)
+    assert second == 0
+    assert len(partitions) == 1
+
+
+def test_undated_quotes_stay_out_of_history(tmp_path):
+    _run(PartlyUndatedProvider(), tmp_path)
+    _run(PartlyUndatedProvider(), tmp_path)
+
+    history = _history(tmp_path)
+    assert sorted(history["symbol"]) == sorted(set(SYMBOLS) - {"^N225"})
+    assert "^N225" in pd.read_csv(tmp_path / "world_indices.csv")["Symbol"].tolist()
+
+
+def test_new_market_time_appends(tmp_path):
+    _run(uwi.FakeProvider(), tmp_path)
+    later = uwi.FakeProvider(as_of=pd.Timestamp("2025-01-03 16:00", tz="UTC").to_pydatetime())
+    _, _, added, _ = _run(later, tmp_path)
+    assert added == len(SYMBOLS)
+    assert len(_history(tmp_path)) == 2 * len(SYMBOLS)
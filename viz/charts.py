@@ -1 +1,155 @@
+# viz/charts.py – v2025-07-11
+# ------------------------------------------------------------
 # Fonctions de visualisation
+# • Séries extraites des sorties des filtres core (CPI, Penn, Big Mac, BIS)
+# • Sous-échantillonnage côté serveur à la largeur d'affichage :
+#     - LTTB (Largest-Triangle-Three-Buckets) : forme visuelle conservée
+#     - min-max : extrêmes de chaque colonne de pixels conservés
+# • Superposition de plusieurs séries sur un même graphique
+# • Rendu PNG (matplotlib, API objet : sans état global, sûre entre threads)
+#   → mis en cache par requête via core.result_cache (CachedResult.artifact)
+# ------------------------------------------------------------
+
+from __future__ import annotations
+
+import io
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+WIDTH_PX = 1000
+HEIGHT_PX = 420
+DPI = 100
+MAX_SERIES = 20  # au-delà, la légende devient illisible
+
+
+@dataclass(frozen=True)
+class Series:
+    label: str
+    x: np.ndarray  # numérique ou datetime64
+    y: np.ndarray
+
+
+# ─────────────────────────────────────────────────────────────
+# Sous-échantillonnage (renvoient des indices : le type de x est conservé)
+# ─────────────────────────────────────────────────────────────
+def _as_float(x: np.ndarray) -> np.ndarray:
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices des `n_out` points retenus par LTTB (x trié croissant)."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    xf, yf = _as_float(x), y.astype(np.float64)
+    every = (n - 2) / (n_out - 2)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        # Moyenne du seau suivant = troisième sommet du triangle
+        nxt_lo = int((i + 1) * every) + 1
+        nxt_hi = min(int((i + 2) * every) + 1, n)
+        avg_x = xf[nxt_lo:nxt_hi].mean()
+        avg_y = yf[nxt_lo:nxt_hi].mean()
+        lo, hi = int(i * every) + 1, int((i + 1) * every) + 1
+        area = np.abs((xf[a] - avg_x) * (yf[lo:hi] - yf[a]) - (xf[a] - xf[lo:hi]) * (avg_y - yf[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices du minimum et du maximum de chaque seau (`n_out // 2` seaux)."""
+    n = len(y)
+    buckets = max(n_out // 2, 1)
+    if n <= n_out:
+        return np.arange(n)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    keep = [0, n - 1]
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        chunk = y[lo:hi]
+        keep += [lo + int(chunk.argmin()), lo + int(chunk.argmax())]
+    return np.unique(keep)
+
+
+def downsample(series: Series, width_px: int = WIDTH_PX, method: str = "lttb") -> Series:
+    """Réduit la série à environ un point par pixel (deux en min-max), NaN retirés."""
+    ok = ~pd.isna(series.y)
+    x, y = series.x[ok], series.y[ok].astype(np.float64)
+    order = np.argsort(x, kind="stable")
+    x, y = x[order], y[order]
+    if method == "minmax":
+        idx = minmax_indices(y, 2 * width_px)
+    elif method == "lttb":
+        idx = lttb_indices(x, y, width_px)
+    else:
+        raise ValueError(f"Méthode de sous-échantillonnage inconnue : {method}")
+    return Series(series.label, x[idx], y[idx])
+
+
+# ─────────────────────────────────────────────────────────────
+# Extraction des séries depuis les sorties des filtres core
+# ─────────────────────────────────────────────────────────────
+def series_from_columns(df: pd.DataFrame, x: str, columns: list[str]) -> list[Series]:
+    """Une série par colonne numérique (Penn : year × variables, Big Mac : date × variables)."""
+    xs = df[x].to_numpy()
+    if xs.dtype == object:  # dates converties en datetime.date pour l'affichage
+        xs = pd.to_datetime(df[x]).to_numpy()
+    return [Series(col, xs, df[col].to_numpy(dtype=np.float64, na_value=np.nan)) for col in columns]
+
+
+def series_from_long(df: pd.DataFrame, x: str, y: str, by: list[str]) -> list[Series]:
+    """Une série par groupe `by` d'un format long (CPI : country_name / series_name × year)."""
+    out = []
+    for key, grp in df.groupby(by, sort=True, observed=True):
+        label = " – ".join(str(k) for k in (key if isinstance(key, tuple) else (key,)))
+        out.append(Series(label, grp[x].to_numpy(), pd.to_numeric(grp[y], errors="coerce").to_numpy()))
+    return out
+
+
+def series_from_wide(df: pd.DataFrame, label_cols: list[str], date_cols: list[str]) -> list[Series]:
+    """Une série par ligne d'un format large à colonnes-dates (BIS)."""
+    dates = pd.to_datetime(pd.Index(date_cols), errors="coerce")
+    valid = ~dates.isna()
+    xs = dates[valid].to_numpy()
+    values = df[list(np.asarray(date_cols)[valid])].apply(pd.to_numeric, errors="coerce").to_numpy(np.float64)
+    labels = df[label_cols].astype(str).agg(" – ".join, axis=1).tolist()
+    return [Series(label, xs, row) for label, row in zip(labels, values)]
+
+
+# ─────────────────────────────────────────────────────────────
+# Rendu
+# ─────────────────────────────────────────────────────────────
+def render_png(series: list[Series],
+               title: str = "",
+               ylabel: str = "",
+               width_px: int = WIDTH_PX,
+               height_px: int = HEIGHT_PX,
+               method: str = "lttb") -> bytes:
+    """Superpose les séries (sous-échantillonnées à `width_px`) et renvoie l'image PNG."""
+    from matplotlib.figure import Figure  # import différé : coûteux et inutile hors graphiques
+
+    fig = Figure(figsize=(width_px / DPI, height_px / DPI), dpi=DPI)
+    ax = fig.subplots()
+    for s in series[:MAX_SERIES]:
+        d = downsample(s, width_px, method)
+        if len(d.x):
+            ax.plot(d.x, d.y, label=d.label, linewidth=1.2)
+    if title:
+        ax.set_title(title)
+    if ylabel:
+        ax.set_ylabel(ylabel)
+    ax.grid(alpha=0.3)
+    if 1 < len(series):
+        ax.legend(fontsize="small", loc="best")
+    fig.autofmt_xdate()
+    fig.tight_layout()
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    return buf.getvalue()